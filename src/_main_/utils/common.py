@@ -1,7 +1,10 @@
 import base64
+import codecs
+import csv
 import datetime
 import io
 import json
+import tempfile
 from datetime import timedelta
 from zoneinfo import ZoneInfo
 
@@ -14,6 +17,7 @@ from querystring_parser import parser
 
 from _main_.utils.massenergize_errors import CustomMassenergizeError
 from _main_.utils.massenergize_logger import log
+from _main_.utils.route_profiler import route_profiler
 
 
 def custom_timezone_info(zone="UTC"):
@@ -191,6 +195,7 @@ def rename_fields(args, pairs):
     return args
 
 
+@route_profiler.serializer
 def serialize_all(data, full=False, **kwargs):
     # medium = (kwargs or {}).get("medium", False)
     info = (kwargs or {}).get("info", False)
@@ -200,6 +205,11 @@ def serialize_all(data, full=False, **kwargs):
     if isinstance(data[0], dict):
         return data
 
+    # models can load what their json needs for the whole list at once
+    prefetch_for_json = getattr(type(data[0]), "prefetch_for_json", None)
+    if prefetch_for_json and not info:
+        data = prefetch_for_json(data)
+
     if full:
         return [d.full_json() for d in data]
     elif info:
@@ -209,6 +219,7 @@ def serialize_all(data, full=False, **kwargs):
     return [d.simple_json() for d in data]
 
 
+@route_profiler.serializer
 def serialize(data, full=False, **kwargs):
     info = (kwargs or {}).get("info", False)
     if not data:
@@ -341,28 +352,56 @@ def shorten_url(url):
     return s.tinyurl.short(url)
 
 
-def generate_workbook_with_sheets(sheet_data):
-    wb = Workbook()
+EXPORT_CHUNK_SIZE = 1000
+# exports smaller than this stay in memory, bigger ones roll over to a temp file on disk
+EXPORT_SPOOL_MAX_SIZE = 5 * 1024 * 1024
+
+
+def iterate_in_chunks(rows, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields lists of at most chunk_size items from any iterable (list, queryset iterator, generator ...)
+    """
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
 
-    # Get the first sheet
-    ws = wb.active
+def write_csv_to_spooled_file(rows, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Writes rows to a spooled temporary file chunk by chunk, so the csv is never
+    built up in memory next to the rows it came from.
+    Returns the file, rewound to the start. The caller is responsible for closing it.
+    """
+    file = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE)
+    writer = csv.writer(codecs.getwriter("utf-8")(file))
+    for chunk in iterate_in_chunks(rows, chunk_size):
+        writer.writerows(chunk)
+    file.seek(0)
+    return file
 
-    # Populate the first sheet
-    first_sheet_name, first_sheet = next(iter(sheet_data.items()))
-    ws.title = first_sheet_name
-    for row in first_sheet["data"]:
-        ws.append(row)
 
-    # Create and populate the other sheets
-    for sheet_name, sheet in list(sheet_data.items())[1:]:
+def generate_workbook_with_sheets(sheet_data):
+    """
+    sheet_data: {sheet_name: {"data": rows}} where rows can be any iterable of rows.
+    The workbook is built in write-only mode so rows are streamed into the file
+    as they are produced instead of being held as cells in memory.
+    """
+    wb = Workbook(write_only=True)
+
+    for sheet_name, sheet in sheet_data.items():
         ws = wb.create_sheet(title=sheet_name)
         for row in sheet["data"]:
             ws.append(row)
 
-    buffer = io.BytesIO()
-    wb.save(buffer)
-
-    bytes_data = buffer.getvalue()
+    with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE) as file:
+        wb.save(file)
+        file.seek(0)
+        bytes_data = file.read()
     return bytes_data
 
 
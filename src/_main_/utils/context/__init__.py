@@ -83,12 +83,19 @@ class Context:
          return params
 
 
-  def get_pagination_data(self):
+  def get_pagination_data(self, keyset=False):
+    """
+    keyset: the handler supports cursor pagination (see keyset_paginate). It is used when the
+    request sends a cursor ("" for the first page), other requests keep using page numbers.
+    """
     args = self.get_request_body()
     limit = args.get('limit', DEFAULT_PAGINATION_LIMIT)
     next_page = args.get('page', 1)
     no_pagination = args.get('no_pagination', False)
-    return {"next_page": next_page, "limit": limit, "no_pagination": no_pagination}
+    data = {"next_page": next_page, "limit": limit, "no_pagination": no_pagination}
+    if keyset and "cursor" in args:
+      data.update(keyset=True, cursor=args.get('cursor'), with_count=parse_bool(args.get('with_count', False)))
+    return data
 
 
 
@@ -0,0 +1,106 @@
+import atexit
+import os
+import threading
+import time
+
+from django.db import close_old_connections
+from django.db.models import F
+
+from _main_.utils.massenergize_logger import log
+from _main_.utils.utils import is_test_mode
+
+FLUSH_INTERVAL = 2  # seconds
+
+
+class BufferedCounters:
+    """
+    Coalesces increments of counter columns (page views, likes, link visits) in memory and writes
+    them every flush_interval seconds, one atomic UPDATE ... SET field = field + delta per model,
+    field and delta, instead of a read-modify-write save() per hit.
+
+    Pending increments are only visible to the process that buffered them: total() adds them to
+    a row read from the database. When buffering is off (tests), increments are written straight
+    away, still with F() so concurrent hits are not lost.
+    """
+
+    def __init__(self, buffered=True, flush_interval=FLUSH_INTERVAL):
+        self.buffered = buffered
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+
+    def increment(self, instance, field, delta=1):
+        """
+        Adds delta to the counter column of a saved row. The instance's own value is updated in memory.
+        """
+        setattr(instance, field, getattr(instance, field) + delta)
+        self.increment_pk(type(instance), instance.pk, field, delta)
+
+    def increment_pk(self, model, pk, field, delta=1):
+        """
+        Adds delta to the counter column of a saved row known only by its primary key
+        """
+        if not self.buffered:
+            model.objects.filter(pk=pk).update(**{field: F(field) + delta})
+            return
+
+        self._ensure_worker()
+        key = (model, field, pk)
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + delta
+
+    def pending(self, model, field, pk):
+        with self._lock:
+            return self._pending.get((model, field, pk), 0)
+
+    def total(self, instance, field):
+        """
+        The counter value of a row read from the database, plus the increments still buffered for it
+        """
+        if instance is None:
+            return 0
+        return getattr(instance, field) + self.pending(type(instance), field, instance.pk)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        # rows that got the same number of hits are updated together
+        groups = {}
+        for (model, field, pk), delta in pending.items():
+            if delta:
+                groups.setdefault((model, field, delta), []).append(pk)
+
+        for (model, field, delta), pks in groups.items():
+            try:
+                model.objects.filter(pk__in=pks).update(**{field: F(field) + delta})
+            except Exception as e:
+                log.exception(e)
+                # keep them for the next flush
+                with self._lock:
+                    for pk in pks:
+                        key = (model, field, pk)
+                        self._pending[key] = self._pending.get(key, 0) + delta
+
+    def _ensure_worker(self):
+        # a forked worker process does not inherit the parent's thread
+        if self._worker is not None and self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker_pid == os.getpid():
+                return
+            self._worker_pid = os.getpid()
+            self._worker = threading.Thread(target=self._run, name="buffered-counters", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+            close_old_connections()
+
+
+buffered_counters = BufferedCounters(buffered=not is_test_mode())
+atexit.register(buffered_counters.flush)
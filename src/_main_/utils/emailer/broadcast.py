@@ -0,0 +1,120 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pystmark
+
+from _main_.settings import POSTMARK_EMAIL_SERVER_TOKEN
+from _main_.utils.emailer.send_email import FROM_EMAIL, is_dev_env
+from _main_.utils.massenergize_logger import log
+from _main_.utils.utils import is_test_mode
+
+# Postmark's batch endpoint takes up to 500 messages per request
+BATCH_SIZE = pystmark.MAX_BATCH_MESSAGES
+WORKERS = 4
+RETRIES = 3
+# seconds before retrying a batch, doubled after every failed attempt
+RETRY_DELAY = 2
+
+SENT = "sent"
+FAILED = "failed"
+
+
+class PostmarkTransport:
+  """
+  Sends batches through Postmark's batch with templates endpoint
+  """
+
+  def __init__(self, api_key=None):
+    self.api_key = api_key or POSTMARK_EMAIL_SERVER_TOKEN
+
+  def send(self, template, t_model, recipients, sender=None, tag=None):
+    """
+    Sends each recipient their own copy and returns {email: error} for those Postmark refused.
+    Raises if the whole batch failed.
+    """
+    messages = [
+      pystmark.Message(sender=sender or FROM_EMAIL, to=email, template_alias=template, template_model=t_model, tag=tag)
+      for email in recipients
+    ]
+    response = pystmark.send_batch_with_templates(messages, api_key=self.api_key)
+    response.raise_for_status()
+    # Postmark answers for each message, in the order they were sent
+    return {email: confirmation.message for email, confirmation in zip(recipients, response.messages) if confirmation.error_code}
+
+
+class FakeTransport:
+  """
+  Keeps the batches instead of sending them, for tests and local runs.
+  The first `failures` batches raise like a Postmark outage would, and recipients in `rejected` are refused.
+  """
+
+  def __init__(self, failures=0, rejected=()):
+    self.batches = []
+    self.failures = failures
+    self.rejected = set(rejected)
+    self.lock = threading.Lock()
+
+  def send(self, template, t_model, recipients, sender=None, tag=None):
+    with self.lock:
+      if self.failures:
+        self.failures -= 1
+        raise ConnectionError("Postmark is unavailable")
+      self.batches.append(list(recipients))
+    return {email: "Inactive recipient" for email in recipients if email in self.rejected}
+
+  @property
+  def sent(self):
+    return [email for batch in self.batches for email in batch if email not in self.rejected]
+
+
+def get_transport():
+  if is_test_mode():
+    return FakeTransport()
+  return PostmarkTransport()
+
+
+def send_broadcast_email(template, t_model, recipients, transport=None, sender=None, tag=None, on_batch=None,
+                         batch_size=None, workers=WORKERS, retries=RETRIES, retry_delay=RETRY_DELAY):
+  """
+  Sends a templated email to every recipient in batches, a few batches at a time, retrying batches that fail.
+
+  Returns the outcome of every batch, in order:
+  {"batch": number, "status": sent|failed, "attempts": int, "sent": [email], "failed": {email: error}, "error": str}.
+  on_batch is called with each outcome as soon as its batch is done.
+  """
+  transport = transport or get_transport()
+  batch_size = batch_size or BATCH_SIZE
+  t_model = {**t_model, "is_dev": is_dev_env()}
+  recipients = sorted({email for email in recipients if email})
+  batches = [recipients[i:i + batch_size] for i in range(0, len(recipients), batch_size)]
+
+  def deliver(number, batch):
+    outcome = {"batch": number, "status": FAILED, "attempts": 0, "sent": [], "failed": {}, "error": None}
+    for attempt in range(retries):
+      outcome["attempts"] = attempt + 1
+      try:
+        refused = transport.send(template, t_model, batch, sender=sender, tag=tag)
+      except Exception as e:
+        outcome["error"] = str(e)
+        log.error(f"Broadcast batch {number} failed (attempt {attempt + 1} of {retries}): {str(e)}")
+        if attempt + 1 < retries:
+          time.sleep(retry_delay * 2 ** attempt)
+        continue
+
+      outcome.update(status=SENT, error=None, failed=refused, sent=[email for email in batch if email not in refused])
+      return outcome
+
+    outcome["failed"] = {email: outcome["error"] for email in batch}
+    return outcome
+
+  outcomes = []
+  with ThreadPoolExecutor(max_workers=max(1, min(workers, len(batches)))) as executor:
+    futures = [executor.submit(deliver, number, batch) for number, batch in enumerate(batches)]
+    for future in as_completed(futures):
+      outcome = future.result()
+      outcomes.append(outcome)
+      if on_batch:
+        on_batch(outcome)
+
+  return sorted(outcomes, key=lambda outcome: outcome["batch"])
@@ -0,0 +1,77 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    A bounded, thread-safe, least-recently-used cache of strings (or bytes).
+
+    Entries are evicted when either the number of entries or the total size (len) of the cached
+    values goes over its limit. Hits and misses are counted so they can be reported as metrics.
+    """
+
+    def __init__(self, max_entries, max_size):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        return self._size
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def get_many(self, keys):
+        """
+        Returns a dict of the cached values for the keys that are in the cache
+        """
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def set(self, key, value):
+        self.set_many({key: value})
+
+    def set_many(self, items: dict):
+        with self._lock:
+            for key, value in items.items():
+                value_size = len(value)
+                if value_size > self.max_size:
+                    continue
+                if key in self._entries:
+                    self._size -= len(self._entries.pop(key))
+                self._entries[key] = value
+                self._size += value_size
+            self._evict()
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_size):
+            _, value = self._entries.popitem(last=False)
+            self._size -= len(value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
@@ -7,6 +7,7 @@ errors to the caller of a particular route
 from django.http import JsonResponse
 from collections.abc import Iterable
 import json
+from _main_.utils.route_profiler import route_profiler
 
 class MassenergizeResponse(JsonResponse):
   def __init__(self, data=None, error=None, status=200): 
@@ -19,12 +20,13 @@ class MassenergizeResponse(JsonResponse):
 
     response = {"data": data, "error": error,"success": not error, "cursor": cursor}
     
-    super().__init__(
-      response, 
-      safe=True, 
-      # json_dumps_params={'indent': 2}, 
-      status=status
-    )
+    with route_profiler.serializing():
+      super().__init__(
+        response, 
+        safe=True, 
+        # json_dumps_params={'indent': 2}, 
+        status=status
+      )
   
   def toDict(self):
     return json.loads(str(self.content, encoding='utf8'))
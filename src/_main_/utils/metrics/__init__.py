@@ -1,10 +1,10 @@
 import time
 import functools
 import boto3
-import threading
 import random 
 from _main_.settings import EnvConfig
 from _main_.utils.massenergize_logger import log
+from _main_.utils.metrics.aggregator import metrics_aggregator
 
 DEFAULT_CAPTURE_RATE = .7 # for now we want to capture 50% of the logs.
 FUNCTION_LATENCY_NAMESPACE = "ApiService/FunctionPerformance"
@@ -27,9 +27,8 @@ def timed(func):
                 # calculate the execution time in milliseconds
                 execution_time = (time.time() - start_time) * 1000  # Convert to milliseconds
                 
-                # we don't want to wait for the metrics to be sent before returning
-                # so we do it in a different thread.
-                threading.Thread(target=send_metric, args=(func, execution_time,)).start()
+                # this only queues the value; the metrics aggregator sends it in the background
+                send_metric(func, execution_time)
 
     wrap.__doc__ = func.__doc__
     wrap.__name__ = func.__name__
@@ -43,17 +42,8 @@ def send_metric(func, execution_time, name_space=FUNCTION_LATENCY_NAMESPACE, ext
     if extra_dimensions:
         dimensions.extend(extra_dimensions)
 
-    metric_data=[
-        {
-            'MetricName': metric_name,
-            'Dimensions': dimensions,
-            'Unit': 'Milliseconds',
-            'Value': execution_time
-        },
-    ]
-
     env_name_space = f"{EnvConfig.name.title()}/{name_space}"
-    put_metric_data(env_name_space, metric_data)
+    metrics_aggregator.record(env_name_space, metric_name, execution_time, unit='Milliseconds', dimensions=dimensions)
 
 
 def put_metric_data(name_space, metric_data):
@@ -86,8 +76,8 @@ def timed_with_dimensions(dimensions=None, capture_rate=DEFAULT_CAPTURE_RATE):
                 if random.random() < capture_rate:
                     # If the random number exceeds the chance/capture_rate, just just stop
                     execution_time = (time.time() - start_time) * 1000  # Convert to milliseconds
-                    # Start a new thread to send the metric without waiting for it to complete
-                    threading.Thread(target=send_metric, args=(func, execution_time,)).start()
+                    # this only queues the value; the metrics aggregator sends it in the background
+                    send_metric(func, execution_time)
 
         return wrapper
     
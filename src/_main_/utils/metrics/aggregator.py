@@ -0,0 +1,179 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+import boto3
+
+from _main_.settings import EnvConfig
+from _main_.utils.massenergize_logger import log
+from _main_.utils.utils import is_test_mode
+
+FLUSH_INTERVAL = 60  # seconds
+DRAIN_INTERVAL = 1  # seconds
+MAX_QUEUE_SIZE = 10000
+MAX_METRIC_DATA_PER_REQUEST = 1000  # CloudWatch PutMetricData limit
+
+
+class CloudWatchSink:
+    """
+    Sends batches of metric data to CloudWatch, using one client per process
+    """
+
+    def __init__(self):
+        self._client = None
+
+    def send(self, name_space, metric_data):
+        if not EnvConfig.can_send_logs_to_cloudwatch():
+            return
+        if self._client is None:
+            self._client = boto3.client('cloudwatch')
+        self._client.put_metric_data(Namespace=name_space, MetricData=metric_data)
+
+
+class InMemorySink:
+    """
+    Keeps every batch that would have been sent, for tests and local runs
+    """
+
+    def __init__(self):
+        self.batches = []
+
+    def send(self, name_space, metric_data):
+        self.batches.append((name_space, metric_data))
+
+    def metric_data(self, name_space=None):
+        return [
+            datum
+            for batch_name_space, batch in self.batches
+            if name_space is None or batch_name_space == name_space
+            for datum in batch
+        ]
+
+    def clear(self):
+        self.batches = []
+
+
+class MetricsAggregator:
+    """
+    Collects metric values from request threads on a bounded queue. A single background thread
+    aggregates them into statistic sets (count/sum/min/max) per namespace, metric, unit and
+    dimensions, and sends them to the sink in batches every flush_interval seconds.
+
+    Values recorded while the queue is full are dropped rather than blocking the caller.
+    """
+
+    def __init__(self, sink, flush_interval=FLUSH_INTERVAL, max_queue_size=MAX_QUEUE_SIZE):
+        self.sink = sink
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._stats = {}
+        self._window_start = None
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+
+    def record(self, name_space, metric_name, value, unit='Milliseconds', dimensions=None):
+        self._ensure_worker()
+        key = (
+            name_space,
+            metric_name,
+            unit,
+            tuple((d['Name'], d['Value']) for d in dimensions or []),
+        )
+        try:
+            self._queue.put_nowait((key, value))
+        except queue.Full:
+            self.dropped += 1
+
+    def record_metric_data(self, name_space, metric_data):
+        """
+        Records data points given in the PutMetricData format
+        """
+        for datum in metric_data:
+            self.record(
+                name_space,
+                datum['MetricName'],
+                datum['Value'],
+                unit=datum.get('Unit', 'None'),
+                dimensions=datum.get('Dimensions'),
+            )
+
+    def flush(self):
+        """
+        Aggregates everything queued so far and sends it to the sink
+        """
+        with self._lock:
+            self._drain()
+            stats, self._stats = self._stats, {}
+            timestamp, self._window_start = self._window_start, None
+
+        by_name_space = {}
+        for (name_space, metric_name, unit, dimensions), (count, total, minimum, maximum) in stats.items():
+            by_name_space.setdefault(name_space, []).append({
+                'MetricName': metric_name,
+                'Dimensions': [{'Name': name, 'Value': value} for name, value in dimensions],
+                'StatisticValues': {
+                    'SampleCount': count,
+                    'Sum': total,
+                    'Minimum': minimum,
+                    'Maximum': maximum,
+                },
+                'Unit': unit,
+                'Timestamp': timestamp,
+            })
+
+        for name_space, metric_data in by_name_space.items():
+            for i in range(0, len(metric_data), MAX_METRIC_DATA_PER_REQUEST):
+                try:
+                    self.sink.send(name_space, metric_data[i:i + MAX_METRIC_DATA_PER_REQUEST])
+                except Exception as e:
+                    log.exception(e)
+
+    def _drain(self):
+        while True:
+            try:
+                key, value = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self._add(key, value)
+
+    def _add(self, key, value):
+        if self._window_start is None:
+            self._window_start = datetime.now(timezone.utc)
+        stats = self._stats.get(key)
+        if stats is None:
+            self._stats[key] = (1, value, value, value)
+        else:
+            count, total, minimum, maximum = stats
+            self._stats[key] = (count + 1, total + value, min(minimum, value), max(maximum, value))
+
+    def _ensure_worker(self):
+        # a forked worker process does not inherit the parent's thread
+        if self._worker is not None and self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker_pid == os.getpid():
+                return
+            self._worker_pid = os.getpid()
+            self._worker = threading.Thread(target=self._run, name="metrics-aggregator", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        next_flush = time.monotonic() + self.flush_interval
+        while True:
+            time.sleep(DRAIN_INTERVAL)
+            # keep the queue short between flushes
+            with self._lock:
+                self._drain()
+
+            if time.monotonic() >= next_flush:
+                self.flush()
+                next_flush = time.monotonic() + self.flush_interval
+
+
+metrics_aggregator = MetricsAggregator(InMemorySink() if is_test_mode() else CloudWatchSink())
+atexit.register(metrics_aggregator.flush)
@@ -1,13 +1,13 @@
 import time
-import boto3
+from _main_.settings import EnvConfig
 from _main_.utils.massenergize_logger import log
 from django.utils.deprecation import MiddlewareMixin
-from _main_.utils.utils import run_in_background
+from _main_.utils.metrics.aggregator import metrics_aggregator
+
+REQUEST_LATENCY_NAMESPACE = "ApiService/RequestPerformance"
+
 
 class MetricsMiddleware(MiddlewareMixin):
-    def __init__(self, get_response=None):
-        super().__init__(get_response)
-        self.cloudwatch = boto3.client('cloudwatch')
 
     def process_request(self, request):
         request.start_time = time.time()
@@ -16,7 +16,6 @@ class MetricsMiddleware(MiddlewareMixin):
         self.log_the_time_taken_to_complete_request(request)
         return response
 
-    @run_in_background
     def log_the_time_taken_to_complete_request(self, request):
         if not hasattr(request, 'start_time'):
             return
@@ -27,3 +26,13 @@ class MetricsMiddleware(MiddlewareMixin):
             extra={"path": request.path, "latency": latency}
         )
 
+        # use the matched route rather than the raw path, so urls with ids or slugs share one metric
+        route = getattr(getattr(request, 'resolver_match', None), 'route', None)
+        if route:
+            metrics_aggregator.record(
+                f"{EnvConfig.name.title()}/{REQUEST_LATENCY_NAMESPACE}",
+                "RequestLatency",
+                latency,
+                unit='Milliseconds',
+                dimensions=[{'Name': 'Route', 'Value': route}],
+            )
@@ -1,34 +1,46 @@
+import base64
+import json
+
 from django.core.paginator import Paginator, EmptyPage
+from django.db.models import F, Q, QuerySet
 from _main_.utils.common import serialize_all
 
+KEYSET_VALUE = "_keyset_value"
+
 
 def paginate(queryset, pagination_data):
+    if pagination_data.get('keyset') and isinstance(queryset, QuerySet) and not pagination_data.get('no_pagination'):
+        return keyset_paginate(queryset, pagination_data)
+
     try:
-        if not queryset:
-            return {"items":[], "cursor": {"next":0, "count":0 } }
-        
         limit = pagination_data.get('limit')
         page = pagination_data.get('next_page')
         no_pagination = pagination_data.get('no_pagination')
 
         if no_pagination:
+            if not queryset:
+                return {"items":[], "cursor": {"next":0, "count":0 } }
             return {
                 'cursor':{},
                 "items": serialize_all(queryset)
             }
-        paginator = Paginator(queryset, limit)
+        # the count is a COUNT(*) for querysets, and only the page's rows are loaded
+        paginator = Paginator([] if queryset is None else queryset, limit)
+        if not paginator.count:
+            return {"items":[], "cursor": {"next":0, "count":0 } }
+
         items = []
         next_page = paginator.page(page)
         cursor = {
             "next": next_page.next_page_number() if next_page.has_next() else next_page.paginator.num_pages,
-            "count":len(queryset)
+            "count": paginator.count
         }
         items = serialize_all(list(next_page))
         to_return = {
             'cursor':cursor,
             "items": items
         }
-        
+
         return to_return
     except EmptyPage:
         return {
@@ -37,3 +49,76 @@ def paginate(queryset, pagination_data):
         }
 
 
+def encode_cursor(value, pk):
+    return base64.urlsafe_b64encode(json.dumps([value, pk], default=str).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    (sort key value, pk) of the last item of the previous page, None for the first page
+    """
+    if not cursor:
+        return None
+    try:
+        value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        return value, pk
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+
+def get_sort_key(queryset):
+    """
+    (field, descending) of the first field the queryset is ordered by, ("pk", False) if it is not ordered
+    """
+    ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering or [])
+    for field in ordering:
+        if isinstance(field, str) and field != "?":
+            return field.lstrip("-"), field.startswith("-")
+    return "pk", False
+
+
+def keyset_paginate(queryset, pagination_data):
+    """
+    Pages through a queryset with an opaque cursor over (sort key, pk) instead of an OFFSET, so every
+    page costs the same however deep it is. Rows with no value for the sort key come last.
+
+    The response has the same shape as paginate's: cursor.next is the cursor of the next page ("" after
+    the last page), and cursor.count the total number of rows, only counted if with_count was asked.
+    """
+    limit = int(pagination_data.get('limit'))
+    field, descending = get_sort_key(queryset)
+    try:
+        after = decode_cursor(pagination_data.get('cursor'))
+    except ValueError:
+        return {
+            'cursor': {},
+            "items": []
+        }
+
+    sort = F(field).desc(nulls_last=True) if descending else F(field).asc(nulls_last=True)
+    page = queryset.annotate(**{KEYSET_VALUE: F(field)}).order_by(sort, "-pk" if descending else "pk")
+
+    if after:
+        value, pk = after
+        next_pk = Q(pk__lt=pk) if descending else Q(pk__gt=pk)
+        if value is None:
+            page = page.filter(Q(**{f"{field}__isnull": True}) & next_pk)
+        else:
+            further = Q(**{f"{field}__lt" if descending else f"{field}__gt": value})
+            page = page.filter(
+                further | (Q(**{field: value}) & next_pk) | Q(**{f"{field}__isnull": True})
+            )
+
+    rows = list(page[:limit + 1])
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+
+    last = rows[-1] if rows else None
+    cursor = {
+        "next": encode_cursor(getattr(last, KEYSET_VALUE), last.pk) if has_next else "",
+        "count": queryset.count() if pagination_data.get('with_count') else None,
+    }
+    return {
+        'cursor': cursor,
+        "items": serialize_all(rows),
+    }
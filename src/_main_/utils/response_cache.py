@@ -0,0 +1,161 @@
+"""
+Two-tier cache for the responses of public, read-only routes.
+
+A response is looked up in a per-process LRU first, then in the shared Django cache. Keys are built
+from the route, the full normalized request args, the sandbox flag, the language and the caller's
+role, plus the current version of every model the route depends on. Saving, deleting or changing a
+many-to-many relation of one of those models (see connect_invalidation_signals) gives the model a new
+version, so every cached response that depends on it is missed from then on and ages out.
+
+Writes that skip model signals (queryset.update(), bulk_create) must call response_cache.invalidate().
+"""
+import json
+import os
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from _main_.utils.lru_cache import LRUCache
+from _main_.utils.massenergize_logger import log
+from _main_.utils.utils import is_test_mode, make_hash
+
+# test cases roll back rows (and the db-backed cache) without a save, so the cache is off there by default
+RESPONSE_CACHE_ENABLED = os.environ.get("RESPONSE_CACHE_ENABLED", "false" if is_test_mode() else "true").lower() in ("1", "true", "yes")
+RESPONSE_CACHE_TIMEOUT = 60 * 60  # seconds, for the shared tier
+RESPONSE_CACHE_MAX_ENTRIES = 1000
+RESPONSE_CACHE_MAX_SIZE = 128 * 1024 * 1024  # bytes
+VERSION_CHECK_INTERVAL = 5  # seconds
+
+
+def model_tag(model):
+    return model._meta.label_lower
+
+
+def caller_role(context):
+    if not context.user_is_logged_in:
+        return "anonymous"
+    if context.user_is_super_admin:
+        return "super_admin"
+    if context.user_is_community_admin:
+        return "community_admin"
+    # signed in users also see their own unpublished content
+    return f"user:{context.user_id}"
+
+
+class ResponseCache:
+    """
+    Per-process LRU over the shared cache, with a version per model tag kept in the shared cache.
+
+    Each process re-reads the versions of the tags it uses at most once every version_check_interval
+    seconds; the process doing a write sees the new version straight away.
+    """
+
+    VERSION_KEY_PREFIX = "response_cache.version."
+    RESPONSE_KEY_PREFIX = "response_cache.response."
+
+    def __init__(self, enabled=RESPONSE_CACHE_ENABLED, timeout=RESPONSE_CACHE_TIMEOUT,
+                 version_check_interval=VERSION_CHECK_INTERVAL):
+        self.enabled = enabled
+        self.timeout = timeout
+        self.version_check_interval = version_check_interval
+        self.lru = LRUCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_SIZE)
+        self.tracked_tags = set()
+        self._versions = {}
+        self._checked_at = 0
+        self._lock = threading.Lock()
+
+    def track(self, *models):
+        self.tracked_tags.update(model_tag(model) for model in models)
+
+    def invalidate(self, *models):
+        tags = [model_tag(model) for model in models]
+        versions = {tag: uuid.uuid4().hex for tag in tags}
+        with self._lock:
+            self._versions.update(versions)
+        try:
+            cache.set_many({self.VERSION_KEY_PREFIX + tag: version for tag, version in versions.items()}, timeout=None)
+        except Exception as e:
+            log.exception(e)
+
+    def versions(self, tags):
+        now = time.monotonic()
+        with self._lock:
+            stale = now - self._checked_at >= self.version_check_interval
+            missing = [tag for tag in tags if tag not in self._versions]
+        if stale or missing:
+            to_read = sorted(self.tracked_tags.union(tags)) if stale else missing
+            try:
+                shared = cache.get_many([self.VERSION_KEY_PREFIX + tag for tag in to_read])
+            except Exception as e:
+                log.exception(e)
+                shared = {}
+            with self._lock:
+                for tag in to_read:
+                    # a tag nobody wrote to yet gets a version so it can be bumped later
+                    self._versions[tag] = shared.get(self.VERSION_KEY_PREFIX + tag) or self._versions.get(tag) or ""
+                if stale:
+                    self._checked_at = now
+        with self._lock:
+            return {tag: self._versions[tag] for tag in tags}
+
+    def make_key(self, route, context, tags):
+        return make_hash(json.dumps({
+            "route": route,
+            "args": context.args,
+            "is_sandbox": context.is_sandbox,
+            "language": context.preferred_language,
+            "role": caller_role(context),
+            "versions": self.versions(tags),
+        }, sort_keys=True, default=str))
+
+    def get(self, key):
+        content = self.lru.get(key)
+        if content is not None:
+            return content
+        try:
+            content = cache.get(self.RESPONSE_KEY_PREFIX + key)
+        except Exception as e:
+            log.exception(e)
+            return None
+        if content is not None:
+            self.lru.set(key, content)
+        return content
+
+    def set(self, key, content):
+        self.lru.set(key, content)
+        try:
+            cache.set(self.RESPONSE_KEY_PREFIX + key, content, timeout=self.timeout)
+        except Exception as e:
+            log.exception(e)
+
+    def clear(self):
+        self.lru.clear()
+        with self._lock:
+            self._versions = {}
+            self._checked_at = 0
+
+    def _on_change(self, sender, **kwargs):
+        models = [sender]
+        instance = kwargs.get("instance")
+        if instance is not None:
+            models.append(type(instance))
+        if kwargs.get("model") is not None:
+            # m2m_changed: the model on the other side of the relation
+            models.append(kwargs["model"])
+
+        changed = [model for model in models if model_tag(model) in self.tracked_tags]
+        if changed and kwargs.get("action", "post_").startswith("post_"):
+            self.invalidate(*changed)
+
+
+response_cache = ResponseCache()
+
+
+def connect_invalidation_signals():
+    post_save.connect(response_cache._on_change, dispatch_uid="response_cache.post_save")
+    post_delete.connect(response_cache._on_change, dispatch_uid="response_cache.post_delete")
+    m2m_changed.connect(response_cache._on_change, dispatch_uid="response_cache.m2m_changed")
+
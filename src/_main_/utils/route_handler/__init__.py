@@ -2,6 +2,7 @@ from types import FunctionType as function
 from django.urls import path
 from _main_.utils.validator import Validator
 from _main_.utils.metrics import timed
+from _main_.utils.route_profiler import route_profiler
 
 class RouteHandler:
   """
@@ -13,7 +14,8 @@ class RouteHandler:
 
   def add(self, route: str, view: function) -> bool:
     path = route[1:]
-    self.routes[path] = timed(view) # for now we want to time every handler
+    # for now we want to time every handler; profiling only runs when ROUTE_PROFILER_ENABLED is set
+    self.routes[path] = timed(route_profiler.profile(route, view))
 
   def get_routes_to_views(self):
     res = []
@@ -0,0 +1,198 @@
+"""
+Opt-in, per-request profiling for the routes registered through RouteHandler.
+
+When ROUTE_PROFILER_ENABLED is set, every request records the number of SQL queries it ran,
+the time spent in the database, queries that ran repeatedly with different parameters
+(usually an N+1 pattern in a full_json), the time spent serializing the response and the
+response size. The last ROUTE_PROFILER_BUFFER_SIZE requests are kept in memory per process.
+"""
+import functools
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from django.db import connection
+
+PROFILER_ENABLED = os.environ.get("ROUTE_PROFILER_ENABLED", "").lower() in ("1", "true", "yes")
+PROFILER_BUFFER_SIZE = int(os.environ.get("ROUTE_PROFILER_BUFFER_SIZE", 500))
+DUPLICATE_QUERY_THRESHOLD = 2
+MAX_FINGERPRINT_LENGTH = 300
+
+PLACEHOLDER_LIST = re.compile(r"\((?:\s*%s\s*,)+\s*%s\s*\)")
+
+
+def fingerprint(sql):
+    # queries only differing in their parameters (or in the length of an IN list) share a fingerprint
+    return PLACEHOLDER_LIST.sub("(...)", sql)
+
+
+def shorten(sql):
+    # keep both ends: the tables up front, the WHERE clause at the back
+    if len(sql) <= MAX_FINGERPRINT_LENGTH:
+        return sql
+    half = MAX_FINGERPRINT_LENGTH // 2
+    return sql[:half] + " ... " + sql[-half:]
+
+
+class RequestProfile:
+    def __init__(self, route):
+        self.route = route
+        self.started_at = datetime.now(timezone.utc)
+        self.latency = 0
+        self.query_count = 0
+        self.db_time = 0
+        self.serialization_time = 0
+        self.serialization_query_count = 0
+        self.response_size = 0
+        self.fingerprints = Counter()
+
+    def duplicate_queries(self):
+        return [
+            {"query": shorten(query), "count": count}
+            for query, count in self.fingerprints.most_common()
+            if count >= DUPLICATE_QUERY_THRESHOLD
+        ]
+
+    def to_json(self):
+        return {
+            "route": self.route,
+            "started_at": self.started_at.isoformat(),
+            "latency_ms": round(self.latency * 1000, 3),
+            "query_count": self.query_count,
+            "db_time_ms": round(self.db_time * 1000, 3),
+            "serialization_time_ms": round(self.serialization_time * 1000, 3),
+            "serialization_query_count": self.serialization_query_count,
+            "response_size": self.response_size,
+            "duplicate_queries": self.duplicate_queries(),
+        }
+
+
+class RouteProfiler:
+    def __init__(self, enabled=PROFILER_ENABLED, buffer_size=PROFILER_BUFFER_SIZE):
+        self.enabled = enabled
+        self._profiles = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def profile(self, route, view):
+        """
+        Wraps a view so its requests are profiled while the profiler is enabled
+        """
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return view(*args, **kwargs)
+
+            profile = RequestProfile(route)
+            self._local.profile = profile
+            self._local.serialization_depth = 0
+            start_time = time.perf_counter()
+            try:
+                with connection.execute_wrapper(self._record_query):
+                    response = view(*args, **kwargs)
+                content = getattr(response, "content", None)
+                profile.response_size = len(content) if content is not None else 0
+                return response
+            finally:
+                profile.latency = time.perf_counter() - start_time
+                self._local.profile = None
+                with self._lock:
+                    self._profiles.append(profile)
+
+        wrapper.__doc__ = view.__doc__
+        wrapper.__name__ = getattr(view, "__name__", route)
+        return wrapper
+
+    @contextmanager
+    def serializing(self):
+        """
+        Counts the time (and the queries) spent in the block towards the serialization of the current request
+        """
+        profile = getattr(self._local, "profile", None)
+        if profile is None:
+            yield
+            return
+
+        # nested serializers (a full_json calling serialize_all) are only counted once
+        self._local.serialization_depth += 1
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._local.serialization_depth -= 1
+            if self._local.serialization_depth == 0:
+                profile.serialization_time += time.perf_counter() - start_time
+
+    def serializer(self, func):
+        """
+        Decorator form of serializing()
+        """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.serializing():
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def _record_query(self, execute, sql, params, many, context):
+        profile = getattr(self._local, "profile", None)
+        start_time = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if profile is not None:
+                profile.db_time += time.perf_counter() - start_time
+                profile.query_count += 1
+                profile.fingerprints[fingerprint(sql)] += 1
+                if self._local.serialization_depth:
+                    profile.serialization_query_count += 1
+
+    def entries(self, route=None):
+        with self._lock:
+            profiles = list(self._profiles)
+        return [p.to_json() for p in profiles if route is None or p.route == route]
+
+    def summary(self):
+        """
+        Per route aggregates over the requests in the buffer, slowest routes first
+        """
+        with self._lock:
+            profiles = list(self._profiles)
+
+        by_route = {}
+        for profile in profiles:
+            by_route.setdefault(profile.route, []).append(profile)
+
+        summary = []
+        for route, route_profiles in by_route.items():
+            n = len(route_profiles)
+            duplicates = Counter()
+            for profile in route_profiles:
+                for duplicate in profile.duplicate_queries():
+                    duplicates[duplicate["query"]] = max(duplicates[duplicate["query"]], duplicate["count"])
+            summary.append({
+                "route": route,
+                "requests": n,
+                "avg_latency_ms": round(sum(p.latency for p in route_profiles) / n * 1000, 3),
+                "avg_query_count": round(sum(p.query_count for p in route_profiles) / n, 2),
+                "max_query_count": max(p.query_count for p in route_profiles),
+                "avg_db_time_ms": round(sum(p.db_time for p in route_profiles) / n * 1000, 3),
+                "avg_serialization_time_ms": round(sum(p.serialization_time for p in route_profiles) / n * 1000, 3),
+                "max_response_size": max(p.response_size for p in route_profiles),
+                "duplicate_queries": [{"query": q, "max_count": c} for q, c in duplicates.most_common(5)],
+            })
+        return sorted(summary, key=lambda s: s["avg_latency_ms"], reverse=True)
+
+    def export_json(self):
+        return json.dumps({"summary": self.summary(), "entries": self.entries()}, indent=2)
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+
+route_profiler = RouteProfiler()
@@ -3,13 +3,18 @@ import time
 from typing import List, Tuple, Union
 
 import json_flatten
+from django.utils import timezone
 
 from _main_.utils.massenergize_logger import log
+from _main_.utils.translation.lru_cache import invalidate_translation_lrus, text_translations_lru
 from _main_.utils.translation.metrics_tracker import TranslationMetrics
 from _main_.utils.translation.translator import MAGIC_TEXT, MAX_TEXT_SIZE, Translator
+from _main_.utils.translation.translator.dispatcher import dispatch_batches, RateLimiter
 from _main_.utils.utils import make_hash, run_in_background
 from database.models import TranslationsCache
 
+TRANSLATIONS_CACHE_BATCH_SIZE = 500
+
 JSON_EXCLUDE_KEYS = {
     'id', 'pk', 'file', 'media', 'date', 'link', 'url', 'icon', 'key', 'slug',"created_at", "updated_at", "code",
     "subdomain", "alias", "full_name", "preferred_name", "username",  "community", "website", "template_key"
@@ -45,14 +50,16 @@ EXCLUDED_KEY_PATTERNS = [
 
 
 class JsonTranslator(Translator):
-    def __init__ (self, dict_to_translate: Union[dict, list], exclude_keys=None, excluded_key_patterns=None):
-        super().__init__()
+    def __init__ (self, dict_to_translate: Union[dict, list], exclude_keys=None, excluded_key_patterns=None, provider=None):
+        super().__init__(provider)
         self.exclude_keys = set(exclude_keys) if exclude_keys else set()
         self.sep = '.'
         self.excluded_key_patterns = excluded_key_patterns or []
         self.dict_to_translate = dict_to_translate
         self.translations_cache = TranslationsCache()
         self.cached_translations = None
+        self.cache_hits = 0
+        self.cache_misses = 0
         self._flattened, self._excluded = self.flatten_json_for_translation(self.dict_to_translate)
 
     def flatten_json_for_translation(self, json_to_translate: Union[dict, list]):
@@ -136,25 +143,52 @@ class JsonTranslator(Translator):
 
     @run_in_background
     def cache_translations(sef, raw_texts, translated_text_list, target_language, source_language):
+        return sef.save_translations_to_cache(raw_texts, translated_text_list, target_language, source_language)
+
+    def save_translations_to_cache(self, raw_texts, translated_text_list, target_language, source_language):
+        """
+        Stores translations in the TranslationsCache: existing entries are looked up in one query and
+        updated in bulk, and the rest are inserted with a single bulk_create.
+        """
         try:
+            translations_by_hash = {}
             for text, translated_text in zip(raw_texts, translated_text_list):
-                _hash = make_hash(text)
-                existing_translations = TranslationsCache.objects.filter(
-                    hash=_hash,
-                    target_language_code=target_language,
-                    source_language_code=source_language
-                )
-                if not existing_translations.exists():
-                    TranslationsCache.objects.create(
+                translations_by_hash[make_hash(text)] = translated_text
+
+            existing_translations = list(TranslationsCache.objects.filter(
+                hash__in=translations_by_hash.keys(),
+                target_language_code=target_language,
+                source_language_code=source_language
+            ))
+
+            now = timezone.now()
+            for translation in existing_translations:
+                translation.translated_text = translations_by_hash[translation.hash]
+                translation.last_translated = now
+                translation.updated_at = now
+            TranslationsCache.objects.bulk_update(
+                existing_translations,
+                ["translated_text", "last_translated", "updated_at"],
+                batch_size=TRANSLATIONS_CACHE_BATCH_SIZE
+            )
+            # bulk_update skips TranslationsCache.save(), which empties the in-memory tiers
+            if existing_translations:
+                invalidate_translation_lrus()
+
+            existing_hashes = {translation.hash for translation in existing_translations}
+            TranslationsCache.objects.bulk_create(
+                [
+                    TranslationsCache(
                         hash=_hash,
                         target_language_code=target_language,
                         source_language_code=source_language,
                         translated_text=translated_text
                     )
-                else:
-                    for translation in existing_translations:
-                        translation.translated_text = translated_text
-                        translation.save()
+                    for _hash, translated_text in translations_by_hash.items()
+                    if _hash not in existing_hashes
+                ],
+                batch_size=TRANSLATIONS_CACHE_BATCH_SIZE
+            )
 
             return True
         except Exception as e:
@@ -166,25 +200,42 @@ class JsonTranslator(Translator):
         flattened_translated_dict = {}
         flattened_untranslated_dict = {}
 
-        flattened_values = list(self._flattened.values())
-        hashes = set(make_hash(value) for value in flattened_values)
-
-        translations = TranslationsCache.objects.filter(target_language_code=target_language, hash__in=hashes, source_language_code=source_language)
+        # the in-memory tier first, then the TranslationsCache table for whatever it does not have
+        hash_by_value = {value: make_hash(value) for value in set(self._flattened.values())}
+        cached = text_translations_lru.get_many([(source_language, target_language, _hash) for _hash in hash_by_value.values()])
+        translated_text_by_hash = {key[2]: translated_text for key, translated_text in cached.items()}
+        self.cache_hits, self.cache_misses = len(cached), len(hash_by_value) - len(cached)
+
+        missing_hashes = [_hash for _hash in hash_by_value.values() if _hash not in translated_text_by_hash]
+        if missing_hashes:
+            translations = TranslationsCache.objects.filter(
+                target_language_code=target_language,
+                hash__in=missing_hashes,
+                source_language_code=source_language
+            ).order_by("id").values_list("hash", "translated_text")
+
+            from_db = {}
+            for _hash, translated_text in translations:
+                from_db.setdefault(_hash, translated_text)
+            translated_text_by_hash.update(from_db)
+            text_translations_lru.set_many(
+                {(source_language, target_language, _hash): translated_text for _hash, translated_text in from_db.items()}
+            )
 
         for key, value in self._flattened.items():
-            hash_key = make_hash(value)
-            translation = translations.filter(hash=hash_key).first()
-            if translation:
-                flattened_translated_dict[key] = translation.translated_text
+            if hash_by_value[value] in translated_text_by_hash:
+                flattened_translated_dict[key] = translated_text_by_hash[hash_by_value[value]]
             else:
                 flattened_untranslated_dict[key] = value
 
         return flattened_translated_dict, flattened_untranslated_dict
 
 
-    def translate (self, source_language: str, destination_language: str) -> Tuple[dict, List[str], List[dict]]:
+    def translate (self, source_language: str, destination_language: str, cache: bool = True) -> Tuple[dict, List[str], List[dict]]:
         """
         Translate the flattened dictionary values from source_language to destination_language.
+        New translations are saved to the TranslationsCache in the background, unless cache is False,
+        in which case the caller is responsible for saving them.
 
         Returns:
             tuple: The translated dictionary in its original nested structure.
@@ -194,10 +245,6 @@ class JsonTranslator(Translator):
         untranslated_text_entries = list(untranslated_flattened.values())
         keys = list(untranslated_flattened.keys())
 
-        # TODO: We should parallelize this
-        #  We can plit the list into chunks of maybe 10 and
-        #  have the job of the translation done in several threads and the results combined.
-
         # convert values to text batches
         text_batches = self.convert_to_text_batches(untranslated_text_entries, max_batch_size = self.MAX_TEXT_SIZE)
         # Translate text batches
@@ -214,7 +261,12 @@ class JsonTranslator(Translator):
         translated_json.update(self._excluded)
 
         if len(untranslated_text_entries) > 0:
-            self.cache_translations(untranslated_text_entries, translated_text_entries, destination_language, source_language)
+            text_translations_lru.set_many({
+                (source_language, destination_language, make_hash(text)): translated_text
+                for text, translated_text in zip(untranslated_text_entries, translated_text_entries)
+            })
+            if cache:
+                self.cache_translations(untranslated_text_entries, translated_text_entries, destination_language, source_language)
 
         return self.unflatten_dict(translated_json), translated_text_entries, untranslated_text_entries
 
@@ -337,12 +389,12 @@ class JsonTranslator(Translator):
         Returns:
             list: List of translated text batches.
         """
-        translated_batches = []
-        for batch in text_batches:
-            translated = self.translate_batch(batch, source_language, destination_language)
-            translated_batches.append(translated)
-
-        return translated_batches
+        # batches go to the provider concurrently, within the provider's rate limit
+        return dispatch_batches(
+            lambda batch: self.translate_batch(batch, source_language, destination_language),
+            text_batches,
+            RateLimiter.for_provider(self.provider),
+        )
 
     def flatten_text_batches(self, text_batches : List[List[str]]):
         """
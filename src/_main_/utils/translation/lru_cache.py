@@ -0,0 +1,88 @@
+import time
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+from _main_.utils.lru_cache import LRUCache
+from _main_.utils.massenergize_logger import log
+from _main_.utils.utils import is_test_mode
+
+# per-process bounds for the in-memory translation tiers
+TEXT_TRANSLATIONS_MAX_ENTRIES = 50000
+TEXT_TRANSLATIONS_MAX_SIZE = 32 * 1024 * 1024  # characters
+RESPONSE_TRANSLATIONS_MAX_ENTRIES = 500
+RESPONSE_TRANSLATIONS_MAX_SIZE = 64 * 1024 * 1024  # characters
+
+
+class TranslationLRUCache(LRUCache):
+    """
+    An LRUCache that every process empties once a stored translation is edited or deleted.
+
+    invalidate() gives a named cache a new version in the shared cache once the write is committed, so
+    other processes cannot re-read the old rows under the new version. Each process compares its version
+    against that one at most once every VERSION_CHECK_INTERVAL seconds, and the process doing the write
+    clears its own entries straight away. Hits and misses are reported to TranslationMetrics.
+    """
+
+    VERSION_KEY_PREFIX = "translation_lru.version."
+    # test cases roll back rows (and the db-backed cache) without a save, so always re-check the version there
+    VERSION_CHECK_INTERVAL = 0 if is_test_mode() else 5  # seconds
+
+    def __init__(self, max_entries, max_size, name=None):
+        super().__init__(max_entries, max_size)
+        # unnamed caches are never invalidated by other processes
+        self.version_key = self.VERSION_KEY_PREFIX + name if name else None
+        self._version = None
+        self._checked_at = 0
+
+    def _check_version(self):
+        now = time.monotonic()
+        if not self.version_key or now - self._checked_at < self.VERSION_CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        try:
+            version = cache.get(self.version_key)
+        except Exception as e:
+            log.exception(e)
+            return
+        if version != self._version:
+            self._version = version
+            self.clear()
+
+    def get(self, key, default=None):
+        self._check_version()
+        return super().get(key, default)
+
+    def get_many(self, keys):
+        self._check_version()
+        return super().get_many(keys)
+
+    def invalidate(self):
+        version = uuid.uuid4().hex
+        self._version = version
+        self._checked_at = time.monotonic()
+        self.clear()
+        if self.version_key:
+            transaction.on_commit(lambda: self._publish_version(version))
+
+    def _publish_version(self, version):
+        try:
+            cache.set(self.version_key, version, timeout=None)
+        except Exception as e:
+            log.exception(e)
+
+
+# (source language, target language, hash of the text) -> translated text
+text_translations_lru = TranslationLRUCache(TEXT_TRANSLATIONS_MAX_ENTRIES, TEXT_TRANSLATIONS_MAX_SIZE, name="text")
+
+# (target language, request path, hash of the response content) -> translated response content
+response_translations_lru = TranslationLRUCache(RESPONSE_TRANSLATIONS_MAX_ENTRIES, RESPONSE_TRANSLATIONS_MAX_SIZE, name="response")
+
+
+def invalidate_translation_lrus():
+    """
+    Called when stored translations change in place: translated responses are built from them too
+    """
+    text_translations_lru.invalidate()
+    response_translations_lru.invalidate()
@@ -1,6 +1,5 @@
-import threading
 from _main_.utils.common import parse_datetime_to_aware
-from _main_.utils.metrics import put_metric_data
+from _main_.utils.metrics.aggregator import metrics_aggregator
 from _main_.utils.utils import calc_string_list_length
 from _main_.settings import EnvConfig
 
@@ -19,14 +18,15 @@ class TranslationMetrics:
 
     def record_metrics_on_cloudwatch(self, metric_data):
         """
-        Records the given metric data on AWS CloudWatch.
+        Records the given metric data on AWS CloudWatch. The data points are aggregated and sent
+        in batches by the metrics aggregator.
 
         Args:
             metric_data (list): A list of dictionaries containing metric data to be recorded.
         """
         env_name_space = f"{EnvConfig.name.title()}/{self.name_space}"
 
-        threading.Thread(target=put_metric_data, args=(env_name_space, metric_data)).start()
+        metrics_aggregator.record_metric_data(env_name_space, metric_data)
 
     def track_language_usage_count(self, destination_language):
         """
@@ -134,4 +134,42 @@ class TranslationMetrics:
                 'Timestamp': self.time_stamp,
             },
         ]
-        self.record_metrics_on_cloudwatch(metric_data)
\ No newline at end of file
+        self.record_metrics_on_cloudwatch(metric_data)
+
+    def track_translation_cache_usage(self, cache_tier, target_language, hits, misses):
+        """
+        Tracks hits and misses of an in-memory translation cache tier.
+
+        Args:
+            cache_tier (str): Which cache was used, eg. "Text" or "Response".
+            target_language (str): The language code of the target text.
+            hits (int): Number of lookups answered from the cache.
+            misses (int): Number of lookups that had to go to the database or translation provider.
+        """
+        dimensions = [
+            {
+                'Name': 'CacheTier',
+                'Value': cache_tier,
+            },
+            {
+                'Name': 'TargetLanguage',
+                'Value': target_language,
+            },
+        ]
+        metric_data = [
+            {
+                'MetricName': "TranslationCacheHits",
+                'Dimensions': dimensions,
+                "Value": hits,
+                'Unit': 'Count',
+                'Timestamp': self.time_stamp,
+            },
+            {
+                'MetricName': "TranslationCacheMisses",
+                'Dimensions': dimensions,
+                "Value": misses,
+                'Unit': 'Count',
+                'Timestamp': self.time_stamp,
+            },
+        ]
+        self.record_metrics_on_cloudwatch(metric_data)
@@ -1,11 +1,13 @@
 """
 This file contains utility functions for interacting with google translate
 """
+import os
 import time
 from typing import List
 
 from _main_.utils.massenergize_logger import log
 from _main_.utils.translation.metrics_tracker import TranslationMetrics
+from _main_.utils.translation.translator.providers.fake_translator import FakeTranslator
 from _main_.utils.translation.translator.providers.google_translate import GoogleTranslate
 from _main_.utils.translation.translator.providers.microsoft_translator import MicrosoftTranslator
 
@@ -17,13 +19,14 @@ from _main_.utils.translation.translator.providers.microsoft_translator import M
 MAGIC_TEXT = "|||"  # This is used to separate text items or sentences within a block during translation
 MAX_TEXT_SIZE = 5000
 BATCH_LIMIT = 100
-TRANSLATION_PROVIDER = "google"
+TRANSLATION_PROVIDER = os.getenv("TRANSLATION_PROVIDER", "google")
 
 class Translator:
     def __init__ (self, provider = None, use_fallback = True):
         self.__providers_config = {
             "google": GoogleTranslate,
             "microsoft": MicrosoftTranslator,
+            "fake": FakeTranslator,
         }
         self.__default_provider = "google"
         self.__init_provider(provider, use_fallback)
@@ -0,0 +1,79 @@
+"""
+Sends translation batches to a provider concurrently, keeping the results in the order of the batches.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from _main_.utils.massenergize_logger import log
+
+MAX_WORKERS = 4
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5  # seconds, doubled on every retry
+DEFAULT_REQUESTS_PER_SECOND = 10
+
+
+class RateLimiter:
+    """
+    A token bucket shared by every thread of the process that calls the same provider
+    """
+    _limiters = {}
+    _limiters_lock = threading.Lock()
+
+    def __init__(self, requests_per_second):
+        self.requests_per_second = requests_per_second
+        self._tokens = requests_per_second
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_provider(cls, provider):
+        name = type(provider).__name__
+        with cls._limiters_lock:
+            if name not in cls._limiters:
+                cls._limiters[name] = cls(getattr(provider, "REQUESTS_PER_SECOND", DEFAULT_REQUESTS_PER_SECOND))
+            return cls._limiters[name]
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.requests_per_second, self._tokens + (now - self._updated_at) * self.requests_per_second)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.requests_per_second
+            time.sleep(wait)
+
+
+def call_with_retries(func, *args, max_retries=MAX_RETRIES, backoff=RETRY_BACKOFF):
+    for attempt in range(max_retries + 1):
+        try:
+            return func(*args)
+        except Exception as e:
+            if attempt == max_retries:
+                raise
+            log.error(f"Translation attempt {attempt + 1} failed, retrying: {str(e)}")
+            time.sleep(backoff * (2 ** attempt))
+
+
+def dispatch_batches(translate_batch, batches, rate_limiter, max_workers=MAX_WORKERS, max_retries=MAX_RETRIES, backoff=RETRY_BACKOFF):
+    """
+    Runs translate_batch(batch) for every batch on a bounded pool of threads, waiting on the
+    rate limiter before each provider call and retrying failed calls with exponential backoff.
+
+    Returns the translated batches in the same order as the batches given. If a batch still fails
+    after its retries, the error is raised once the other calls are done.
+    """
+    def translate(batch):
+        def limited_call(b):
+            rate_limiter.acquire()
+            return translate_batch(b)
+        return call_with_retries(limited_call, batch, max_retries=max_retries, backoff=backoff)
+
+    if len(batches) <= 1:
+        return [translate(batch) for batch in batches]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+        return list(executor.map(translate, batches))
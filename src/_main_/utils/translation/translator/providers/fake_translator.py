@@ -0,0 +1,41 @@
+import os
+import random
+import threading
+import time
+
+
+class FakeTranslator:
+    """
+    An offline translation provider for tests and benchmarks.
+
+    It "translates" by tagging each text with the target language, after sleeping for a
+    configurable latency, and can be made to fail a share of its calls so retries can be exercised.
+      FAKE_TRANSLATOR_LATENCY_MS : simulated round-trip time per call (default 0)
+      FAKE_TRANSLATOR_FAILURE_RATE : share of calls that raise, between 0 and 1 (default 0)
+    """
+    MAX_TEXT_SIZE = 5000
+    REQUESTS_PER_SECOND = 1000
+
+    def __init__(self, latency=None, failure_rate=None):
+        self.__name__ = "FakeTranslator"
+        self.latency = latency if latency is not None else float(os.getenv("FAKE_TRANSLATOR_LATENCY_MS", 0)) / 1000
+        self.failure_rate = failure_rate if failure_rate is not None else float(os.getenv("FAKE_TRANSLATOR_FAILURE_RATE", 0))
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def translate(self, text, source_language_code, target_language_code):
+        with self._lock:
+            self.calls += 1
+
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise Exception("FakeTranslator: simulated provider failure")
+
+        if isinstance(text, list):
+            return [self.fake_translation(t, target_language_code) for t in text]
+        return self.fake_translation(text, target_language_code)
+
+    @staticmethod
+    def fake_translation(text, target_language_code):
+        return f"[{target_language_code}] {text}"
@@ -7,6 +7,7 @@ from _main_.settings import GOOGLE_TRANSLATE_CLIENT
 
 class GoogleTranslate:
     MAX_TEXT_SIZE = 5000
+    REQUESTS_PER_SECOND = 10
 
     def __init__(self):
         self.__client: translate.Client = GOOGLE_TRANSLATE_CLIENT
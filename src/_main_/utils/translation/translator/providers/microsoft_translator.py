@@ -2,6 +2,7 @@ import os, requests, uuid
 
 class MicrosoftTranslator:
     MAX_TEXT_SIZE = 10000
+    REQUESTS_PER_SECOND = 10
 
     def __init__(self):
         self.set_up()
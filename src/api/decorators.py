@@ -6,9 +6,10 @@ from django.core.exceptions import PermissionDenied
 from django.http import HttpResponse
 from _main_.utils.context import Context
 from functools import wraps
-from _main_.utils.massenergize_errors import CustomMassenergizeError, NotAuthorizedError
+from _main_.utils.massenergize_errors import CustomMassenergizeError, MassEnergizeAPIError, NotAuthorizedError
 from _main_.utils.massenergize_logger import log
-from django.core.cache import cache
+from _main_.utils.massenergize_response import MassenergizeResponse
+from _main_.utils.response_cache import model_tag, response_cache
 
 def x_frame_options_exempt(view_func):
     @wraps(view_func)
@@ -88,31 +89,38 @@ def super_admins_only(function):
   wrap.__name__ = function.__name__
   return wrap
 
-def cached_request(func):
-    @wraps(func)
-    def wrapper(handler, request, *args, **kwargs):
-        context: Context = request.context
-        args = context.args
-
-        subdomain = args.get('subdomain', args.get("id", "None"))
-        locale = context.preferred_language or 'en'
-
-        force_refresh = context.args.get('force_refresh', False)
-
-        if force_refresh:
-            cache.delete(f"{func.__module__}.{func.__name__}.{subdomain}.{locale}")
-
-        cache_key = f"{func.__module__}.{func.__name__}.{subdomain}.{locale}"
-        cached_data = cache.get(cache_key)
-
-        if cached_data and not force_refresh:
-            return cached_data
-        else:
-            result = func(handler,request,**kwargs)
-            cache.set(cache_key, result)
+def cached_request(*models):
+    """
+    Caches the successful responses of a handler method. models are the models whose rows end up in
+    the response; a change to any of them invalidates it.
+    """
+    response_cache.track(*models)
+    tags = [model_tag(model) for model in models]
+
+    def decorator(func):
+        route = f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper(handler, request, *args, **kwargs):
+            context: Context = request.context
+            if not response_cache.enabled:
+                return func(handler, request, *args, **kwargs)
+
+            force_refresh = context.args.pop("force_refresh", False)
+            key = response_cache.make_key(route, context, tags)
+
+            content = None if force_refresh else response_cache.get(key)
+            if content is not None:
+                response = MassenergizeResponse()
+                response.content = content
+                return response
+
+            result = func(handler, request, *args, **kwargs)
+            if isinstance(result, MassenergizeResponse) and not isinstance(result, MassEnergizeAPIError) \
+                    and result.status_code == 200:
+                response_cache.set(key, result.content)
             return result
 
-    wrapper.__doc__ = func.__doc__
-    wrapper.__name__ = func.__name__
+        return wrapper
 
-    return wrapper
\ No newline at end of file
+    return decorator
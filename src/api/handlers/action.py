@@ -6,6 +6,8 @@ from _main_.utils.massenergize_response import MassenergizeResponse
 #from types import FunctionType as function
 from _main_.utils.context import Context
 from api.decorators import admins_only, cached_request, super_admins_only, login_required
+from carbon_calculator.models import Action as CCAction, Category as CCCategory, Subcategory as CCSubcategory
+from database.models import Action, Community, Media, Tag, UserActionRel, UserProfile, Vendor
 from api.store.common import expect_media_fields
 
 
@@ -111,7 +113,7 @@ class ActionHandler(RouteHandler):
       return err
     return MassenergizeResponse(data=action_info)
 
-  # @cached_request
+  @cached_request(Action, Community, Media, Tag, Vendor, UserActionRel, UserProfile, CCAction, CCCategory, CCSubcategory)
   def list(self, request): 
     context: Context = request.context
     args: dict = context.args
@@ -5,10 +5,11 @@ from _main_.utils.route_handler import RouteHandler
 from api.services.misc import MiscellaneousService
 from _main_.utils.massenergize_response import MassenergizeResponse
 from _main_.utils.context import Context
+from _main_.utils.route_profiler import route_profiler
 from api.decorators import admins_only, super_admins_only, x_frame_options_exempt
 from database.utils.settings.admin_settings import AdminPortalSettings
 from database.utils.settings.user_settings import UserPortalSettings
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render
 
 
@@ -51,6 +52,9 @@ class MiscellaneousHandler(RouteHandler):
         
         self.add("/translations.languages.list", self.list_all_languages)
 
+        self.add("/profiler.routes.list", self.list_route_profiles)
+        self.add("/profiler.routes.export", self.export_route_profiles)
+
 
     @admins_only
     def fetch_footages(self, request):
@@ -390,3 +394,19 @@ class MiscellaneousHandler(RouteHandler):
             return err
         return MassenergizeResponse(data=all_languages)
         
+
+    @super_admins_only
+    def list_route_profiles(self, request):
+        context: Context = request.context
+        args: dict = context.args
+        return MassenergizeResponse(data={
+            "enabled": route_profiler.enabled,
+            "summary": route_profiler.summary(),
+            "entries": route_profiler.entries(args.get("route")),
+        })
+
+    @super_admins_only
+    def export_route_profiles(self, request):
+        response = HttpResponse(route_profiler.export_json(), content_type="application/json")
+        response["Content-Disposition"] = "attachment; filename=route_profiles.json"
+        return response
@@ -5,6 +5,8 @@ from api.services.team import TeamService
 from _main_.utils.massenergize_response import MassenergizeResponse
 from _main_.utils.context import Context
 from api.decorators import admins_only, cached_request, super_admins_only, login_required
+from carbon_calculator.models import Action as CCAction
+from database.models import Action, Community, Media, RealEstateUnit, Team, TeamMember, UserActionRel, UserProfile
 from api.store.common import expect_media_fields
 
 class TeamHandler(RouteHandler):
@@ -88,7 +90,7 @@ class TeamHandler(RouteHandler):
 
     return MassenergizeResponse(data=team_info)
 
-  # @cached_request
+  @cached_request(Team, TeamMember, Community, Media, UserProfile, UserActionRel, Action, RealEstateUnit, CCAction)
   def team_stats(self, request):
     context: Context = request.context
     args: dict = context.args
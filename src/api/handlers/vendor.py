@@ -10,6 +10,7 @@ from types import FunctionType as function
 from _main_.utils.context import Context
 from _main_.utils.validator import Validator
 from api.decorators import admins_only, cached_request, super_admins_only, login_required
+from database.models import Community, Media, Service, Tag, Vendor
 from api.store.common import expect_media_fields
 
 
@@ -128,7 +129,7 @@ class VendorHandler(RouteHandler):
       return err
     return MassenergizeResponse(data=vendor_info)
 
-  # @cached_request
+  @cached_request(Vendor, Community, Media, Service, Tag)
   def list(self, request):
     context: Context  = request.context
     args = context.get_request_body()      
@@ -3,8 +3,9 @@ import time
 
 from _main_.utils.constants import DEFAULT_SOURCE_LANGUAGE_CODE
 from _main_.utils.translation import JsonTranslator
+from _main_.utils.translation.lru_cache import response_translations_lru
 from _main_.utils.translation.metrics_tracker import TranslationMetrics
-from _main_.utils.utils import to_third_party_lang_code
+from _main_.utils.utils import make_hash, to_third_party_lang_code
 from api.middlewares.translation_exclusion_patterns import TRANSLATION_EXCLUSION_PATTERNS_PER_URL
 from api.utils.api_utils import get_supported_language
 
@@ -59,15 +60,27 @@ class TranslationMiddleware:
             if request_path.startswith('/api'):
                 request_path = request_path[4:]
             
-            patterns_to_ignore = TRANSLATION_EXCLUSION_PATTERNS_PER_URL.get(request_path, [])
             start_time = time.time()
-            
-            translator = JsonTranslator(dict_to_translate=response_to_dict, excluded_key_patterns=patterns_to_ignore)
-            
-            translated_dict, _, __ = translator.translate('en', target_language_code)
+
+            # identical payloads translated recently are served from memory
+            response_cache_key = (target_language_code, request_path, make_hash(original_content))
+            translated_content = response_translations_lru.get(response_cache_key)
+            self.metric_tracker.track_translation_cache_usage("Response", target_language_code, int(translated_content is not None), int(translated_content is None))
+
+            if translated_content is None:
+                patterns_to_ignore = TRANSLATION_EXCLUSION_PATTERNS_PER_URL.get(request_path, [])
+
+                translator = JsonTranslator(dict_to_translate=response_to_dict, excluded_key_patterns=patterns_to_ignore)
+
+                translated_dict, _, __ = translator.translate('en', target_language_code)
+                self.metric_tracker.track_translation_cache_usage("Text", target_language_code, translator.cache_hits, translator.cache_misses)
+
+                translated_content = json.dumps(translated_dict)
+                response_translations_lru.set(response_cache_key, translated_content)
+
             duration = time.time() - start_time
             self.metric_tracker.track_translation_latency("en",target_language,duration)
 
-            response.content = json.dumps(translated_dict).encode('utf-8')
+            response.content = translated_content.encode('utf-8')
         
         return response
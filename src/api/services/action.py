@@ -124,7 +124,7 @@ class ActionService:
     if err:
       return None, err
     sorted = sort_items(actions, context.get_params())
-    return paginate(sorted, context.get_pagination_data()), None
+    return paginate(sorted, context.get_pagination_data(keyset=True)), None
 
 
   def list_actions_for_super_admin(self, context: Context) -> Tuple[list, MassEnergizeAPIError]:
@@ -132,4 +132,4 @@ class ActionService:
     if err:
       return None, err
     sorted = sort_items(actions, context.get_params())
-    return paginate(sorted, context.get_pagination_data()), None
+    return paginate(sorted, context.get_pagination_data(keyset=True)), None
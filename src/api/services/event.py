@@ -252,14 +252,14 @@ class EventService:
     if err:
       return None, err
     sorted = sort_items(events, context.get_params())
-    return paginate(sorted, context.get_pagination_data()), None
+    return paginate(sorted, context.get_pagination_data(keyset=True)), None
 
   def fetch_other_events_for_cadmin(self, context, args) -> Tuple[list, MassEnergizeAPIError]:
     events, err = self.store.fetch_other_events_for_cadmin(context, args)
     if err:
       return None, err
     sorted = sort_items(events, context.get_params())
-    return paginate(sorted, context.get_pagination_data()), None
+    return paginate(sorted, context.get_pagination_data(keyset=True)), None
 
 
   def list_events_for_super_admin(self, context) -> Tuple[list, MassEnergizeAPIError]:
@@ -268,7 +268,7 @@ class EventService:
     if err:
       return None, err
     sorted = sort_items(events, context.get_params())
-    return paginate(sorted, context.get_pagination_data()), None
+    return paginate(sorted, context.get_pagination_data(keyset=True)), None
 
 
   def create_event_reminder_settings(self, context, args) -> Tuple[dict, MassEnergizeAPIError]:
@@ -267,7 +267,7 @@ class UserService:
     if err:
       return None, err
     sorted = sort_items(users, context.get_params())
-    return paginate(sorted, context.get_pagination_data()), None
+    return paginate(sorted, context.get_pagination_data(keyset=True)), None
 
 
   def list_users_for_super_admin(self, context,args) -> Tuple[list, MassEnergizeAPIError]:
@@ -275,7 +275,7 @@ class UserService:
     if err:
       return None, err
     sorted = sort_items(users, context.get_params())
-    return paginate(sorted, context.get_pagination_data()), None
+    return paginate(sorted, context.get_pagination_data(keyset=True)), None
 
 
   def add_action_todo(self, context, args) -> Tuple[dict, MassEnergizeAPIError]:
@@ -1,6 +1,7 @@
 from _main_.utils.footage.FootageConstants import FootageConstants
 from _main_.utils.footage.spy import Spy
 from _main_.utils.metrics import timed
+from _main_.utils.response_cache import response_cache
 from _main_.utils.utils import Console
 from api.store.common import get_media_info, make_media_info
 from api.tests.common import RESET, makeUserUpload
@@ -352,6 +353,7 @@ class ActionStore:
         actions = Action.objects.filter(id=id)
         if rank is not None:
           actions.update(rank=rank)
+          response_cache.invalidate(Action)
           action = actions.first()
           # ----------------------------------------------------------------
           Spy.create_action_footage(actions = [action], context = context, type = FootageConstants.update(), notes=f"Rank updated to - {rank}")
@@ -6,6 +6,7 @@ from _main_.utils.emailer.send_email import send_massenergize_email_with_attachm
 from api.constants import CAMPAIGN_TEMPLATE_KEYS, LOOSED_USER
 from api.utils.api_utils import create_media_file, create_or_update_call_to_action_from_dict, \
     create_or_update_section_from_dict
+from apps__campaigns.analytics import LIKES, TECHNOLOGY_VIEWS, VIEWS, daily_series, record_activity
 from apps__campaigns.helpers import (
     copy_campaign_data,
     generate_analytics_data,
@@ -44,7 +45,6 @@ from .utils import get_user_from_context
 from django.db.models import Q
 from _main_.utils.massenergize_logger import log
 from typing import Tuple
-from django.db import transaction
 
 from ..utils.constants import CAMPAIGN_CONTACT_MESSAGE_TEMPLATE, THANK_YOU_FOR_GETTING_IN_TOUCH_TEMPLATE
 
@@ -1025,9 +1025,8 @@ class CampaignStore:
             if not campaign_technology:
                 return None, CustomMassenergizeError("Campaign technology with id not found!")
             like, _ = CampaignTechnologyLike.objects.get_or_create(campaign_technology=campaign_technology)
-            # lock transaction
-            with transaction.atomic():
-                like.increase_count()
+            like.increase_count()
+            record_activity(campaign_technology.campaign_id, LIKES, campaign_technology.id)
 
             campaign_tech = get_campaign_technology_details({"campaign_technology_id":campaign_technology_id})
 
@@ -1053,13 +1052,11 @@ class CampaignStore:
             if link_id:
                 campaign_link = CampaignLink.objects.filter(id=link_id).first()
                 if campaign_link:
-                    with transaction.atomic():
-                        campaign_link.increase_count()
+                    campaign_link.increase_count()
 
             view, _ = CampaignTechnologyView.objects.get_or_create(campaign_technology=campaign_technology)
-            # lock transaction
-            with transaction.atomic():
-                view.increase_count()
+            view.increase_count()
+            record_activity(campaign_technology.campaign_id, TECHNOLOGY_VIEWS, campaign_technology.id)
             return view, None
         except Exception as e:
             log.exception(e)
@@ -1101,6 +1098,7 @@ class CampaignStore:
 
 
             stats = generate_analytics_data(campaign.id)
+            stats["daily"] = daily_series(campaign.id)
             stats["campaign"] = {
                 "title": campaign.title,
                 "image": campaign.image.file.url if campaign.image else None,
@@ -1341,15 +1339,14 @@ class CampaignStore:
                 if link_id:
                     campaign_link = CampaignLink.objects.filter(id=link_id).first()
                     if campaign_link:
-                        with transaction.atomic():
-                            campaign_link.increase_count()
-                            
+                        campaign_link.increase_count()
+
             view = CampaignView.objects.filter(campaign=campaign).first()
             if not view:
                 view = CampaignView.objects.create(campaign=campaign)
-                
-            with transaction.atomic():
-                view.increase_count()
+
+            view.increase_count()
+            record_activity(campaign.id, VIEWS)
             return view, None
         except Exception as e:
             log.exception(e)
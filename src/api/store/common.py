@@ -1,21 +1,23 @@
 import csv
 import datetime
 import io
+from concurrent.futures import ThreadPoolExecutor
 from functools import reduce
 from typing import List
 
 import boto3
-from django.db.models import Count, Model, Q
+from django.db.models import Count, Max, Model, Prefetch, Q, Sum
 from django.http import FileResponse
 from xhtml2pdf import pisa
 
 from _main_.settings import AWS_S3_REGION_NAME
 from _main_.utils.common import custom_timezone_info, serialize, serialize_all
 from api.constants import CSV_FIELD_NAMES
-from api.store.utils import getCarbonScoreFromActionRel
+from carbon_calculator.carbonCalculator import AverageImpacts
 from carbon_calculator.models import Action
-from database.models import Community, CommunityAdminGroup, Event, Media, Team, UserActionRel
-from database.utils.common import calculate_hash_for_bucket_item, get_image_size_from_bucket
+from database.models import Action as DatabaseAction, Community, CommunityAdminGroup, Event, Media, Tag, Team, \
+    UserActionRel
+from database.utils.common import calculate_hash_for_bucket_item, get_image_size_from_bucket, hash_bucket_item
 
 s3 = boto3.client("s3", region_name=AWS_S3_REGION_NAME)
 
@@ -26,6 +28,9 @@ LAST_MONTH = "last-month"
 LAST_YEAR = "last-year"
 
 NON_EXISTENT_IMAGE = "NON_EXISTENT_IMAGE"
+HASH_WORKERS = 8
+HASH_BATCH_SIZE = 200
+PERCEPTUAL_MATCH_DISTANCE = 4  # bits
 
 def js_datetime_to_python(datetext):
     _format = "%Y-%m-%dT%H:%M:%SZ"
@@ -97,37 +102,71 @@ def count_action_completed_and_todos(**kwargs):
     if time_range:
         query &= Q(updated_at__range=time_range)
 
-    completed_actions = UserActionRel.objects.filter(query).select_related(
-        "action__calculator_action"
+    action_rels = UserActionRel.objects.filter(query).order_by()
+    done = Q(status="DONE")
+
+    # done/todo counts per action, in the order the latest rel of each action was saved
+    counts = list(
+        action_rels.values("action", "action__title")
+        .annotate(
+            done_count=Count("id", filter=done),
+            todo_count=Count("id", filter=Q(status="TODO")),
+            latest=Max("id"),
+        )
+        .order_by("-latest")
     )
 
-    for completed_action in completed_actions:
-        action_id = completed_action.action.id
-        action_name = completed_action.action.title
-        action_carbon = getCarbonScoreFromActionRel(completed_action)
-        done = 1 if completed_action.status == "DONE" else 0
-        todo = 1 if completed_action.status == "TODO" else 0
-
-        count_obj = action_count_objects.get(action_id, None)
-        if count_obj:
-            count_obj["done_count"] += done
-            count_obj["carbon_total"] += action_carbon
-            count_obj["todo_count"] += todo
-        else:
-            category_obj = completed_action.action.tags.filter(
-                tag_collection__name="Category"
-            ).first()
-            action_category = category_obj.name if category_obj else None
-            action_count_objects[action_id] = {
-                "id": action_id,
-                "name": action_name,
-                "category": action_category,
-                "done_count": done,
-                "carbon_total": action_carbon,
-                "todo_count": todo,
-            }
+    # a rel's own carbon_impact takes precedence over the calculator's average impact
+    carbon_totals = dict(
+        action_rels.filter(done, carbon_impact__isnull=False)
+        .exclude(carbon_impact=0)
+        .values("action")
+        .annotate(total=Sum("carbon_impact"))
+        .values_list("action", "total")
+    )
 
-    return list(action_count_objects.values())
+    # the average impact only depends on the calculator action and completion date
+    impact_groups = list(
+        action_rels.filter(done, action__calculator_action__isnull=False)
+        .filter(Q(carbon_impact__isnull=True) | Q(carbon_impact=0))
+        .values("action", "action__calculator_action", "date_completed")
+        .annotate(count=Count("id"))
+    )
+    calculator_actions = Action.objects.in_bulk(
+        {group["action__calculator_action"] for group in impact_groups}
+    )
+    impacts = AverageImpacts(
+        [
+            (calculator_actions[group["action__calculator_action"]], group["date_completed"])
+            for group in impact_groups
+        ]
+    )
+    for group, impact in zip(impact_groups, impacts):
+        carbon_totals[group["action"]] = carbon_totals.get(group["action"], 0) + group["count"] * impact
+
+    action_ids = [count["action"] for count in counts]
+    categories = {
+        action.id: action.category_tags[0].name if action.category_tags else None
+        for action in DatabaseAction.objects.filter(id__in=action_ids).prefetch_related(
+            Prefetch(
+                "tags",
+                queryset=Tag.objects.filter(tag_collection__name="Category").order_by("rank", "id"),
+                to_attr="category_tags",
+            )
+        )
+    }
+
+    return [
+        {
+            "id": count["action"],
+            "name": count["action__title"],
+            "category": categories.get(count["action"]),
+            "done_count": count["done_count"],
+            "carbon_total": carbon_totals.get(count["action"], 0),
+            "todo_count": count["todo_count"],
+        }
+        for count in counts
+    ]
 
 
 def create_pdf_from_rich_text(rich_text, filename):
@@ -641,20 +680,91 @@ def remove_duplicates_and_attach_relations(hash):
     return media_after_attaching
 
 
-def generate_hashes(): 
+def generate_hashes(perceptual=False, workers=HASH_WORKERS, batch_size=HASH_BATCH_SIZE, client=None):
     """
+        Hashes the media that have no hash yet (and, with perceptual, no perceptual hash either).
+        Files are streamed from the bucket by a pool of worker threads, and the hashes of each batch
+        are saved with one bulk_update: a run that is stopped keeps the batches it finished, and the
+        next run picks up the media that are still not hashed.
+
         Returns : Number of items that have had their hashes generated
     """
-    images = Media.objects.filter(Q(hash__exact="") | Q(hash=None)).distinct()
+    missing = Q(hash__exact="") | Q(hash=None)
+    if perceptual:
+        missing |= Q(perceptual_hash__exact="")
+
+    def hash_media(media):
+        return hash_bucket_item(media.file.name, client=client, perceptual=perceptual and not media.perceptual_hash)
+
     count = 0
+    last_id = 0
     print("Generating Hashes...")
-    for image in images:
-        hash = calculate_hash_for_bucket_item(image.file.name)
-        if hash:
-            image.hash = hash
-            image.save()
-            count = count + 1
-        else: 
-            image.hash = NON_EXISTENT_IMAGE 
-            image.save() 
-    return count
\ No newline at end of file
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            batch = list(
+                Media.objects.filter(missing, pk__gt=last_id).order_by("pk").only("id", "file", "hash", "perceptual_hash")[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].pk
+
+            for media, (hash, perceptual_hash) in zip(batch, pool.map(hash_media, batch)):
+                if not media.hash:
+                    media.hash = hash or NON_EXISTENT_IMAGE
+                    count += 1 if hash else 0
+                if perceptual and not media.perceptual_hash:
+                    # not an image (or not in the bucket): not tried again
+                    media.perceptual_hash = perceptual_hash or NON_EXISTENT_IMAGE
+            Media.objects.bulk_update(batch, ["hash", "perceptual_hash"])
+    return count
+
+
+def _hamming_distance(first, second):
+    return bin(int(first, 16) ^ int(second, 16)).count("1")
+
+
+def find_similar_items(max_distance=PERCEPTUAL_MATCH_DISTANCE, **kwargs):
+    """
+        Groups media whose images look the same (perceptual hashes at most max_distance bits apart)
+        but are not exact duplicates of each other, e.g. resized copies. Run generate_hashes(perceptual=True) first.
+
+        Returns: the same shape as find_duplicate_items, {perceptual hash of the group: [media]}
+    """
+    community_ids = kwargs.get("community_ids", None)
+    media = Media.objects.exclude(perceptual_hash__exact="").exclude(perceptual_hash=NON_EXISTENT_IMAGE)
+    if community_ids:
+        media = media.filter(user_upload__communities__id__in=community_ids).distinct()
+    media = list(media.order_by("pk"))
+
+    # two hashes at most max_distance bits apart are equal in at least one of max_distance + 1 slices
+    buckets = {}
+    for index, item in enumerate(media):
+        length = len(item.perceptual_hash)
+        bounds = [length * band // (max_distance + 1) for band in range(max_distance + 2)]
+        for band, (start, end) in enumerate(zip(bounds, bounds[1:])):
+            buckets.setdefault((band, item.perceptual_hash[start:end]), []).append(index)
+
+    parents = list(range(len(media)))
+
+    def find(index):
+        while parents[index] != index:
+            parents[index] = parents[parents[index]]
+            index = parents[index]
+        return index
+
+    for indexes in buckets.values():
+        for position, first in enumerate(indexes):
+            for second in indexes[position + 1:]:
+                if find(first) != find(second) and _hamming_distance(media[first].perceptual_hash, media[second].perceptual_hash) <= max_distance:
+                    parents[find(second)] = find(first)
+
+    groups = {}
+    for index, item in enumerate(media):
+        groups.setdefault(find(index), []).append(item)
+
+    response = {}
+    for items in groups.values():
+        # exact duplicates are already reported by find_duplicate_items
+        if len({item.hash for item in items}) > 1:
+            response[items[0].perceptual_hash] = items
+    return response
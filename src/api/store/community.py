@@ -15,15 +15,17 @@ from _main_.utils.footage.spy import Spy
 from _main_.utils.massenergize_errors import (CustomMassenergizeError, InvalidResourceError, MassEnergizeAPIError,
                                               NotAuthorizedError)
 from _main_.utils.metrics import timed
+from _main_.utils.response_cache import response_cache
 from _main_.utils.utils import strip_website
 from api.services.utils import send_slack_message
 from api.store.common import count_action_completed_and_todos
 from api.store.graph import GraphStore
 from api.tests.common import RESET
-from api.utils.api_utils import get_distance_between_coords, is_admin_of_community
+from api.utils.api_utils import is_admin_of_community
+from api.utils.geo_index import community_geo_index
 from api.utils.filter_functions import get_communities_filter_params
 from database.models import AboutUsPageSettings, Action, ActionsPageSettings, Community, CommunityAdminGroup, \
-    CommunityMember, CommunityNotificationSetting, ContactUsPageSettings, CustomCommunityWebsiteDomain, \
+    CommunityImpact, CommunityMember, CommunityNotificationSetting, ContactUsPageSettings, CustomCommunityWebsiteDomain, \
     DonatePageSettings, EventsPageSettings, FeatureFlag, get_enabled_flags, Goal, Graph, HomePageSettings, \
     ImpactPageSettings, Location, \
     Media, Menu, RealEstateUnit, RegisterPageSettings, SigninPageSettings, Subdomain, TeamsPageSettings, \
@@ -609,6 +611,7 @@ class CommunityStore:
             ).first()
             if not community_member:
                 community_member = CommunityMember.objects.create(community=community, user=user, is_admin=False)
+                CommunityImpact.record_member_change(community, user, joined=True)
 
             return user, None
         except Exception as e:
@@ -638,6 +641,7 @@ class CommunityStore:
             ).first()
             if not community_member or (not community_member.is_admin):
                 community_member.delete()
+                CommunityImpact.record_member_change(community, user, joined=False)
 
             return user, None
         except Exception as e:
@@ -670,45 +674,16 @@ class CommunityStore:
             if zipcode := args.get("zipcode", None):
                 if zipcodes.is_real(zipcode):
                     # filter communities by coordinates
-                    filtered_communities = []
-
-                    # get coordinates of the zipcode
-                    zipcode_info = zipcodes.matching(zipcode)
-                    zipcode_lat = zipcode_info[0]["lat"]
-                    zipcode_long = zipcode_info[0]["long"]
-
                     max_distance = args.get("max_distance", 25)
+                    nearby = community_geo_index.within_zipcode(zipcode, float(max_distance)) or {}
 
-                    added_communities = []
+                    filtered_communities = []
                     for community in communities:
-                        if community.is_geographically_focused:
-                            for location in community.locations.all():
-                                # skip locations that don't include zipcode (bogus data in dev)
-                                if not location.zipcode:
-                                    continue
-                                community_zipcode_info = zipcodes.matching(
-                                    location.zipcode
-                                )
-                                community_zipcode_lat = community_zipcode_info[0]["lat"]
-                                community_zipcode_long = community_zipcode_info[0][
-                                    "long"
-                                ]
-
-                                distance_between_zipcodes = get_distance_between_coords(
-                                    float(zipcode_lat),
-                                    float(zipcode_long),
-                                    float(community_zipcode_lat),
-                                    float(community_zipcode_long),
-                                )
-
-                                if distance_between_zipcodes <= max_distance:
-                                    if community.id not in added_communities:
-                                        community.location[
-                                            "distance"
-                                        ] = distance_between_zipcodes
-                                        filtered_communities.append(community)
-                                        added_communities.append(community.id)
-                        else:
+                        if not community.is_geographically_focused:
+                            filtered_communities.append(community)
+                        elif community.id in nearby:
+                            distance, _ = nearby[community.id]
+                            community.location = {**(community.location or {}), "distance": distance}
                             filtered_communities.append(community)
                     return filtered_communities, None
                 else:
@@ -980,6 +955,7 @@ class CommunityStore:
                    update_sender_signature(sender_signature_id, contact_sender_alias)
 
             filter_set.update(**args)
+            response_cache.invalidate(Community)
             community = filter_set.first()
 
             # TODO: check that locations have changed before going through the effort of
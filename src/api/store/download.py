@@ -1,3 +1,4 @@
+import heapq
 import io
 import os
 import zipfile
@@ -15,6 +16,7 @@ from _main_.utils.context import Context
 from collections import Counter
 from api.store.utils import get_human_readable_date, get_massachusetts_time
 from api.utils.api_utils import is_admin_of_community
+from apps__campaigns.analytics import campaign_stats, community_stats, technology_stats
 from apps__campaigns.models import Campaign, CampaignActivityTracking, CampaignFollow, CampaignLink, CampaignTechnology, CampaignTechnologyFollow, CampaignTechnologyLike, CampaignTechnologyTestimonial, CampaignTechnologyView, CampaignView, Comment
 from database.models import (
     UserProfile,
@@ -55,7 +57,10 @@ from typing import Tuple
 from django.utils import timezone
 import datetime
 from carbon_calculator.carbonCalculator import AverageImpact
-from django.db.models import Sum
+from django.db import connection
+from django.db.models import Sum, Count, Prefetch, Case, CharField, Q, Value, When
+from django.db.models.functions import Collate, Left, Length, StrIndex, Substr
+from django.db.models.lookups import GreaterThan
 from uuid import UUID
 from carbon_calculator.models import Action as CCAction
 from collections import defaultdict
@@ -81,6 +86,33 @@ def update_user(item):
 def update_date(item):
     return item.updated_at.date() if item.updated_at else ""
 
+# collations that compare code points, the way python sorts strings
+CODE_POINT_COLLATIONS = {"postgresql": "C", "sqlite": "BINARY", "mysql": "utf8mb4_bin"}
+
+def python_order(expression):
+    """
+    Orders text in the database the way sorted() orders it in python, so sorted querysets can be merged by their cells
+    """
+    collation = CODE_POINT_COLLATIONS.get(connection.vendor)
+    return Collate(expression, collation) if collation else expression
+
+def first_name_order(field, blank_is_missing=True):
+    """
+    The "First Name" cell of the users export computed in the database: the name up to its first space,
+    the name without its last character when it has no space (full_name[:full_name.find(" ")]) and "---"
+    when there is no name
+    """
+    missing = Q(**{f"{field}__isnull": True})
+    if blank_is_missing:
+        missing |= Q(**{field: ""})
+    space = StrIndex(field, Value(" "))
+    return python_order(Case(
+        When(missing, then=Value("---")),
+        When(GreaterThan(space, 0), then=Substr(field, 1, space - 1)),
+        default=Left(field, Length(field) - 1),
+        output_field=CharField(),
+    ))
+
 class DownloadStore:
     def __init__(self):
         self.name = "Download Store/DB"
@@ -504,61 +536,86 @@ class DownloadStore:
         return self._get_cells_from_dict(self.user_info_columns_2, user_cells_2)
 
 
-    #Given a user and team, returns count and list of teams they are on, for Users CSV 
-    def _get_team_info_for_user(self, user, teams):
-        teams_for_user = teams.filter(teammember__user=user).values_list(
-                "name", "teammember__is_admin"
-            )
-        tfu = []
-        for team_name, is_admin in teams_for_user:
-            tfu.append((team_name + "(ADMIN)") if is_admin else team_name)
-        return teams_for_user.count(), tfu
-
-    # Given a user, returns count of actions they've done and they've marked to-do, for Users CSV 
-    def _get_action_counts_for_user(self, user):
-        action_id_to_action_rel = {
-                user_action_rel.action.id: user_action_rel
-                for user_action_rel in UserActionRel.objects.filter(
-                    is_deleted=False, user=user
-                ).select_related("action")
-            }
-
-        todo_count = 0
-        done_count= 0
-        for elem in action_id_to_action_rel.values():
-            if elem.status == "DONE":
-                done_count += 1
-            elif elem.status == "TODO":
-                todo_count +=1
-        return todo_count, done_count
-        
-
-    #Given information about users, actions and teams in a community, returns middle part of 
-    #populated row (for Users CSV)
-    def _get_user_actions_cells(self, user, actions, teams):
-        user_cells = {}
-
-        if isinstance(user, Subscriber) or isinstance(user, RealEstateUnit):
-            #confirm REU has no testimonials, actions or teams (even though linked to a User?)
-            user_cells = {}
+    # Returns the RealEstateUnit prefetch used by the user exports, so households and zipcodes come from memory
+    def _get_user_households_prefetch(self, lookup="real_estate_units"):
+        return Prefetch(
+            lookup,
+            queryset=RealEstateUnit.objects.select_related("address", "community"),
+        )
 
-        else:
-            user_testimonials = Testimonial.objects.filter(is_deleted=False, user=user)
-            testimonials_count = user_testimonials.count() if user_testimonials else "0"
+    # Given a UserProfile queryset, returns {user_id: [community names]} in one query
+    def _get_community_names_by_user(self, users):
+        community_names = defaultdict(list)
+        memberships = (
+            CommunityMember.objects.filter(user__in=users.values("id"))
+            .order_by("-created_at")
+            .values_list("user_id", "community__name")
+        )
+        for user_id, community_name in memberships.iterator():
+            community_names[user_id].append(community_name)
+        return community_names
+
+    # Given a UserProfile queryset and the teams in scope, returns the lookups used to fill
+    # the actions/teams part of each user row in a fixed number of queries, keyed by user id
+    def _get_user_export_lookups(self, users, teams):
+        user_ids = users.values("id")
+
+        testimonial_counts = dict(
+            Testimonial.objects.filter(is_deleted=False, user__in=user_ids)
+            .order_by()
+            .values("user_id")
+            .annotate(count=Count("id"))
+            .values_list("user_id", "count")
+        )
 
-            todo_count, done_count = self._get_action_counts_for_user(user)
+        # a user may have several rels for the same action (one per household);
+        # only the lowest id rel per action is counted
+        action_counts = defaultdict(lambda: {"TODO": 0, "DONE": 0})
+        rels = (
+            UserActionRel.objects.filter(is_deleted=False, user__in=user_ids)
+            .order_by("user_id", "action_id", "id")
+            .values_list("user_id", "action_id", "status")
+        )
+        last_seen = None
+        for user_id, action_id, status in rels.iterator():
+            if (user_id, action_id) == last_seen:
+                continue
+            last_seen = (user_id, action_id)
+            if status in ("TODO", "DONE"):
+                action_counts[user_id][status] += 1
+
+        teams_by_user = defaultdict(list)
+        team_memberships = (
+            TeamMember.objects.filter(user__in=user_ids, team__in=teams.values("id"))
+            .order_by("team__name", "team__id")
+            .values_list("user_id", "team__name", "is_admin")
+        )
+        for user_id, team_name, is_admin in team_memberships.iterator():
+            teams_by_user[user_id].append((team_name + "(ADMIN)") if is_admin else team_name)
 
-            team_count, users_teams = self._get_team_info_for_user(user, teams)
+        return {
+            "testimonial_counts": testimonial_counts,
+            "action_counts": action_counts,
+            "teams": teams_by_user,
+        }
 
-            user_cells = {
-                "Done (count)":done_count,
-                "To-do (count)":todo_count,
-                "Testimonials (count)": testimonials_count,
-                "Teams (count)": team_count,
-                "Teams": ', '.join(users_teams),
-            }
+    #Given a user and the lookups built by _get_user_export_lookups, returns middle part of
+    #populated row (for Users CSV)
+    def _get_user_actions_cells(self, user, lookups):
+        if isinstance(user, Subscriber) or isinstance(user, RealEstateUnit):
+            return self._get_cells_from_dict(self.user_info_columns_new, {})
+
+        counts = lookups["action_counts"].get(user.id, {"TODO": 0, "DONE": 0})
+        users_teams = lookups["teams"].get(user.id, [])
+        user_cells = {
+            "Done (count)": counts["DONE"],
+            "To-do (count)": counts["TODO"],
+            "Testimonials (count)": lookups["testimonial_counts"].get(user.id, 0),
+            "Teams (count)": len(users_teams),
+            "Teams": ', '.join(users_teams),
+        }
         return self._get_cells_from_dict(self.user_info_columns_new, user_cells)
-    
+
     # Receives an action, returns how many times it's been marked as Done in the last 30 days
     def _get_last_30_days_count(self, action):
         today = datetime.date.today()
@@ -943,80 +1000,95 @@ class DownloadStore:
         return self._get_cells_from_dict(self.community_info_columns, community_cells)
 
     
-    #Combines populated row and column information for all users overall to create All Users CSV
-    def _all_users_download(self):
-        users = list(UserProfile.objects.filter(is_deleted=False, 
+    #Yields the populated rows for the All Users CSV ordered by first name, one user at a time, without per-user queries
+    def _iter_all_users_rows(self):
+        users = UserProfile.objects.filter(is_deleted=False,
                 #accepts_terms_and_conditions=True
             )
-        ) + list(Subscriber.objects.filter(is_deleted=False))
-        actions = Action.objects.filter(is_deleted=False)
         teams = Team.objects.filter(is_deleted=False)
 
-        columns = (
-            self.user_info_columns_1 
-            + ["home community", "secondary community"]
-            + self.user_info_columns_new 
-            + self.user_info_columns_2
+        community_names = self._get_community_names_by_user(users)
+        lookups = self._get_user_export_lookups(users, teams)
+
+        users = users.prefetch_related(self._get_user_households_prefetch()).order_by(first_name_order("full_name"), "-created_at")
+        subscribers = Subscriber.objects.filter(is_deleted=False).select_related("community").order_by(
+            first_name_order("name", blank_is_missing=False), "pk"
         )
 
-        data = []
-        print("downloading " + str(len(users)) + " users")
-        for user in users:
-            if isinstance(user, Subscriber):
-                if user.community:
-                    primary_community, secondary_community = user.community.name, ""
-                else:
-                    primary_community, secondary_community = "", ""
-            else:
-                # community list which user has associated with
-                communities = [
-                    cm.community.name
-                    for cm in CommunityMember.objects.filter(user=user).select_related(
-                        "community"
-                    )
-                ]
-                # communities of primary real estate unit associated with the user
-                reu_community = None
-                for reu in user.real_estate_units.all():
-                    if reu.community:
-                        reu_community = reu.community.name
-                        break
-                primary_community = secondary_community = ""
-                # Primary community comes from a RealEstateUnit
-                if reu_community:
-                    primary_community = reu_community
-
-                for community in communities:
-                    if community != primary_community:
-                        if secondary_community != "":
-                            secondary_community += ", "
-                        secondary_community += community
-                # print(str(user) + ", " + str(len(communities)) + " communities, home is " + str(reu_community))
-
-            row = (           
+        # users and subscribers each come ordered by their first name cell from the database, merge them on it
+        return heapq.merge(
+            self._iter_users_rows(users, community_names, lookups),
+            self._iter_subscribers_rows(subscribers, lookups),
+            key=lambda row: row[0],
+        )
+
+    def _iter_users_rows(self, users, community_names, lookups):
+        for user in users.iterator(chunk_size=2000):
+            # community list which user has associated with
+            communities = community_names.get(user.id, [])
+            # communities of primary real estate unit associated with the user
+            reu_community = None
+            for reu in user.real_estate_units.all():
+                if reu.community:
+                    reu_community = reu.community.name
+                    break
+            primary_community = secondary_community = ""
+            # Primary community comes from a RealEstateUnit
+            if reu_community:
+                primary_community = reu_community
+
+            for community in communities:
+                if community != primary_community:
+                    if secondary_community != "":
+                        secondary_community += ", "
+                    secondary_community += community
+
+            yield (
                 self._get_user_info_cells_1(user)
                 + [primary_community, secondary_community]
-                + self._get_user_actions_cells(user, actions, teams)
+                + self._get_user_actions_cells(user, lookups)
                 + self._get_user_info_cells_2(user)
             )
-            data.append(row)
 
-        # sort by community
-        data = sorted(data, key=lambda row: row[0])
-        # insert the columns
-        data.insert(0, columns)
-        return data
+    def _iter_subscribers_rows(self, subscribers, lookups):
+        for subscriber in subscribers.iterator(chunk_size=2000):
+            if subscriber.community:
+                primary_community, secondary_community = subscriber.community.name, ""
+            else:
+                primary_community, secondary_community = "", ""
+
+            yield (
+                self._get_user_info_cells_1(subscriber)
+                + [primary_community, secondary_community]
+                + self._get_user_actions_cells(subscriber, lookups)
+                + self._get_user_info_cells_2(subscriber)
+            )
+
+    #Combines populated row and column information for all users overall to create All Users CSV
+    def _all_users_download(self):
+        columns = (
+            self.user_info_columns_1 
+            + ["home community", "secondary community"]
+            + self.user_info_columns_new 
+            + self.user_info_columns_2
+        )
+
+        yield columns
+        yield from self._iter_all_users_rows()
 
     # Combines populated row and column information for all users in a given community to create All Users CSV
     def _community_users_download(self, community_id):
-        users = [
-            cm.user
-            for cm in CommunityMember.objects.filter(
+        members = CommunityMember.objects.filter(
                 community__id=community_id,
                 is_deleted=False,
                 user__is_deleted=False,
                 #user__accepts_terms_and_conditions=True,
-            ).select_related("user")
+            )
+        users = [
+            cm.user
+            for cm in members.select_related("user").prefetch_related(
+                self._get_user_households_prefetch("user__real_estate_units")
+            )
         ] + list(
             Subscriber.objects.filter(community__id=community_id, is_deleted=False)
         )
@@ -1025,11 +1097,10 @@ class DownloadStore:
             RealEstateUnit.objects.filter(community__id=community_id, is_deleted=False)
         )
 
-        actions = Action.objects.filter(
-            Q(community__id=community_id) | Q(is_global=True)
-        ).filter(is_deleted=False)
-
         teams = Team.objects.filter(communities__id=community_id, is_deleted=False)
+        lookups = self._get_user_export_lookups(
+            UserProfile.objects.filter(id__in=members.values("user_id")), teams
+        )
 
         columns = (
             self.user_info_columns_1 + self.user_info_columns_new + self.user_info_columns_2
@@ -1039,7 +1110,7 @@ class DownloadStore:
         for user in users:
             row = (
                 self._get_user_info_cells_1(user)
-                + self._get_user_actions_cells(user, actions, teams)
+                + self._get_user_actions_cells(user, lookups)
                 + self._get_user_info_cells_2(user)
             )
             data.append(row)
@@ -1060,15 +1131,17 @@ class DownloadStore:
     # based off of a method described as "new 1/11/20 BHN - untested"
     # Combines populated row and column information for all users on a given team to create All Users CSV
     def _team_users_download(self, team_id, community_id):
-
-        users = [
-            cm.user
-            for cm in TeamMember.objects.filter(
+        members = TeamMember.objects.filter(
                 team__id=team_id,
                 is_deleted=False,
                 user__accepts_terms_and_conditions=True,
                 user__is_deleted=False,
-            ).select_related("user")
+            )
+        users = [
+            cm.user
+            for cm in members.select_related("user").prefetch_related(
+                self._get_user_households_prefetch("user__real_estate_units")
+            )
         ]
 
         # Soon teams could span communities, in which case actions list would be larger.
@@ -1078,10 +1151,9 @@ class DownloadStore:
         team = Team.objects.get(id=team_id)
 
         teams = Team.objects.filter(is_deleted=False)
-        community_id = team.primary_community.id
-        actions = Action.objects.filter(
-            Q(community__id=community_id) | Q(is_global=True)
-        ).filter(is_deleted=False)
+        lookups = self._get_user_export_lookups(
+            UserProfile.objects.filter(id__in=members.values("user_id")), teams
+        )
 
         columns = (
             self.user_info_columns_1 + self.user_info_columns_new + self.user_info_columns_2
@@ -1091,7 +1163,7 @@ class DownloadStore:
         for user in users:
             row = (
                 self._get_user_info_cells_1(user)
-                + self._get_user_actions_cells(user, actions, teams)
+                + self._get_user_actions_cells(user, lookups)
                 + self._get_user_info_cells_2(user)
             )
             data.append(row)
@@ -1108,30 +1180,38 @@ class DownloadStore:
                 .prefetch_related("tags")
                 .filter(is_deleted=False)
             )
+        # sort by community, global actions first
+        actions = actions.annotate(
+            community_name=Case(
+                When(is_global=False, community__isnull=False, then="community__name"),
+                default=Value(""),
+                output_field=CharField(),
+            )
+        ).order_by(python_order("community_name"), *Action._meta.ordering)
+        communities = Community.objects.filter(is_deleted=False).order_by(python_order("name"), "pk")
+
+        yield ["Community"] + ["Geographically Focused"] + self.action_info_columns
+        # each community's state reported actions come after its own actions
+        yield from heapq.merge(
+            self._iter_actions_rows(actions),
+            self._iter_reported_rows(communities),
+            key=lambda row: row[0],
+        )
 
-        columns = ["Community"] + ["Geographically Focused"] + self.action_info_columns
-        data = []
-
-        for action in actions:
+    def _iter_actions_rows(self, actions):
+        for action in actions.iterator(chunk_size=2000):
             if not action.is_global and action.community:
-                community = action.community.name
                 is_focused = "Yes" if action.community.is_geographically_focused else "No"
             else:
-                is_focused = community = ""
-            data.append([community] + [is_focused] + self._get_action_info_cells(action))
+                is_focused = ""
+            yield [action.community_name] + [is_focused] + self._get_action_info_cells(action)
 
-        #get state reported actions
-        communities = Community.objects.filter(is_deleted=False)
+    #get state reported actions
+    def _iter_reported_rows(self, communities):
         for com in communities:
-            community_reported_rows = self._get_reported_data_rows(com)
-            for row in community_reported_rows:
-                is_focused = "Yes" if com.is_geographically_focused else "No"
-                data.append([com.name] + [is_focused] + row)
-
-        
-        data = sorted(data, key=lambda row: row[0])  # sort by community
-        data.insert(0, columns)  # insert the column names
-        return data
+            is_focused = "Yes" if com.is_geographically_focused else "No"
+            for row in self._get_reported_data_rows(com):
+                yield [com.name] + [is_focused] + row
 
     #Combines populated rows and columns to create All Actions CSV  - action data for given community
     def _community_actions_download(self, community_id):
@@ -2026,40 +2106,29 @@ class DownloadStore:
         columns = ["Metric", "Value"]
         data = [columns]
 
-        likes = CampaignTechnologyLike.objects.filter(campaign_technology__campaign__id=campaign.id, is_deleted=False).aggregate(total_likes=Sum('count'))['total_likes']
-        follows = CampaignFollow.objects.filter(campaign__id=campaign.id, is_deleted=False).count()
-        views = CampaignTechnologyView.objects.filter(campaign_technology__campaign__id=campaign.id, is_deleted=False).aggregate(total_views=Sum('count'))['total_views']
-        campaign_views = CampaignView.objects.filter(campaign__id=campaign.id, is_deleted=False).aggregate(total_views=Sum('count'))['total_views']
-        comments = Comment.objects.filter(campaign_technology__campaign__id=campaign.id, is_deleted=False).count()
-        shares = CampaignLink.objects.filter(campaign__id=campaign.id, is_deleted=False).count()
-        testimonials = CampaignTechnologyTestimonial.objects.filter(campaign_technology__campaign__id=campaign.id, is_deleted=False).count()
-
+        stats = campaign_stats(campaign.id)
         rows = [
-            ["Total Likes", likes],
-            ["Total Follows", follows],
-            ["Total Views", campaign_views],
-            ["Total Technology Views", views],
-            ["Total comments", comments],
-            ["Total Shares", shares],
-            ["Total testimonials", testimonials],
+            ["Total Likes", stats["likes"]],
+            ["Total Follows", stats["followers"]],
+            ["Total Views", stats["campaign views"]],
+            ["Total Technology Views", stats["Technology views"]],
+            ["Total comments", stats["comments"]],
+            ["Total Shares", stats["shares"]],
+            ["Total testimonials", stats["testimonials"]],
         ]
 
         data += [self._get_cells_from_dict(columns, {"Metric": row[0], "Value": row[1]}) for row in rows]
 
-        techs = CampaignTechnology.objects.filter(campaign__id=campaign.id, is_deleted=False)
+        stats_by_technology = technology_stats(campaign.id)
+        techs = CampaignTechnology.objects.filter(campaign__id=campaign.id, is_deleted=False).select_related("technology")
         for tech in techs:
-            likes = CampaignTechnologyLike.objects.filter(campaign_technology__id=tech.id, is_deleted=False).aggregate(total_likes=Sum('count'))['total_likes']
-            follows = CampaignTechnologyFollow.objects.filter(campaign_technology__id=tech.id, is_deleted=False).count()
-            views = CampaignTechnologyView.objects.filter(campaign_technology__id=tech.id, is_deleted=False).aggregate(total_views=Sum('count'))['total_views']
-            comments = Comment.objects.filter(campaign_technology__id=tech.id, is_deleted=False).count()
-            testimonials = CampaignTechnologyTestimonial.objects.filter(campaign_technology__id=tech.id, is_deleted=False).count()
-
+            tech_stats = stats_by_technology.get(tech.id, {})
             rows = [
-                ["Total Likes", likes or 0],
-                ["Total Follows", follows or 0],
-                ["Total Views", views or 0],
-                ["Total comments", comments or 0],
-                ["Total testimonials", testimonials or 0],
+                ["Total Likes", tech_stats.get("likes", 0)],
+                ["Total Follows", tech_stats.get("follows", 0)],
+                ["Total Views", tech_stats.get("views", 0)],
+                ["Total comments", tech_stats.get("comments", 0)],
+                ["Total testimonials", tech_stats.get("testimonials", 0)],
             ]
 
             data.append([])
@@ -2071,18 +2140,17 @@ class DownloadStore:
     
 
 
-    def _get_performance_data_for_community(self, community, campaign):
+    def _get_performance_data_for_community(self, community, campaign, stats=None, follows=None):
         try:
-           
-            follows = CampaignFollow.objects.filter(campaign__id=campaign.id, community__id=community.id, is_deleted=False)
-            likes = CampaignTechnologyLike.objects.filter(campaign_technology__campaign__id=campaign.id, community__id=community.id, is_deleted=False).first()
-            comments = Comment.objects.filter(campaign_technology__campaign__id=campaign.id, community__id=community.id, is_deleted=False).count()
-            testimonials = CampaignTechnologyTestimonial.objects.filter(campaign_technology__campaign__id=campaign.id, testimonial__community__id=community.id, is_deleted=False).count()
+            if stats is None:
+                stats = community_stats(campaign.id).get(community.id, {})
+            if follows is None:
+                follows = CampaignFollow.objects.filter(campaign__id=campaign.id, community__id=community.id, is_deleted=False)
             rows = [
-                ["Total Follows",follows.count() if follows else 0],
-                ["Total Likes", likes.count if likes else 0],
-                ["Total comments", comments],
-                ["Total testimonials", testimonials],
+                ["Total Follows", stats.get("follows", 0)],
+                ["Total Likes", stats.get("likes", 0)],
+                ["Total comments", stats.get("comments", 0)],
+                ["Total testimonials", stats.get("testimonials", 0)],
             ]
 
             columns = ["Metric", "Value"]
@@ -2148,11 +2216,20 @@ class DownloadStore:
                 "data": self._campaign_interaction_performance_download(campaign)
             }
             # create sheet for ech community in the campaign
-            communities = campaign.campaign_community.filter(is_deleted=False)
+            communities = campaign.campaign_community.filter(is_deleted=False).select_related("community")
+            stats_by_community = community_stats(campaign.id)
+            follows_by_community = defaultdict(list)
+            for follow in CampaignFollow.objects.filter(campaign__id=campaign.id, is_deleted=False).select_related("user", "community"):
+                follows_by_community[follow.community_id].append(follow)
 
             for community in communities:
                 sheet_data[f"{community.community.name}"] = {
-                    "data": self._get_performance_data_for_community(community.community,campaign)
+                    "data": self._get_performance_data_for_community(
+                        community.community,
+                        campaign,
+                        stats=stats_by_community.get(community.community.id, {}),
+                        follows=follows_by_community[community.community.id],
+                    )
                 }
 
             wb =generate_workbook_with_sheets(sheet_data)
@@ -9,7 +9,7 @@ from _main_.utils.massenergize_errors import (
     MassEnergizeAPIError,
 )
 from _main_.utils.utils import Console
-from database.models import Community, FeatureFlag, UserProfile
+from database.models import Community, FeatureFlag, FeatureFlagResolver, UserProfile
 
 from .utils import (
     get_community,
@@ -47,6 +47,7 @@ class FeatureFlagStore:
                 flag.communities.set(communities)
             if users:
                 flag.users.set(users)
+            FeatureFlagResolver.invalidate()
             return flag, None
 
         except Exception as e:
@@ -78,6 +79,8 @@ class FeatureFlagStore:
             if users != None:
                 flag.users.clear()
                 flag.users.set(users)
+            # queryset.update() and m2m writes bypass FeatureFlag.save()
+            FeatureFlagResolver.invalidate()
             return flag, None
 
         except Exception as e:
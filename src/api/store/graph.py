@@ -1,5 +1,5 @@
 from _main_.utils.metrics import timed
-from database.models import Graph, UserProfile, Media, Vendor, Action, Community, Data, Tag, TagCollection, UserActionRel,RealEstateUnit, Team
+from database.models import CommunityImpact, Graph, UserProfile, Media, Vendor, Action, Community, Data, Tag, TagCollection, UserActionRel,RealEstateUnit, Team
 from _main_.utils.massenergize_errors import MassEnergizeAPIError, InvalidResourceError, CustomMassenergizeError, NotAuthorizedError
 from _main_.utils.context import Context
 from django.db.models import Q, prefetch_related_objects
@@ -12,20 +12,14 @@ from _main_.settings import SLACK_SUPER_ADMINS_WEBHOOK_URL, RUN_SERVER_LOCALLY,
 from carbon_calculator.carbonCalculator import AverageImpact
 
 def get_households_engaged(community: Community):
+  impact = CommunityImpact.get_for_community(community)
 
   households_engaged = 0 if not community.goal else community.goal.attained_number_of_households
-  households_engaged += (RealEstateUnit.objects.filter(community=community).count())
+  households_engaged += impact.households_engaged
   actions_completed = 0 if not community.goal else community.goal.attained_number_of_actions
-
-  done_actions = UserActionRel.objects.filter(real_estate_unit__community=community.id, status="DONE").prefetch_related('action__calculator_action')
-  actions_completed += done_actions.count()
+  actions_completed += impact.actions_completed
   carbon_footprint_reduction = 0 if (not community.goal or not community.goal.attained_carbon_footprint_reduction) else community.goal.attained_carbon_footprint_reduction
-
-  # loop over actions completed
-  for actionRel in done_actions:
-    if actionRel.action and actionRel.action.calculator_action :
-      points = AverageImpact(actionRel.action.calculator_action, actionRel.date_completed)
-      carbon_footprint_reduction += points
+  carbon_footprint_reduction += impact.carbon_footprint_reduction
 
   return {"community": {"id": community.id, "name": community.name}, 
           "actions_completed": actions_completed, "households_engaged": households_engaged, 
@@ -34,12 +28,7 @@ def get_households_engaged(community: Community):
 
 def get_all_households_engaged():
   households_engaged = UserProfile.objects.filter(is_deleted=False, accepts_terms_and_conditions=True).count()
-  done_actions = UserActionRel.objects.filter(status="DONE").prefetch_related('action__calculator_action')
-  actions_completed = done_actions.count()
-  carbon_footprint_reduction = 0
-  for actionRel in done_actions:
-    if actionRel.action and actionRel.action.calculator_action :
-      carbon_footprint_reduction += AverageImpact(actionRel.action.calculator_action, actionRel.date_completed)
+  actions_completed, carbon_footprint_reduction = CommunityImpact.action_rels_totals(UserActionRel.objects.filter(status="DONE"))
 
   return {"community": {"id": 0, "name": 'Other'}, 
           "actions_completed": actions_completed, "households_engaged": households_engaged,
@@ -188,7 +177,7 @@ class GraphStore:
 
       res = [get_households_engaged(community)]
       limit = 10
-      for c in Community.objects.filter(is_deleted=False, is_published=True)[:limit]:
+      for c in Community.objects.filter(is_deleted=False, is_published=True).select_related("goal", "impact")[:limit]:
 
         if c.id != community.id:
           res.append(get_households_engaged(c))
@@ -373,7 +362,7 @@ class GraphStore:
           graphs.append({community.name: g["data"]})
 
       comm_impact = []
-      for c in Community.objects.filter(is_deleted=False, id__in = comm_ids):
+      for c in Community.objects.filter(is_deleted=False, id__in = comm_ids).select_related("goal", "impact"):
         comm_impact.append(get_households_engaged(c))
       comm_impact.append(get_all_households_engaged())
       return {
@@ -398,7 +387,7 @@ class GraphStore:
           graphs.append({community.name: g["data"]})
 
       comm_impact = []
-      for c in Community.objects.filter(is_deleted=False)[:4]:
+      for c in Community.objects.filter(is_deleted=False).select_related("goal", "impact")[:4]:
         comm_impact.append(get_households_engaged(c))
       comm_impact.append(get_all_households_engaged())
       return {
@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
 import json
+import uuid
 from _main_.utils.common import parse_datetime_to_aware
 from _main_.utils.constants import AudienceType, ME_LOGO_PNG, SubAudienceType
 from _main_.utils.footage.FootageConstants import FootageConstants
@@ -450,7 +451,9 @@ class MessageStore:
                     "community_ids": communities,
                     "logo": logo,
                     "is_scheduled": True if args.get("schedule") else False
-                }
+                },
+                # a new revision on every edit, so sending an edited message again does not skip whoever got an earlier one
+                "revision": uuid.uuid4().hex,
             }
             
             # Update existing message or create new one
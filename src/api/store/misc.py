@@ -13,7 +13,7 @@ from _main_.utils.utils import load_json
 from api.tests.common import createUsers
 from api.utils.api_utils import get_list_of_internal_links, load_default_menus_from_json, \
     remove_unpublished_menu_items, validate_menu_content
-from database.models import Action, CarbonEquivalency, Community, CommunityAdminGroup, CommunityCustomPage, CommunityCustomPageShare, CommunityMember, Data, Event, \
+from database.models import Action, CarbonEquivalency, Community, CommunityAdminGroup, CommunityImpact, CommunityCustomPage, CommunityCustomPageShare, CommunityMember, Data, Event, \
     FeatureFlag, HomePageSettings, Location, Media, Menu, RealEstateUnit, Subdomain, TagCollection, Team, TeamMember, \
     UserActionRel, \
     UserProfile, Vendor
@@ -159,6 +159,7 @@ class MiscellaneousStore:
                         community_member = CommunityMember.objects.create(
                             community=community, user=user, is_admin=False
                         )
+                        CommunityImpact.record_member_change(community, user, joined=True)
 
             admin_groups = CommunityAdminGroup.objects.all()
             for group in admin_groups:
@@ -173,6 +174,7 @@ class MiscellaneousStore:
                         community_member = CommunityMember.objects.create(
                             community=group.community, user=member, is_admin=True
                         )
+                        CommunityImpact.record_member_change(group.community, member, joined=True)
 
             return {"name": "community_member_backfill", "status": "done"}, None
         except Exception as e:
@@ -1,3 +1,4 @@
+from _main_.utils.response_cache import response_cache
 from database.models import Tag
 from _main_.utils.massenergize_errors import MassEnergizeAPIError, InvalidResourceError, ServerError, CustomMassenergizeError
 from _main_.utils.massenergize_logger import log
@@ -35,6 +36,7 @@ class TagStore:
     if not tag:
       return None, InvalidResourceError()
     tag.update(**args)
+    response_cache.invalidate(Tag)
     return tag, None
 
 
@@ -5,16 +5,17 @@ from api.store.common import get_media_info, make_media_info
 from api.utils.api_utils import get_sender_email, is_admin_of_community
 from api.utils.filter_functions import get_team_member_filter_params, get_teams_filter_params
 from api.utils.constants import TEAM_APPROVAL_EMAIL_TEMPLATE
-from database.models import Team, UserProfile, Media, Community, TeamMember, CommunityAdminGroup, UserActionRel
+from database.models import Team, UserProfile, Media, Community, TeamMember, CommunityAdminGroup, UserActionRel, Menu
 from _main_.utils.massenergize_errors import MassEnergizeAPIError, InvalidResourceError, CustomMassenergizeError, NotAuthorizedError
 from _main_.utils.context import Context
 from _main_.utils.constants import COMMUNITY_URL_ROOT, ADMIN_URL_ROOT
 from .utils import get_community_or_die, get_user_or_die, get_admin_communities, getCarbonScoreFromActionRel, unique_media_filename
 from _main_.utils.massenergize_logger import log
 from _main_.utils.emailer.send_email import send_massenergize_email, send_massenergize_email_with_attachments
-from carbon_calculator.carbonCalculator import AverageImpact
+from carbon_calculator.carbonCalculator import AverageImpacts
+from carbon_calculator.models import Action as CCAction
 from typing import Tuple
-from django.db.models import Q
+from django.db.models import Count, Prefetch, Q
 def can_set_parent(parent, this_team=None):
   if parent.parent:
     return False
@@ -35,6 +36,57 @@ def get_team_users(team):
     return set().union(team_users, child_team_users)
   
 
+def get_team_user_stats(teams):
+  """
+  Sets team.stats_user_ids, the users counted in the stats of each team (see get_team_users; only users
+  that have joined the platform), and returns {user id: {"households", "actions", "actions_completed",
+  "actions_todo", "carbon_footprint_reduction"}} for those users, with one grouped query per figure.
+  """
+  team_ids = [team.id for team in teams]
+  children = {}
+  for child_id, parent_id in Team.objects.filter(parent__in=team_ids, is_deleted=False, is_published=True).values_list("id", "parent_id"):
+    children.setdefault(parent_id, []).append(child_id)
+
+  all_team_ids = set(team_ids).union(*children.values())
+  members = {}
+  for team_id, user_id in TeamMember.objects.filter(
+    team__in=all_team_ids, is_deleted=False, user__accepts_terms_and_conditions=True
+  ).values_list("team_id", "user_id"):
+    members.setdefault(team_id, set()).add(user_id)
+
+  for team in teams:
+    user_ids = set(members.get(team.id, ()))
+    if not team.parent_id:
+      user_ids = user_ids.union(*(members.get(child_id, ()) for child_id in children.get(team.id, ())))
+    team.stats_user_ids = user_ids
+
+  user_ids = set().union(*members.values())
+  stats = {user_id: {"households": 0, "actions": 0, "actions_completed": 0, "actions_todo": 0, "carbon_footprint_reduction": 0} for user_id in user_ids}
+
+  households = UserProfile.real_estate_units.through.objects.filter(userprofile__in=user_ids)
+  for user_id, count in households.order_by().values_list("userprofile_id").annotate(count=Count("id")).values_list("userprofile_id", "count"):
+    stats[user_id]["households"] = count
+
+  action_rels = UserActionRel.objects.filter(user__in=user_ids).order_by()
+  for row in action_rels.values("user").annotate(
+    actions=Count("id"), actions_completed=Count("id", filter=Q(status="DONE")), actions_todo=Count("id", filter=Q(status="TODO"))
+  ):
+    stats[row["user"]].update(actions=row["actions"], actions_completed=row["actions_completed"], actions_todo=row["actions_todo"])
+
+  # the average impact only depends on the calculator action and completion date
+  impact_groups = list(
+    action_rels.filter(status="DONE", action__calculator_action__isnull=False)
+    .values("user", "action__calculator_action", "date_completed")
+    .annotate(count=Count("id"))
+  )
+  calculator_actions = CCAction.objects.in_bulk({group["action__calculator_action"] for group in impact_groups})
+  impacts = AverageImpacts([(calculator_actions[group["action__calculator_action"]], group["date_completed"]) for group in impact_groups])
+  for group, impact in zip(impact_groups, impacts):
+    stats[group["user"]]["carbon_footprint_reduction"] += group["count"] * impact
+
+  return stats
+
+
 class TeamStore:
   def __init__(self):
     self.name = "Team Store/DB"
@@ -97,27 +149,27 @@ class TeamStore:
       if not context.is_sandbox:
         teams = teams.filter(is_published=True)
 
+      teams = list(teams.select_related(
+        "primary_community", "primary_community__logo", "primary_community__favicon", "logo",
+        "parent", "parent__primary_community", "parent__primary_community__logo",
+        "parent__primary_community__favicon", "parent__logo",
+      ).prefetch_related(
+        Prefetch("teammember_set", queryset=TeamMember.objects.select_related("team", "user")),
+        Prefetch("parent__teammember_set", queryset=TeamMember.objects.select_related("team", "user")),
+        Prefetch("primary_community__menu_set", queryset=Menu.objects.filter(is_published=True), to_attr="prefetched_menus"),
+        Prefetch("parent__primary_community__menu_set", queryset=Menu.objects.filter(is_published=True), to_attr="prefetched_menus"),
+      ))
+      user_stats = get_team_user_stats(teams)
+
       ans = []
       for team in teams:
         res = {"members": 0, "households": 0, "actions": 0, "actions_completed": 0, "actions_todo": 0, "carbon_footprint_reduction": 0}
         res["team"] = team.simple_json()
-   
-        users = get_team_users(team)
-        res["members"] = 0
-
-        for user in users:
-          # only include users that have joined the platform
-          if user.accepts_terms_and_conditions:
-            res["members"] += 1
-            res["households"] += user.real_estate_units.count()
-            actions = user.useractionrel_set.all()
-            res["actions"] += len(actions)
-            done_actions = actions.filter(status="DONE").prefetch_related('action__calculator_action')
-            res["actions_completed"] += done_actions.count()
-            res["actions_todo"] += actions.filter(status="TODO").count()
-            for done_action in done_actions:
-              if done_action.action and done_action.action.calculator_action:
-                res["carbon_footprint_reduction"] += AverageImpact(done_action.action.calculator_action, done_action.date_completed)
+
+        for user_id in team.stats_user_ids:
+          res["members"] += 1
+          for key, value in user_stats.get(user_id, {}).items():
+            res[key] += value
 
         ans.append(res)
 
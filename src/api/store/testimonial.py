@@ -10,6 +10,7 @@ from _main_.utils.footage.spy import Spy
 from _main_.utils.massenergize_errors import CustomMassenergizeError, InvalidResourceError, MassEnergizeAPIError, \
     NotAuthorizedError
 from _main_.utils.massenergize_logger import log
+from _main_.utils.response_cache import response_cache
 from api.store.common import get_media_info, make_media_info
 from api.tests.common import makeUserUpload, RESET
 from api.utils.api_utils import is_admin_of_community
@@ -375,6 +376,7 @@ class TestimonialStore:
             return None, NotAuthorizedError()
         if type(rank) == int  and int(rank) is not None:
           testimonials.update(rank=rank)
+          response_cache.invalidate(Testimonial)
           testimonial = testimonials.first()
 
           # ----------------------------------------------------------------
@@ -397,6 +399,7 @@ class TestimonialStore:
       if community and not is_admin_of_community(context, community.id):
         return None, NotAuthorizedError()
       testimonials.update(is_deleted=True, is_published=False)
+      response_cache.invalidate(Testimonial)
       testimonial = testimonials.first()
       # ----------------------------------------------------------------
       Spy.create_testimonial_footage(testimonials = [testimonial], context = context,  type = FootageConstants.delete(), notes =f"Deleted ID({testimonial_id})")
@@ -6,13 +6,14 @@ from api.utils.api_utils import get_sender_email, is_admin_of_community
 from api.utils.filter_functions import get_users_filter_params
 from api.store.common import create_pdf_from_rich_text, sign_mou
 from apps__campaigns.models import CampaignFollow
-from database.models import CommunityAdminGroup, Footage, Policy, PolicyAcceptanceRecords, UserProfile, CommunityMember, EventAttendee, RealEstateUnit, Location, UserActionRel, \
+from database.models import CommunityAdminGroup, CommunityImpact, Footage, Policy, PolicyAcceptanceRecords, UserProfile, CommunityMember, EventAttendee, RealEstateUnit, Location, UserActionRel, \
   Vendor, Action, Data, Community, Media, TeamMember, Team, Testimonial
 from _main_.utils.massenergize_errors import MassEnergizeAPIError, InvalidResourceError, CustomMassenergizeError, NotAuthorizedError
 from _main_.utils.massenergize_response import MassenergizeResponse
 from _main_.utils.context import Context
 from _main_.settings import DEBUG, IS_PROD, IS_CANARY
 from _main_.utils.massenergize_logger import log
+from _main_.utils.response_cache import response_cache
 from .utils import get_community, get_user_from_context, get_user_or_die, get_community_or_die, get_admin_communities, remove_dups, \
   find_reu_community, split_location_string, check_location
 import json
@@ -83,66 +84,6 @@ def _get_or_create_reu_location(args, user=None):
     print("Location with zipcode " , zipcode , " found for user " , user.preferred_name)
   return reuloc
 
-def _update_action_data_totals(action, household, delta): 
-
-  # data corruption has been seen, and this routine is one possible culprit
-  if abs(delta)>1:
-    # this is only used to increment or decrement values by one.  Something wrong here
-    msg = "_update_action_data_totals: data corruption check 1: delta %d" % (delta)
-    raise Exception(msg)
-
-  # update community totals for this action
-  for t in action.tags.all():
-
-    # for geographic communities, we update the community where the household is
-    community = action.community
-    if action.community.is_geographically_focused:
-      community = household.community
-
-    # take note of community action goal, to avoid data corruption
-    actions_goal = 1000
-    if community.goal:
-      actions_goal = max(community.goal.target_number_of_actions, actions_goal)
-
-    data = Data.objects.filter(community=community, tag=t)
-    if data:
-      # protect against going below 0
-      #  data.update(value=F("value") + value)
-      d = data.first()
-
-      oldvalue = d.value
-      if oldvalue > actions_goal:
-        # oldvalue already too high
-        msg = "_update_action_data_totals: data corruption check 2: old value %d" % (oldvalue)
-        raise Exception(msg)
-
-      value = max(oldvalue + delta, 0)
-      if value != oldvalue:
-
-        # check for data corruption:
-        if abs(value-oldvalue)>1:
-          # this is only used to increment or decrement values by one.  Something wrong here
-          msg = "_update_action_data_totals: data corruption check 3: old value %d, new value %d" % (oldvalue, value)
-          raise Exception(msg)
-
-
-        d.value = value
-        d.save()
-
-    elif delta>0:
-      # data for this community, action does not exist so create one
-      d = Data.objects.create(value=delta, name=f"{t.name}")
-      d.community=community
-      d.tag = t
-
-      #final check for corruption:
-      if d.value > actions_goal:
-        # oldvalue already too high
-        msg = "_update_action_data_totals: data corruption check 4: d.value %d" % (d.value)
-        raise Exception(msg)
-
-      d.save()
-
 def can_be_deleted(user, context):
   if context.user_is_super_admin and not user.is_super_admin:
     return True
@@ -351,7 +292,9 @@ class UserStore:
       action_rels = UserActionRel.objects.filter(user=user, real_estate_unit=household, action=action)
       if action_rels:
 
-        oldstatus = action_rels.first().status
+        old_action_rel = action_rels.first()
+        oldstatus = old_action_rel.status
+        old_date_completed = old_action_rel.date_completed
         action_rels.update(status=status,
                   date_completed=date_completed,
                   carbon_impact=carbon_impact
@@ -369,15 +312,18 @@ class UserStore:
           carbon_impact=carbon_impact
         )
         oldstatus = None
+        old_date_completed = None
       
       if vendor_id:
         action_rel.vendor = vendor
       action_rel.save()
 
+      CommunityImpact.record_action_rel_change(action_rel, oldstatus == "DONE", old_date_completed)
+
       if status == "DONE" and oldstatus != "DONE":
-        _update_action_data_totals(action, household, +1)  # add one to action totals
+        Data.record_action_change(action, household, +1)  # add one to action totals
       elif status == "TODO" and oldstatus == "DONE":
-        _update_action_data_totals(action, household, -1)  # subtract one from action totals
+        Data.record_action_change(action, household, -1)  # subtract one from action totals
 
       return action_rel, None
     except Exception as e:
@@ -416,7 +362,11 @@ class UserStore:
       if not context.user_is_admin() and not user.real_estate_units.filter(id=household_id).exists():
         return None, CustomMassenergizeError("you are not a member of this household")
       
-      return RealEstateUnit.objects.get(pk=household_id).delete(), None
+      household = RealEstateUnit.objects.get(pk=household_id)
+      CommunityImpact.record_household_actions(household, removed=True)
+      result = household.delete()
+      CommunityImpact.refresh_households(household.community)
+      return result, None
     
     except Exception as e:
       log.exception(e)
@@ -439,6 +389,8 @@ class UserStore:
       reu.save()
       user.real_estate_units.add(reu)
       user.save()
+
+      CommunityImpact.refresh_households(reu.community)
       
       return reu, None
     
@@ -466,12 +418,20 @@ class UserStore:
       reu.unit_type = args.get("unit_type", "RESIDENTIAL")
       reu.address = reuloc
       verbose = DEBUG
+      old_community = reu.community
       community = find_reu_community(reu, verbose)
+      moved = community and community != old_community
+      if moved:
+        CommunityImpact.record_household_actions(reu, removed=True)
       if community:
         if verbose: print("Updating the REU with zipcode " + reu.address.zipcode + " to the community " + community.name)
         reu.community = community
       
       reu.save()
+      if moved:
+        CommunityImpact.record_household_actions(reu)
+        CommunityImpact.refresh_households(old_community)
+        CommunityImpact.refresh_households(community)
       return reu, None
     except Exception as e:
       log.exception(e)
@@ -673,6 +633,7 @@ class UserStore:
       if not community_member_exists:
         # add them as a member to community 
         CommunityMember.objects.create(user=user, community=community)
+        CommunityImpact.record_member_change(community, user, joined=True)
         
       # create their first household, if a location was specified, and if they don't have a household
       reu = user.real_estate_units.all()
@@ -680,6 +641,7 @@ class UserStore:
         household = RealEstateUnit.objects.create(name="Home", unit_type="residential", community=community,
                                                   location=location)
         user.real_estate_units.add(household)
+        CommunityImpact.refresh_households(community)
 
       user.save()
       
@@ -713,6 +675,7 @@ class UserStore:
         remove_locked_fields(args)
         
         users.update(**args)
+        response_cache.invalidate(UserProfile)
         user = users.first()
         
         if preferences: 
@@ -757,6 +720,7 @@ class UserStore:
       old_email = user.email
       new_email = "DELETED-" + datetime.today().strftime('%Y%m%d-%H%M') + "-" + old_email 
       users.update(is_deleted=True, email=new_email)
+      response_cache.invalidate(UserProfile)
 
       user = users.first()
 
@@ -766,16 +730,26 @@ class UserStore:
         profile_picture.is_deleted = True
         profile_picture.save()
 
-      # mark all real_estate_units is_deleted=true
-      for reu in user.real_estate_units.all():
-        reu.is_deleted = True
-        reu.save()
-
       #if a CommunityMember links to user, mark is_deleted=true
-      communityMembers = CommunityMember.objects.filter(user=user, is_deleted=False)
+      communityMembers = CommunityMember.objects.filter(user=user, is_deleted=False).select_related("community")
       for communityMember in communityMembers:
         communityMember.is_deleted = True
         communityMember.save()
+        CommunityImpact.record_member_change(communityMember.community, user, joined=False)
+
+      # mark any UserActionRels is_deleted=true
+      # with the memberships gone, only the totals of the households' communities still count them
+      for ual in UserActionRel.objects.filter(user=user, is_deleted=False).select_related("action__calculator_action", "real_estate_unit__community"):
+        if ual.status == "DONE":
+          CommunityImpact.record_action_rel_change(ual, True, ual.date_completed, is_done=False)
+        ual.is_deleted=True
+        ual.save()
+
+      # mark all real_estate_units is_deleted=true
+      for reu in user.real_estate_units.all():
+        reu.is_deleted = True
+        reu.save()
+        CommunityImpact.refresh_households(reu.community)
 
       # if a Team includes on Admins, remove it.
       # TODO: and notify other admins. if no other admins notify cadmin
@@ -809,11 +783,6 @@ class UserStore:
         testimonial.is_deleted = True
         testimonial.save()
 
-      # mark any UserActionRels is_deleted=true
-      for ual in UserActionRel.objects.filter(user=user, is_deleted=False):
-        ual.is_deleted=True
-        ual.save()
-
       # SKIP - if a Vendor includes as onboarding contact, notify cadmin
 
       return users.first(), None
@@ -957,11 +926,14 @@ class UserStore:
         action = user_action.action
         reu = user_action.real_estate_unit
 
+        if oldstatus == "DONE":
+          CommunityImpact.record_action_rel_change(user_action, True, user_action.date_completed, is_done=False)
+
         result = user_action.delete()
 
         # if action had been marked as DONE, decrement community total for the action
         if oldstatus == "DONE":
-          _update_action_data_totals(action, reu, -1)
+          Data.record_action_change(action, reu, -1)
 
       else:
         # didn't find the action: something missing from database - probably a previous error -- no consequence
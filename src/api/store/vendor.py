@@ -9,6 +9,7 @@ from _main_.utils.context import Context
 from .utils import get_community_or_die, get_admin_communities, get_new_title
 from _main_.utils.context import Context
 from _main_.utils.massenergize_logger import log
+from _main_.utils.response_cache import response_cache
 from typing import Tuple
 from django.db.models import Q
 
@@ -243,6 +244,7 @@ class VendorStore:
       if id and rank:
         vendors = Vendor.objects.filter(id=id)
         vendors.update(rank=rank)
+        response_cache.invalidate(Vendor)
         vendor = vendors.first()
         # ----------------------------------------------------------------
         Spy.create_event_footage(vendors = [vendor], context = context, type = FootageConstants.update(), notes=f"Rank updated to - {rank}")
@@ -259,6 +261,7 @@ class VendorStore:
     try:
       vendors = Vendor.objects.filter(id=vendor_id)
       vendors.update(is_deleted=True)
+      response_cache.invalidate(Vendor)
       #TODO: also remove it from all places that it was ever set in many to many or foreign key
       vendor = vendors.first()
       # ----------------------------------------------------------------
@@ -8,7 +8,7 @@ from django.http import HttpResponse
 from django.utils import timezone
 from django.utils.timezone import utc
 
-from _main_.utils.common import parse_datetime_to_aware
+from _main_.utils.common import parse_datetime_to_aware, write_csv_to_spooled_file
 from _main_.utils.context import Context
 from _main_.utils.emailer.send_email import send_massenergize_email, send_massenergize_email_with_attachments
 from _main_.utils.massenergize_logger import log
@@ -33,24 +33,26 @@ from _main_.celery.app import app
 
 
 def generate_csv_and_email(data, download_type, community_name=None, email=None,filename=None):
+    """
+    data can be any iterable of rows; rows are written to a temporary csv file chunk by chunk,
+    so they are not held in memory next to the csv. Postmark takes the attachment base64 encoded
+    in the request body, so the finished file is read back whole for it.
+    """
     try:
-         response = HttpResponse(content_type="text/csv")
          now = datetime.datetime.now().strftime("%Y%m%d")
          if not filename:
              if not community_name:
                  filename = "all-%s-data-%s.csv" % (download_type, now)
              else:
                  filename = "%s-%s-data-%s.csv" % (community_name, download_type, now)
-         writer = csv.writer(response)
-         for row in data:
-             writer.writerow(row)
          user = UserProfile.objects.get(email=email)
          temp_data = {
              'data_type': download_type,
              "name":user.full_name,
              "show_link":False
          }
-         send_massenergize_email_with_attachments(DATA_DOWNLOAD_TEMPLATE,temp_data,[email], response.content, filename, None)
+         with write_csv_to_spooled_file(data) as csv_file:
+             send_massenergize_email_with_attachments(DATA_DOWNLOAD_TEMPLATE,temp_data,[email], csv_file.read(), filename, None)
          return True
     except Exception as e:
         log.exception(e)
@@ -76,15 +78,16 @@ def download_data(self, args, download_type):
         (files, com_name), err = store.users_download(context, community_id=args.get("community_id"), team_id=args.get("team_id"))
         if  err:
             error_notification(USERS, email)
-        else:
-            generate_csv_and_email(data=files, download_type=USERS, community_name=com_name, email=email)
+        # rows are produced while the csv is written, so errors can also show up there
+        elif not generate_csv_and_email(data=files, download_type=USERS, community_name=com_name, email=email):
+            error_notification(USERS, email)
 
     elif download_type == ACTIONS:
         (files, com_name), err = store.actions_download(context, community_id=args.get("community_id"))
         if err:
             error_notification(ACTIONS, email)
-        else:
-            generate_csv_and_email(data=files, download_type=ACTIONS, community_name=com_name, email=email)
+        elif not generate_csv_and_email(data=files, download_type=ACTIONS, community_name=com_name, email=email):
+            error_notification(ACTIONS, email)
     
     elif download_type == ACTION_USERS:
         (files, action_name), err = store.action_users_download(context, action_id=args.get("action_id"))
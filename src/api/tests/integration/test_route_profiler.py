@@ -0,0 +1,37 @@
+import json
+
+from django.test import Client, TestCase
+
+from _main_.utils.route_profiler import route_profiler
+from api.tests.common import createUsers, signinAs
+
+
+class RouteProfilerRoutesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.cadmin, cls.sadmin = createUsers()
+
+    def setUp(self):
+        self.client = Client()
+        self.addCleanup(setattr, route_profiler, "enabled", route_profiler.enabled)
+        self.addCleanup(route_profiler.clear)
+        route_profiler.enabled = True
+        route_profiler.clear()
+
+    def test_only_super_admins(self):
+        signinAs(self.client, self.cadmin)
+        response = self.client.post("/api/profiler.routes.list").json()
+        self.assertFalse(response["success"])
+
+    def test_list_and_export(self):
+        signinAs(self.client, self.sadmin)
+        self.client.post("/api/preferences.list")
+
+        response = self.client.post("/api/profiler.routes.list").json()
+        self.assertTrue(response["success"])
+        self.assertTrue(response["data"]["enabled"])
+        self.assertIn("/preferences.list", [s["route"] for s in response["data"]["summary"]])
+
+        response = self.client.post("/api/profiler.routes.export")
+        self.assertEqual(response["Content-Disposition"], "attachment; filename=route_profiles.json")
+        self.assertIn("entries", json.loads(response.content))
@@ -0,0 +1,55 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from _main_.utils.common import serialize_all
+from carbon_calculator.models import Action as CCAction, Category, Subcategory
+from database.models import Action, Community, RealEstateUnit, Tag, TagCollection, UserActionRel, UserProfile, Vendor
+
+
+class ActionJsonTest(TestCase):
+
+    def setUp(self):
+        self.community = Community.objects.create(name="Action Json", subdomain="action-json")
+        self.collection = TagCollection.objects.create(name="Action Json Category")
+        category = Category.objects.create(name="Action Json Home")
+        self.calculator_action = CCAction.objects.create(
+            name="action_json_action", title="Action json", questions=[], category=category,
+            sub_category=Subcategory.objects.create(name="Action Json Heating", category=category),
+        )
+        self.user = UserProfile.objects.create(email="action-json@test.com", full_name="Action Json")
+        for i in range(2):
+            self.add_action(i)
+
+    def add_action(self, i):
+        action = Action.objects.create(title=f"Action Json {i}", community=self.community, user=self.user,
+                                       calculator_action=self.calculator_action)
+        action.tags.add(Tag.objects.create(name=f"Action Json Tag {i}", tag_collection=self.collection))
+        action.vendors.add(Vendor.objects.create(name=f"Action Json Vendor {i}"))
+        for status in ["DONE", "TODO"] * (i + 1):
+            UserActionRel.objects.create(user=self.user, action=action, real_estate_unit=self.household(), status=status)
+        UserActionRel.objects.create(user=self.user, action=action, real_estate_unit=self.household(), is_deleted=True)
+        return action
+
+    def household(self):
+        return RealEstateUnit.objects.create(name="Home", community=self.community)
+
+    def actions(self):
+        return Action.objects.filter(community=self.community).order_by("id")
+
+    def test_list_matches_single_action_json(self):
+        listed = serialize_all(self.actions())
+        single = [action.simple_json() for action in self.actions()]
+        self.assertEqual(listed, single)
+        self.assertEqual([data["action_users"] for data in listed], [2, 4])
+        self.assertEqual(listed[0]["subcategory"]["category"]["name"], "Action Json Home")
+
+    def test_query_count_does_not_grow_with_actions(self):
+        with CaptureQueriesContext(connection) as before:
+            serialize_all(self.actions())
+        for i in range(2, 6):
+            self.add_action(i)
+        with CaptureQueriesContext(connection) as after:
+            data = serialize_all(self.actions())
+        self.assertEqual(len(data), 6)
+        self.assertEqual(len(after), len(before))
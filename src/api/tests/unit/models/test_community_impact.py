@@ -0,0 +1,111 @@
+from django.test import TestCase
+
+from _main_.utils.context import Context
+from api.store.userprofile import UserStore
+from carbon_calculator.carbonCalculator import AverageImpact
+from carbon_calculator.models import Action as CCAction
+from database.models import Action, Community, CommunityImpact, CommunityMember, RealEstateUnit, UserActionRel, \
+    UserProfile
+
+
+class CommunityImpactModelTest(TestCase):
+
+    def setUp(self):
+        self.cc_action = CCAction.objects.create(name="impact_test_action", title="Impact test action", questions=[])
+        self.geo_community = Community.objects.create(name="Geo", subdomain="impact-geo", is_geographically_focused=True)
+        self.community = Community.objects.create(name="Members", subdomain="impact-members")
+        self.action = Action.objects.create(title="Impact Action", community=self.community,
+                                            calculator_action=self.cc_action)
+
+        self.user = UserProfile.objects.create(email="impact@test.com", full_name="Impact User")
+        CommunityMember.objects.create(user=self.user, community=self.community)
+        self.household = RealEstateUnit.objects.create(name="Home", community=self.geo_community)
+        self.user.real_estate_units.add(self.household)
+
+    def _complete_action(self, status="DONE"):
+        action_rel = UserActionRel.objects.create(user=self.user, action=self.action,
+                                                  real_estate_unit=self.household, status=status)
+        CommunityImpact.record_action_rel_change(action_rel, was_done=False)
+        return action_rel
+
+    def assert_matches_rebuild(self, community):
+        impact = CommunityImpact.objects.get(community=community)
+        rebuilt = CommunityImpact.rebuild(community)
+        self.assertEqual(impact.households_engaged, rebuilt.households_engaged)
+        self.assertEqual(impact.actions_completed, rebuilt.actions_completed)
+        self.assertAlmostEqual(impact.carbon_footprint_reduction, rebuilt.carbon_footprint_reduction)
+
+    def test_rebuild(self):
+        self._complete_action()
+
+        geo_impact = CommunityImpact.rebuild(self.geo_community)
+        self.assertEqual(geo_impact.households_engaged, 1)
+        self.assertEqual(geo_impact.actions_completed, 1)
+        self.assertEqual(geo_impact.carbon_footprint_reduction, AverageImpact(self.cc_action))
+
+        impact = CommunityImpact.rebuild(self.community)
+        self.assertEqual(impact.households_engaged, 1)
+        self.assertEqual(impact.actions_completed, 1)
+
+    def test_incremental_updates_match_rebuild(self):
+        CommunityImpact.rebuild(self.geo_community)
+        CommunityImpact.rebuild(self.community)
+
+        action_rel = self._complete_action()
+        self.assert_matches_rebuild(self.geo_community)
+        self.assert_matches_rebuild(self.community)
+
+        CommunityImpact.record_action_rel_change(action_rel, was_done=True, is_done=False)
+        action_rel.delete()
+        self.assert_matches_rebuild(self.geo_community)
+        self.assert_matches_rebuild(self.community)
+
+    def test_todo_does_not_count(self):
+        CommunityImpact.rebuild(self.community)
+        self._complete_action(status="TODO")
+        self.assertEqual(CommunityImpact.objects.get(community=self.community).actions_completed, 0)
+
+    def test_member_change(self):
+        self._complete_action()
+        other = Community.objects.create(name="Other", subdomain="impact-other")
+        CommunityImpact.rebuild(other)
+
+        CommunityMember.objects.create(user=self.user, community=other)
+        CommunityImpact.record_member_change(other, self.user, joined=True)
+        self.assert_matches_rebuild(other)
+
+        CommunityMember.objects.filter(user=self.user, community=other).delete()
+        CommunityImpact.record_member_change(other, self.user, joined=False)
+        self.assert_matches_rebuild(other)
+
+    def test_delete_user_updates_totals(self):
+        CommunityImpact.rebuild(self.geo_community)
+        CommunityImpact.rebuild(self.community)
+        self._complete_action()
+        self._complete_action_elsewhere()
+
+        context = Context()
+        context.user_is_logged_in = True
+        context.user_is_super_admin = True
+        _, error = UserStore().delete_user(context, self.user.id)
+        self.assertIsNone(error)
+
+        for community in [self.geo_community, self.community]:
+            impact = CommunityImpact.objects.get(community=community)
+            self.assertEqual((impact.households_engaged, impact.actions_completed), (0, 0))
+            self.assert_matches_rebuild(community)
+
+    def _complete_action_elsewhere(self):
+        # a household in no geographic community, whose actions only count for the member community
+        household = RealEstateUnit.objects.create(name="Office")
+        self.user.real_estate_units.add(household)
+        action_rel = UserActionRel.objects.create(user=self.user, action=self.action, real_estate_unit=household,
+                                                  status="DONE")
+        CommunityImpact.record_action_rel_change(action_rel, was_done=False)
+
+    def test_full_json_reads_totals(self):
+        self._complete_action()
+        goal = self.geo_community.full_json()["goal"]
+        self.assertEqual(goal["organic_attained_number_of_households"], 1)
+        self.assertEqual(goal["organic_attained_number_of_actions"], 1)
+        self.assertTrue(CommunityImpact.objects.filter(community=self.geo_community).exists())
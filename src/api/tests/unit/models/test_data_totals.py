@@ -0,0 +1,66 @@
+from django.test import TestCase
+
+from database.models import Action, Community, Data, RealEstateUnit, Tag, TagCollection
+
+
+class DataTotalsModelTest(TestCase):
+
+    def setUp(self):
+        collection = TagCollection.objects.create(name="Data Totals Category")
+        self.home = Tag.objects.create(name="Data Totals Home", tag_collection=collection)
+        self.energy = Tag.objects.create(name="Data Totals Energy", tag_collection=collection)
+        self.community = Community.objects.create(name="Data Totals", subdomain="data-totals")
+        self.geo_community = Community.objects.create(name="Data Totals Geo", subdomain="data-totals-geo",
+                                                      is_geographically_focused=True)
+        self.household = RealEstateUnit.objects.create(name="Home", community=self.geo_community)
+
+        self.action = Action.objects.create(title="Data Totals Action", community=self.community)
+        self.action.tags.set([self.home, self.energy])
+        self.geo_action = Action.objects.create(title="Data Totals Geo Action", community=self.geo_community)
+        self.geo_action.tags.set([self.home])
+
+    def value(self, community, tag):
+        return Data.objects.get(community=community, tag=tag).value
+
+    def test_record_action_change(self):
+        Data.objects.create(community=self.community, tag=self.home, name=self.home.name, value=4)
+
+        Data.record_action_change(self.action, self.household, +1)
+        self.assertEqual(self.value(self.community, self.home), 5)
+        # created on the first completion
+        self.assertEqual(self.value(self.community, self.energy), 1)
+
+        Data.record_action_change(self.action, self.household, -1)
+        Data.record_action_change(self.action, self.household, -1)
+        self.assertEqual(self.value(self.community, self.home), 3)
+        # never below 0
+        self.assertEqual(self.value(self.community, self.energy), 0)
+
+    def test_geographic_community_gets_the_household(self):
+        Data.record_action_change(self.geo_action, self.household, +1)
+        self.assertEqual(self.value(self.geo_community, self.home), 1)
+
+        Data.record_action_change(self.geo_action, None, +1)
+        self.assertEqual(self.value(self.geo_community, self.home), 1)
+
+    def test_corruption_checks(self):
+        with self.assertRaises(Exception):
+            Data.record_action_change(self.action, self.household, +2)
+
+        Data.objects.create(community=self.community, tag=self.energy, name=self.energy.name, value=5000)
+        with self.assertRaises(Exception):
+            Data.record_action_change(self.action, self.household, +1)
+        # nothing was written for the other tag either
+        self.assertFalse(Data.objects.filter(community=self.community, tag=self.home).exists())
+
+    def test_replay_action_changes(self):
+        Data.replay_action_changes([
+            (self.action, self.household, +1),
+            (self.action, self.household, +1),
+            (self.geo_action, self.household, +1),
+            (self.action, self.household, -1),
+            (self.action, self.household, +1),
+        ])
+        self.assertEqual(self.value(self.community, self.home), 2)
+        self.assertEqual(self.value(self.community, self.energy), 2)
+        self.assertEqual(self.value(self.geo_community, self.home), 1)
@@ -0,0 +1,73 @@
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from _main_.utils.common import serialize_all
+from database.models import Community, Event, EventNudgeSetting, FeatureFlagResolver, HomePageSettings, Tag, \
+    TagCollection, UserProfile
+from task_queue.nudges.user_event_nudge import is_event_eligible
+
+
+class EventJsonTest(TestCase):
+
+    def setUp(self):
+        self.community = Community.objects.create(name="Event Json", subdomain="event-json")
+        self.other = Community.objects.create(name="Event Json Other", subdomain="event-json-other")
+        self.home_page = HomePageSettings.objects.create(community=self.community)
+        # only the first home page settings of a community count
+        self.later_home_page = HomePageSettings.objects.create(community=self.community)
+        self.collection = TagCollection.objects.create(name="Event Json Category")
+        self.user = UserProfile.objects.create(email="event-json@test.com", full_name="Event Json")
+        for i in range(3):
+            self.add_event(i)
+
+    def add_event(self, i):
+        start = timezone.now() + timedelta(days=2 * i - 1)
+        event = Event.objects.create(name=f"Event Json {i}", community=self.community, user=self.user,
+                                     start_date_and_time=start, end_date_and_time=start + timedelta(hours=1))
+        event.tags.add(Tag.objects.create(name=f"Event Json Tag {i}", tag_collection=self.collection))
+        event.shared_to.add(self.other)
+        event.communities_under_publicity.add(self.other)
+        # past events are not on the home page
+        self.home_page.featured_events.add(event)
+        EventNudgeSetting.objects.create(event=event).communities.add(self.other)
+        EventNudgeSetting.objects.create(event=event, within_1_week=False)
+        return event
+
+    def events(self):
+        return Event.objects.filter(community=self.community).order_by("id")
+
+    def test_list_matches_single_event_json(self):
+        listed = serialize_all(self.events())
+        single = [event.simple_json() for event in self.events()]
+        self.assertEqual(listed, single)
+        self.assertEqual([data["is_on_home_page"] for data in listed], [False, True, True])
+        self.assertEqual([len(data["settings"]["notifications"]) for data in listed], [1, 1, 1])
+
+        self.later_home_page.featured_events.set(self.home_page.featured_events.all())
+        self.home_page.featured_events.clear()
+        self.assertEqual([data["is_on_home_page"] for data in serialize_all(self.events())], [False] * 3)
+
+    def test_query_count_does_not_grow_with_events(self):
+        serialize_all(self.events())
+        with patch.object(FeatureFlagResolver, "VERSION_CHECK_INTERVAL", 3600), CaptureQueriesContext(connection) as before:
+            serialize_all(self.events())
+        for i in range(3, 7):
+            self.add_event(i)
+        with patch.object(FeatureFlagResolver, "VERSION_CHECK_INTERVAL", 3600), CaptureQueriesContext(connection) as after:
+            data = serialize_all(self.events())
+        self.assertEqual(len(data), 7)
+        self.assertEqual(len(after), len(before))
+
+    def test_nudge_eligibility_uses_prefetched_settings(self):
+        event, task = self.events().last(), SimpleNamespace(frequency="EVERY_WEEK")
+        self.assertTrue(is_event_eligible(event, self.other.id, task))
+        event.community_nudge_settings = [EventNudgeSetting(event=event, never=True)]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertFalse(is_event_eligible(event, self.other.id, task))
+        self.assertEqual(len(queries), 0)
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.utils import timezone
+
+from _main_.utils.feature_flags.FeatureFlagConstants import FeatureFlagConstants
+from database.models import Community, FeatureFlag, get_enabled_flags, UserProfile
+
+
+class FeatureFlagResolverTest(TestCase):
+
+    def setUp(self):
+        self.community = Community.objects.create(name="Flagged", subdomain="flagged")
+        self.other_community = Community.objects.create(name="Unflagged", subdomain="unflagged")
+        self.user = UserProfile.objects.create(email="flags@test.com", full_name="Flag User")
+
+        self.everyone = FeatureFlag.objects.create(name="everyone", key="everyone-ff")
+        self.specific = FeatureFlag.objects.create(name="specific", key="specific-ff",
+                                                   audience=FeatureFlagConstants.for_specific_audience())
+        self.specific.communities.add(self.community)
+        self.specific.users.add(self.user)
+        self.all_except = FeatureFlag.objects.create(name="all_except", key="all-except-ff",
+                                                     audience=FeatureFlagConstants.for_all_except())
+        self.all_except.communities.add(self.community)
+        FeatureFlag.objects.create(name="expired", key="expired-ff",
+                                   expires_on=timezone.now() - timedelta(days=1))
+        self.specific.save()
+
+    def keys(self, obj, users=False):
+        # other test modules leave their own flags behind, only look at ours
+        ours = {"everyone-ff", "specific-ff", "all-except-ff", "expired-ff"}
+        return {f["key"] for f in get_enabled_flags(obj, users)} & ours
+
+    def test_enabled_flags_for_community(self):
+        self.assertEqual(self.keys(self.community), {"everyone-ff", "specific-ff"})
+        self.assertEqual(self.keys(self.other_community), {"everyone-ff", "all-except-ff"})
+
+    def test_enabled_flags_for_user(self):
+        self.assertEqual(self.keys(self.user, users=True), {"everyone-ff", "specific-ff", "all-except-ff"})
+
+    def test_save_invalidates(self):
+        self.assertNotIn("specific-ff", self.keys(self.other_community))
+        self.specific.communities.add(self.other_community)
+        self.specific.save()
+        self.assertIn("specific-ff", self.keys(self.other_community))
+
+    def test_queries_do_not_grow_with_communities(self):
+        get_enabled_flags(self.community)
+        with CaptureQueriesContext(connection) as ctx:
+            for community in Community.objects.all():
+                get_enabled_flags(community)
+        # one for the communities, then at most a version check per lookup
+        self.assertLessEqual(len(ctx.captured_queries), 1 + Community.objects.count())
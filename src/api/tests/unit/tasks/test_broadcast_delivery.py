@@ -0,0 +1,146 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from _main_.utils.constants import AudienceType
+from _main_.utils.context import Context
+from _main_.utils.emailer.broadcast import FAILED, SENT, FakeTransport, send_broadcast_email
+from api.store.message import MessageStore
+from database.models import Message, UserProfile
+from task_queue.database_tasks.shedule_admin_messages import schedule_admin_messages
+from task_queue.models import Task, TaskRun
+from task_queue.type_constants import TaskStatus
+
+EMAILS = [f"broadcast{i}@test.com" for i in range(7)]
+
+
+class BroadcastDeliveryTest(TestCase):
+
+    def send(self, transport, recipients=EMAILS, **kwargs):
+        return send_broadcast_email("template", {"body": "Hello"}, recipients, transport=transport,
+                                    retry_delay=0, **{"batch_size": 3, "workers": 2, **kwargs})
+
+    def test_batches(self):
+        transport = FakeTransport()
+        outcomes = self.send(transport, recipients=[*EMAILS, EMAILS[0], None, ""])
+        self.assertEqual([len(batch) for batch in transport.batches if batch], [3, 3, 1])
+        self.assertEqual(sorted(transport.sent), EMAILS)
+        self.assertEqual([outcome["batch"] for outcome in outcomes], [0, 1, 2])
+        self.assertTrue(all(outcome["status"] == SENT and outcome["attempts"] == 1 for outcome in outcomes))
+        self.assertEqual(self.send(FakeTransport(), recipients=[]), [])
+
+    def test_retries(self):
+        transport = FakeTransport(failures=2)
+        outcomes = self.send(transport, workers=1)
+        self.assertEqual(sorted(transport.sent), EMAILS)
+        self.assertEqual([outcome["attempts"] for outcome in outcomes], [3, 1, 1])
+
+        outcomes = self.send(FakeTransport(failures=2), retries=2, workers=1)
+        self.assertEqual([outcome["status"] for outcome in outcomes], [FAILED, SENT, SENT])
+        self.assertEqual(outcomes[0]["failed"], {email: "Postmark is unavailable" for email in EMAILS[:3]})
+        self.assertEqual(outcomes[0]["sent"], [])
+
+    def test_refused_recipients(self):
+        outcomes = self.send(FakeTransport(rejected=[EMAILS[1]]))
+        self.assertEqual(outcomes[0]["status"], SENT)
+        self.assertEqual(outcomes[0]["sent"], [EMAILS[0], EMAILS[2]])
+        self.assertEqual(outcomes[0]["failed"], {EMAILS[1]: "Inactive recipient"})
+
+
+class ScheduledBroadcastTest(TestCase):
+
+    def setUp(self):
+        self.users = users = [UserProfile.objects.create(email=email, full_name=email) for email in EMAILS]
+        self.message = Message.objects.create(title="Broadcast", body="Hello", schedule_info={"recipients": {
+            "audience": ",".join(str(user.id) for user in users),
+            "audience_type": AudienceType.USERS.value,
+        }})
+        self.task = Task.objects.create(name=str(self.message.id), status=TaskStatus.CREATED.value,
+                                        job_name="Send Scheduled Email", frequency="ONE_OFF")
+
+    def run_task(self, transport, task=None):
+        task = task or self.task
+        run = TaskRun.objects.create(task=task)
+        result, error = schedule_admin_messages(task, transport=transport)
+        if error:
+            run.mark_failed(error)
+        else:
+            run.mark_complete(result)
+        run.refresh_from_db()
+        return run, result, error
+
+    @patch("_main_.utils.emailer.broadcast.time.sleep")
+    @patch("_main_.utils.emailer.broadcast.BATCH_SIZE", 3)
+    def test_runs_record_batches_and_are_idempotent(self, sleep):
+        # the first batch keeps failing, which fails the run, but what the other batches sent is kept on it
+        run, result, error = self.run_task(UnavailableFor(EMAILS[0], rejected=[EMAILS[6]]))
+        self.assertIsNone(result)
+        self.assertEqual(error, "1 of 3 batches could not be sent: Postmark is unavailable")
+        self.assertEqual(run.status, TaskStatus.FAILED.value)
+        self.assertEqual((run.result["sent"], run.result["failed"]), (3, 4))
+        self.assertEqual([batch["attempts"] for batch in run.result["batches"]], [3, 1, 1])
+
+        # only the recipients that were not sent the message get it
+        transport = FakeTransport()
+        run, result, error = self.run_task(transport)
+        self.assertIsNone(error)
+        self.assertEqual(run.status, TaskStatus.SUCCEEDED.value)
+        self.assertEqual(run.result, result)
+        self.assertEqual(transport.batches, [EMAILS[:3], [EMAILS[6]]])
+        self.assertEqual((result["sent"], result["failed"], result["skipped"]), (4, 0, 3))
+
+        transport = FakeTransport()
+        run, result, error = self.run_task(transport)
+        self.assertEqual(transport.batches, [])
+        self.assertEqual((result["sent"], result["skipped"]), (0, 7))
+
+    def test_run_that_never_finished_is_not_sent_again(self):
+        # a worker killed mid-broadcast leaves its run RUNNING with the batches it sent
+        stopped = TaskRun.objects.create(task=self.task, result={"batches": [{"sent": EMAILS[:5]}]})
+        transport = FakeTransport()
+        run, result, error = self.run_task(transport)
+        self.assertEqual(transport.batches, [EMAILS[5:]])
+        self.assertEqual((result["sent"], result["skipped"]), (2, 5))
+        stopped.refresh_from_db()
+        self.assertEqual(stopped.status, TaskStatus.RUNNING.value)
+
+    def test_edited_message_is_sent_again(self):
+        admin = UserProfile.objects.create(email="broadcast-admin@test.com", full_name="Admin", is_super_admin=True)
+        context = Context()
+        context.user_id, context.user_is_logged_in, context.user_is_super_admin = admin.id, True, True
+        args = {"subject": "Broadcast", "message": "Hello", "audience_type": AudienceType.USERS.value,
+                "audience": ",".join(str(user.id) for user in self.users)}
+        message, error = MessageStore().send_message(context, args)
+        self.assertIsNone(error)
+        task = Task.objects.get(name=message.id)
+
+        self.run_task(FakeTransport(), task)
+        # the same task is reused when the message is edited and scheduled again
+        message, error = MessageStore().send_message(context, {**args, "id": message.id, "message": "Hello again"})
+        self.assertIsNone(error)
+        self.assertEqual(Task.objects.filter(name=message.id).count(), 1)
+
+        transport = FakeTransport()
+        run, result, error = self.run_task(transport, task)
+        self.assertEqual(sorted(transport.sent), EMAILS)
+        self.assertEqual((result["sent"], result["skipped"]), (7, 0))
+
+        transport = FakeTransport()
+        run, result, error = self.run_task(transport, task)
+        self.assertEqual(transport.batches, [])
+        self.assertEqual((result["sent"], result["skipped"]), (0, 7))
+
+
+class UnavailableFor(FakeTransport):
+    """
+    Fails every batch with the given recipient
+    """
+
+    def __init__(self, email, **kwargs):
+        super().__init__(**kwargs)
+        self.email = email
+
+    def send(self, template, t_model, recipients, sender=None, tag=None):
+        if self.email in recipients:
+            raise ConnectionError("Postmark is unavailable")
+        return super().send(template, t_model, recipients, sender=sender, tag=tag)
@@ -0,0 +1,128 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.tests.common import makeAction, makeCommunity, makeMembership, makeTeam, makeTestimonial, makeUser
+from carbon_calculator.models import Action as CCAction
+from database.models import Community, CommunitySnapshot, Event, Goal, RealEstateUnit, UserActionRel, Vendor
+from task_queue.views import create_snapshots
+
+
+class CommunitySnapshotsTest(TestCase):
+
+    def setUp(self):
+        goal = Goal.objects.create(name="Snapshot Goal", initial_number_of_households=3, attained_number_of_actions=2,
+                                   initial_carbon_footprint_reduction=100)
+        self.community = makeCommunity(name="Snapshot", is_published=True, goal=goal)
+        self.geo_community = makeCommunity(name="Snapshot Geo", is_geographically_focused=True)
+        self.deleted_community = makeCommunity(name="Snapshot Deleted", is_deleted=True)
+
+        guest = makeUser(user_info={"user_type": "guest_user"})
+        user = makeUser()
+        deleted_user = makeUser(is_deleted=True)
+        makeMembership(community=self.community, user=guest)
+        makeMembership(community=self.community, user=user)
+        makeMembership(community=self.geo_community, user=user)
+        makeMembership(community=self.geo_community, user=guest, is_deleted=True)
+
+        home, guest_home, user_home = [
+            RealEstateUnit.objects.create(name=name, community=community) for name, community in
+            [("home", self.community), ("guest home", self.geo_community), ("user home", self.geo_community)]
+        ]
+        guest.real_estate_units.set([home, guest_home])
+        user.real_estate_units.set([user_home])
+        deleted_user.real_estate_units.set([RealEstateUnit.objects.create(name="gone", community=self.community)])
+
+        calculator_action = CCAction.objects.get(name="energy_fair")
+        action = makeAction(community=self.community, calculator_action=calculator_action, is_published=True)
+        other_action = makeAction(community=self.community)
+        for rel_user, rel_action, unit, status, is_deleted in [
+            (guest, action, home, "DONE", False),
+            (guest, other_action, guest_home, "DONE", False),
+            (user, action, user_home, "DONE", False),
+            (user, other_action, user_home, "TODO", False),
+            (guest, action, guest_home, "DONE", True),
+        ]:
+            UserActionRel.objects.create(user=rel_user, action=rel_action, real_estate_unit=unit, status=status,
+                                         is_deleted=is_deleted, date_completed=timezone.now().date())
+
+        parent = makeTeam(community=self.community, is_published=True)
+        makeTeam(community=self.community, is_published=True, parent=parent)
+        makeTeam(community=self.community)
+        makeTestimonial(community=self.community, is_published=True)
+        makeTestimonial(community=self.community)
+        for i, (community, is_published) in enumerate([(self.community, True), (self.geo_community, True),
+                                                       (self.community, False)]):
+            Vendor.objects.create(name=f"Snapshot Vendor {i}", is_published=is_published).communities.add(community)
+
+        now = timezone.now()
+        current, past = now + timedelta(days=1), now - timedelta(days=1)
+        for community, end, shared_to, extra in [
+            (self.community, current, [self.geo_community, self.deleted_community], {}),
+            (self.community, past, [], {}),
+            (self.community, current, [], {"is_deleted": True}),
+            (self.geo_community, current, [self.community], {"is_global": True}),
+            (self.geo_community, past, [self.community], {}),
+        ]:
+            event = Event.objects.create(name="Snapshot Event", community=community, start_date_and_time=end,
+                                         end_date_and_time=end, **extra)
+            event.shared_to.set(shared_to)
+
+    def snapshot(self, community):
+        snapshot = CommunitySnapshot.objects.get(community=community)
+        return {field: getattr(snapshot, field) for field in SNAPSHOT_FIELDS}
+
+    def test_create_snapshots(self):
+        result, error = create_snapshots()
+        self.assertIsNone(error)
+        self.assertEqual(result, {"scope": "SADMIN", "audience": "All Super"})
+        self.assertFalse(CommunitySnapshot.objects.filter(community=self.deleted_community).exists())
+
+        # members' households and actions
+        self.assertEqual(self.snapshot(self.community), {
+            "is_live": True, "households_total": 6, "households_user_reported": 3, "households_manual_addition": 3,
+            "households_partner": 0, "primary_community_users_count": 1, "member_count": 2, "actions_live_count": 1,
+            "actions_total": 5, "actions_partner": 2, "actions_user_reported": 3, "carbon_total": 130.0,
+            "carbon_user_reported": 30.0, "carbon_manual_addition": 100.0, "carbon_partner": 0.0, "guest_count": 1,
+            "actions_manual_addition": 0, "events_hosted_current": 3, "events_hosted_past": 1,
+            "my_events_shared_current": 3, "my_events_shared_past": 0, "events_borrowed_from_others_current": 1,
+            "events_borrowed_from_others_past": 1, "teams_count": 2, "subteams_count": 1, "testimonials_count": 1,
+            "service_providers_count": 1,
+        })
+        # households and actions in the community
+        self.assertEqual(self.snapshot(self.geo_community), {
+            "is_live": True, "households_total": 2, "households_user_reported": 2, "households_manual_addition": 0,
+            "households_partner": 0, "primary_community_users_count": 1, "member_count": 1, "actions_live_count": 1,
+            "actions_total": 2, "actions_partner": 0, "actions_user_reported": 2, "carbon_total": 15.0,
+            "carbon_user_reported": 15.0, "carbon_manual_addition": 0.0, "carbon_partner": 0.0, "guest_count": 0,
+            "actions_manual_addition": 0, "events_hosted_current": 1, "events_hosted_past": 1,
+            "my_events_shared_current": 1, "my_events_shared_past": 1, "events_borrowed_from_others_current": 1,
+            "events_borrowed_from_others_past": 0, "teams_count": 0, "subteams_count": 0, "testimonials_count": 0,
+            "service_providers_count": 1,
+        })
+
+    def test_query_count_does_not_grow_with_communities(self):
+        with CaptureQueriesContext(connection) as before:
+            create_snapshots()
+        for i in range(3):
+            community = makeCommunity(name=f"Snapshot {i}", is_geographically_focused=bool(i % 2))
+            makeMembership(community=community, user=makeUser())
+            makeTeam(community=community, is_published=True)
+        with CaptureQueriesContext(connection) as after:
+            create_snapshots()
+        self.assertEqual(len(after), len(before))
+
+    def test_dry_run(self):
+        result, error = create_snapshots(dry_run=True)
+        self.assertIsNone(error)
+        self.assertEqual(result["snapshots"], Community.objects.filter(is_deleted=False).count())
+        self.assertEqual(list(result["timings"]), ["members", "primary", "content", "actions", "events", "snapshots"])
+        self.assertFalse(CommunitySnapshot.objects.exists())
+
+
+SNAPSHOT_FIELDS = [
+    field.name for field in CommunitySnapshot._meta.fields if field.name not in ["id", "community", "date"]
+]
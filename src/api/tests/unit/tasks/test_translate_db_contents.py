@@ -1,8 +1,11 @@
 import unittest
+from datetime import timedelta
 from unittest.mock import patch, Mock
-from database.models import Role, SupportedLanguage
+from database.models import Goal, Role, SupportedLanguage, TranslatedContentFingerprint
 from django.test import TestCase
-from task_queue.database_tasks.translate_db_content import TranslateDBContents
+from django.utils import timezone
+from task_queue.database_tasks.translate_db_content import FULL_SCAN_INTERVAL, FULL_SCAN_RECORD_ID, \
+	MODEL_WATERMARK_RECORD_ID, TranslateDBContents
 
 
 class TestTranslateDBContents(TestCase):
@@ -27,5 +30,59 @@ class TestTranslateDBContents(TestCase):
 		self.assertTrue(result)
 
 
+class TestTranslateChangedDBContents(TestCase):
+	def setUp(self):
+		self.translate_db_contents = TranslateDBContents()
+		self.translate_db_contents.get_supported_languages = Mock(return_value=['es'])
+		self.translate_db_contents.get_translatable_models = Mock(return_value=[(Goal, ["name", "description"])])
+		self.goals = [Goal.objects.create(name=f"Goal {i}", description=f"Description {i}") for i in range(3)]
+
+	def translate(self, cached=True):
+		with patch('task_queue.database_tasks.translate_db_content.JsonTranslator') as mock_json_translator:
+			mock_json_translator.return_value.translate.return_value = ({}, ["Meta"], ["Goal"])
+			mock_json_translator.return_value.save_translations_to_cache.return_value = cached
+			self.translate_db_contents.translator = mock_json_translator
+			self.assertTrue(self.translate_db_contents.translate_changed_db_contents())
+		return [record for call in mock_json_translator.call_args_list for record in call.args[0]["data"]]
+
+	def test_only_new_and_edited_records_are_translated(self):
+		sent = self.translate()
+		self.assertEqual(len(sent), Goal.objects.filter(is_deleted=False).count())
+		self.assertIn({"name": "Goal 0", "description": "Description 0"}, sent)
+		self.assertTrue(TranslatedContentFingerprint.objects.filter(
+			model_name="database.goal", record_id=MODEL_WATERMARK_RECORD_ID, language_code="es").exists())
+
+		self.assertEqual(self.translate(), [])
+
+		self.goals[1].description = "Edited"
+		self.goals[1].save()
+		self.assertEqual(self.translate(), [{"name": "Goal 1", "description": "Edited"}])
+
+	def test_full_scan_finds_edits_that_skip_updated_at(self):
+		self.translate()
+		Goal.objects.filter(pk=self.goals[0].pk).update(name="Renamed", updated_at=timezone.now() - timedelta(days=30))
+		self.assertEqual(self.translate(), [])
+
+		TranslatedContentFingerprint.objects.filter(record_id=FULL_SCAN_RECORD_ID).update(
+			translated_at=timezone.now() - FULL_SCAN_INTERVAL)
+		self.assertEqual(self.translate(), [{"name": "Renamed", "description": "Description 0"}])
+
+	def test_records_are_retried_until_their_translations_are_cached(self):
+		self.assertEqual(len(self.translate(cached=False)), Goal.objects.filter(is_deleted=False).count())
+		self.assertFalse(TranslatedContentFingerprint.objects.exists())
+
+		self.assertIn({"name": "Goal 0", "description": "Description 0"}, self.translate())
+		self.assertEqual(self.translate(), [])
+
+	def test_chunks(self):
+		with patch('task_queue.database_tasks.translate_db_content.TRANSLATION_CHUNK_SIZE', 2):
+			with patch('task_queue.database_tasks.translate_db_content.JsonTranslator') as mock_json_translator:
+				mock_json_translator.return_value.translate.return_value = ({}, [], [])
+				self.translate_db_contents.translator = mock_json_translator
+				self.assertTrue(self.translate_db_contents.translate_changed_db_contents())
+		self.assertEqual(len(mock_json_translator.call_args_list), 2)
+		self.assertTrue(all(len(call.args[0]["data"]) <= 2 for call in mock_json_translator.call_args_list))
+
+
 if __name__ == "__main__":
 	unittest.main()
\ No newline at end of file
@@ -0,0 +1,51 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from _main_.utils.counters import BufferedCounters
+from apps__campaigns.models import Campaign, CampaignLink, CampaignView
+
+
+class BufferedCountersTest(TestCase):
+
+    def setUp(self):
+        self.counters = BufferedCounters(buffered=True, flush_interval=3600)
+        self.campaign = Campaign.objects.create(title="Counters Campaign", description="Counters")
+        self.view = CampaignView.objects.create(campaign=self.campaign)
+        self.link = CampaignLink.objects.create(campaign=self.campaign, url="https://example.com")
+
+    def test_increments_are_coalesced_until_flush(self):
+        other = CampaignView.objects.get(pk=self.view.pk)
+        for _ in range(3):
+            self.counters.increment(self.view, "count")
+        self.counters.increment(other, "count")
+        self.counters.increment(self.link, "visits")
+
+        self.assertEqual(self.view.count, 3)
+        self.assertEqual(CampaignView.objects.get(pk=self.view.pk).count, 0)
+        self.assertEqual(self.counters.total(CampaignView.objects.get(pk=self.view.pk), "count"), 4)
+
+        self.counters.flush()
+        fresh = CampaignView.objects.get(pk=self.view.pk)
+        self.assertEqual(fresh.count, 4)
+        self.assertEqual(self.counters.total(fresh, "count"), 4)
+        self.assertEqual(CampaignLink.objects.get(pk=self.link.pk).visits, 1)
+
+    def test_failed_flush_keeps_increments(self):
+        self.counters.increment(self.view, "count")
+        with patch.object(CampaignView.objects, "filter", side_effect=Exception("database is down")):
+            self.counters.flush()
+        self.assertEqual(self.counters.pending(CampaignView, "count", self.view.pk), 1)
+
+        self.counters.flush()
+        self.assertEqual(CampaignView.objects.get(pk=self.view.pk).count, 1)
+
+    def test_unbuffered_writes_straight_away(self):
+        counters = BufferedCounters(buffered=False)
+        stale = CampaignView.objects.get(pk=self.view.pk)
+        counters.increment(self.view, "count")
+        counters.increment(stale, "count")
+        self.assertEqual(CampaignView.objects.get(pk=self.view.pk).count, 2)
+
+    def test_total_of_missing_row(self):
+        self.assertEqual(self.counters.total(None, "count"), 0)
@@ -0,0 +1,99 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps__campaigns.analytics import LIKES, VIEWS, campaign_stats, community_stats, daily_activity_ids, daily_series, \
+    record_activity, technology_stats
+from apps__campaigns.models import Campaign, CampaignDailyActivity, CampaignFollow, CampaignLink, CampaignTechnology, CampaignTechnologyFollow, \
+    CampaignTechnologyLike, CampaignTechnologyTestimonial, CampaignTechnologyView, CampaignView, Comment, Technology
+from database.models import Community, Testimonial, UserProfile
+
+
+class CampaignAnalyticsTest(TestCase):
+
+    def setUp(self):
+        self.user = UserProfile.objects.create(email="analytics@test.com", full_name="Analytics User")
+        self.community = Community.objects.create(name="Analytics Community", subdomain="analytics-community")
+        self.campaign = Campaign.objects.create(title="Analytics Campaign", description="Analytics")
+        self.other_campaign = Campaign.objects.create(title="Other Campaign", description="Other")
+        self.tech = CampaignTechnology.objects.create(
+            campaign=self.campaign, technology=Technology.objects.create(name="Heat Pumps", description="Heat Pumps"))
+        self.other_tech = CampaignTechnology.objects.create(
+            campaign=self.campaign, technology=Technology.objects.create(name="Solar", description="Solar"))
+
+        CampaignTechnologyLike.objects.create(campaign_technology=self.tech, community=self.community, count=3)
+        CampaignTechnologyLike.objects.create(campaign_technology=self.other_tech, count=2)
+        CampaignTechnologyView.objects.create(campaign_technology=self.tech, count=5)
+        CampaignView.objects.create(campaign=self.campaign, count=7)
+        CampaignView.objects.create(campaign=self.other_campaign, count=100)
+        CampaignFollow.objects.create(campaign=self.campaign, user=self.user, community=self.community)
+        CampaignFollow.objects.create(campaign=self.campaign, user=self.user, community=self.community, is_deleted=True)
+        CampaignTechnologyFollow.objects.create(campaign_technology=self.tech, user=self.user)
+        CampaignLink.objects.create(campaign=self.campaign, url="https://example.com")
+        Comment.objects.create(campaign_technology=self.tech, user=self.user, text="Nice", community=self.community)
+        testimonial = Testimonial.objects.create(title="Analytics", body="Analytics", user=self.user, community=self.community)
+        CampaignTechnologyTestimonial.objects.create(campaign_technology=self.other_tech, testimonial=testimonial)
+
+    def test_campaign_stats(self):
+        with self.assertNumQueries(1):
+            stats = campaign_stats(self.campaign.id)
+        self.assertEqual(stats, {
+            "shares": 1,
+            "likes": 5,
+            "campaign views": 7,
+            "Technology views": 5,
+            "followers": 1,
+            "comments": 1,
+            "testimonials": 1,
+        })
+
+    def test_campaign_without_activity(self):
+        campaign = Campaign.objects.create(title="Quiet Campaign", description="Quiet")
+        stats = campaign_stats(campaign.id)
+        self.assertEqual(stats["shares"], 0)
+        self.assertEqual(stats["followers"], 0)
+        self.assertIsNone(stats["likes"])
+
+    def test_technology_stats(self):
+        stats = technology_stats(self.campaign.id)
+        self.assertEqual(stats[self.tech.id], {"likes": 3, "follows": 1, "views": 5, "comments": 1, "testimonials": 0})
+        self.assertEqual(stats[self.other_tech.id]["likes"], 2)
+        self.assertEqual(stats[self.other_tech.id]["testimonials"], 1)
+
+    def test_community_stats(self):
+        stats = community_stats(self.campaign.id)
+        self.assertEqual(stats[self.community.id], {"follows": 1, "likes": 3, "comments": 1, "testimonials": 1})
+
+    def test_daily_series(self):
+        record_activity(self.campaign.id, VIEWS)
+        record_activity(self.campaign.id, VIEWS)
+        record_activity(self.campaign.id, LIKES, self.tech.id)
+
+        series = daily_series(self.campaign.id, days=7)
+        self.assertEqual(len(series["views"]), 7)
+        today = {metric: buckets[-1] for metric, buckets in series.items()}
+        self.assertEqual(today["views"], {"date": timezone.localdate().isoformat(), "count": 2})
+        self.assertEqual(today["likes"]["count"], 1)
+        self.assertEqual(today["follows"]["count"], 1)
+        self.assertEqual(today["shares"]["count"], 1)
+        self.assertEqual(sum(bucket["count"] for bucket in series["views"]), 2)
+
+    def test_record_activity_remembers_todays_row(self):
+        self.addCleanup(daily_activity_ids.clear)
+        with patch.object(daily_activity_ids, "enabled", True):
+            record_activity(self.campaign.id, VIEWS)
+            # only the increment, which is buffered outside of tests
+            with self.assertNumQueries(1):
+                record_activity(self.campaign.id, VIEWS)
+            record_activity(self.campaign.id, LIKES, self.tech.id)
+
+            tomorrow = timezone.localdate() + timedelta(days=1)
+            with patch("apps__campaigns.analytics.timezone.localdate", return_value=tomorrow):
+                record_activity(self.campaign.id, VIEWS)
+
+        rows = CampaignDailyActivity.objects.filter(campaign=self.campaign).order_by("date", "metric")
+        self.assertEqual([(row.metric, row.date, row.count) for row in rows], [
+            (LIKES, timezone.localdate(), 1), (VIEWS, timezone.localdate(), 2), (VIEWS, tomorrow, 1),
+        ])
@@ -0,0 +1,90 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from api.tests.common import makeEvent
+from apps__campaigns.helpers import get_campaign_details, get_campaign_details_for_user, \
+    get_campaign_technology_details, get_technology_details
+from apps__campaigns.models import Campaign, CampaignCommunity, CampaignTechnology, CampaignTechnologyEvent, \
+    CampaignTechnologyLike, CampaignTechnologyTestimonial, CampaignTechnologyView, Comment, Technology, TechnologyAction, \
+    TechnologyCoach, TechnologyDeal, TechnologyFaq, TechnologyOverview, TechnologyVendor
+from database.models import Community, Testimonial, UserProfile, Vendor
+
+
+class CampaignPageBuilderTest(TestCase):
+
+    def setUp(self):
+        self.user = UserProfile.objects.create(email="page-builder@test.com", full_name="Page Builder")
+        self.community = Community.objects.create(name="Page Builder Community", subdomain="page-builder-community")
+        self.campaign = Campaign.objects.create(title="Page Builder Campaign", description="Page Builder")
+        CampaignCommunity.objects.create(campaign=self.campaign, community=self.community, alias="PBC")
+        self.techs = [self.add_technology(i) for i in range(2)]
+
+    def add_technology(self, i):
+        tech = Technology.objects.create(name=f"Technology {i}", description="Technology")
+        TechnologyCoach.objects.create(technology=tech, full_name=f"Coach {i}")
+        TechnologyOverview.objects.create(technology=tech, title=f"Overview {i}")
+        TechnologyDeal.objects.create(technology=tech, title=f"Deal {i}")
+        TechnologyAction.objects.create(technology=tech, title=f"Action {i}")
+        TechnologyFaq.objects.create(technology=tech, question=f"Question {i}", answer="Answer")
+        TechnologyVendor.objects.create(technology=tech, vendor=Vendor.objects.create(name=f"Vendor {i}"))
+
+        campaign_tech = CampaignTechnology.objects.create(campaign=self.campaign, technology=tech)
+        CampaignTechnologyEvent.objects.create(campaign_technology=campaign_tech, event=makeEvent(name=f"Event {i}"))
+        Comment.objects.create(campaign_technology=campaign_tech, user=self.user, text=f"Comment {i}", community=self.community)
+        testimonial = Testimonial.objects.create(title=f"Testimonial {i}", body="Body", user=self.user,
+                                                 community=self.community, is_published=True)
+        CampaignTechnologyTestimonial.objects.create(campaign_technology=campaign_tech, testimonial=testimonial, is_featured=True)
+        CampaignTechnologyView.objects.create(campaign_technology=campaign_tech, count=4)
+        CampaignTechnologyLike.objects.create(campaign_technology=campaign_tech, count=2)
+        return campaign_tech
+
+    def count_queries(self, build):
+        with CaptureQueriesContext(connection) as queries:
+            build()
+        return len(queries)
+
+    def test_campaign_details(self):
+        details = get_campaign_details(self.campaign.id)
+        [first, _] = sorted(details["technologies"], key=lambda t: t["name"])
+        tech = self.techs[0]
+
+        self.assertEqual(first["campaign_technology_id"], str(tech.id))
+        self.assertEqual(first["campaign_technology_views"], 4)
+        self.assertEqual(first["likes"], 2)
+        self.assertEqual([c["text"] for c in first["comments"]], ["Comment 0"])
+        self.assertEqual(first["comments"][0]["community"]["alias"], "PBC")
+        self.assertEqual(first["testimonials"][0]["title"], "Testimonial 0")
+        self.assertEqual(first["testimonials"][0]["community"]["alias"], "PBC")
+        self.assertEqual(first["events"][0]["event"]["name"], "Event 0")
+
+        technology = get_technology_details(tech.technology.id)
+        for key in ("coaches", "overview", "vendors", "deals", "technology_actions", "faqs", "name"):
+            self.assertEqual(first[key], technology[key])
+
+    def test_single_technology_matches_campaign_details(self):
+        tech = self.techs[1]
+        details = get_campaign_details(self.campaign.id)
+        from_campaign = next(t for t in details["technologies"] if t["campaign_technology_id"] == str(tech.id))
+        single = get_campaign_technology_details({"campaign_technology_id": str(tech.id), "for_admin": True})
+        self.assertEqual({"campaign_technology_id": str(tech.id), **single}, from_campaign)
+
+        with self.assertRaises(CampaignTechnology.DoesNotExist):
+            get_campaign_technology_details({"campaign_technology_id": "00000000-0000-4000-8000-000000000000"})
+
+    def test_campaign_details_for_user(self):
+        details = get_campaign_details_for_user(self.campaign, None)
+        tech = next(t for t in details["technologies"] if t["campaign_technology_id"] == str(self.techs[0].id))
+        self.assertEqual([t["title"] for t in tech["testimonials"]], ["Testimonial 0"])
+        self.assertEqual(tech["campaign_id"], self.campaign.id)
+        self.assertEqual(tech["coaches"][0]["full_name"], "Coach 0")
+
+    def test_query_count_does_not_grow_with_technologies(self):
+        for_admin = self.count_queries(lambda: get_campaign_details(self.campaign.id))
+        for_user = self.count_queries(lambda: get_campaign_details_for_user(self.campaign, None))
+
+        for i in range(2, 6):
+            self.add_technology(i)
+
+        self.assertEqual(self.count_queries(lambda: get_campaign_details(self.campaign.id)), for_admin)
+        self.assertEqual(self.count_queries(lambda: get_campaign_details_for_user(self.campaign, None)), for_user)
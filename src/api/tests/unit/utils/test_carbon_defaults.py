@@ -0,0 +1,51 @@
+from datetime import date
+
+from django.test import TestCase
+
+from carbon_calculator.CCDefaults import CCD, getDefault, getDefaults
+from carbon_calculator.carbonCalculator import AverageImpact, AverageImpacts, TOKEN_POINTS
+from carbon_calculator.models import Action as CCAction, CalcDefault
+
+
+class CarbonDefaultsTest(TestCase):
+
+    def setUp(self):
+        self.action = CCAction.objects.create(name="defaults_test_action", title="Defaults test action", questions=[])
+        self.other_action = CCAction.objects.create(name="defaults_other_action", title="Other", questions=[])
+        variable = "defaults_test_action_average_points"
+        # created out of order, with a duplicate date that should be ignored
+        CalcDefault.objects.create(variable=variable, locality="default", value=30, valid_date=date(2022, 1, 1))
+        CalcDefault.objects.create(variable=variable, locality="default", value=10, valid_date=date(2000, 1, 1))
+        CalcDefault.objects.create(variable=variable, locality="default", value=20, valid_date=date(2020, 1, 1))
+        CalcDefault.objects.create(variable=variable, locality="default", value=99, valid_date=date(2020, 1, 1))
+        CCD.loadDefaults(CCD)
+
+    def tearDown(self):
+        CCD.DefaultsByLocality = {"default": {}}
+
+    def test_tables_are_sorted(self):
+        table = CCD.DefaultsByLocality["default"]["defaults_test_action_average_points"]
+        self.assertEqual(table["valid_dates"], [date(2000, 1, 1), date(2020, 1, 1), date(2022, 1, 1)])
+        self.assertEqual(table["values"], [10, 20, 30])
+
+    def test_get_default_by_date(self):
+        variable = "defaults_test_action_average_points"
+        self.assertEqual(getDefault("default", variable), 30)
+        self.assertEqual(getDefault("default", variable, date(2020, 1, 1)), 10)
+        self.assertEqual(getDefault("default", variable, date(2020, 1, 2)), 20)
+        self.assertEqual(getDefault("some-town", variable, date(2023, 5, 1)), 30)
+        self.assertEqual(getDefaults("default", variable, [date(2021, 1, 1), None, date(2001, 1, 1)]), [20, 30, 10])
+        self.assertEqual(getDefault("default", "defaults_missing_variable", default=5), 5)
+        with self.assertRaises(Exception):
+            getDefault("default", "defaults_missing_variable")
+
+    def test_average_impacts_match_average_impact(self):
+        pairs = [
+            (self.action, date(2021, 6, 1)),
+            (self.other_action, date(2021, 6, 1)),
+            (self.action, None),
+            (self.action, date(2010, 1, 1)),
+        ]
+        impacts = AverageImpacts(pairs)
+        self.assertEqual(impacts, [AverageImpact(action, d) for action, d in pairs])
+        self.assertEqual(impacts, [20, TOKEN_POINTS, 30, 10])
@@ -1,5 +1,10 @@
+import csv
+import io
 import unittest
-from _main_.utils.common import is_value
+
+from openpyxl import load_workbook
+
+from _main_.utils.common import generate_workbook_with_sheets, is_value, iterate_in_chunks, write_csv_to_spooled_file
 
 
 class TestIsValue(unittest.TestCase):
@@ -38,5 +43,39 @@ class TestIsValue(unittest.TestCase):
         self.assertTrue(is_value({"key": "value"}))
 
 
+class TestStreamingExports(unittest.TestCase):
+    def test_iterate_in_chunks(self):
+        chunks = list(iterate_in_chunks(range(7), chunk_size=3))
+        self.assertEqual(chunks, [[0, 1, 2], [3, 4, 5], [6]])
+        self.assertEqual(list(iterate_in_chunks([], chunk_size=3)), [])
+
+    def test_write_csv_to_spooled_file_from_generator(self):
+        columns = ["Name", "Email"]
+        rows = (["User, %s" % i, "user%s@test.com" % i] for i in range(25))
+
+        def all_rows():
+            yield columns
+            yield from rows
+
+        with write_csv_to_spooled_file(all_rows(), chunk_size=10) as csv_file:
+            content = csv_file.read().decode("utf-8")
+
+        parsed = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(parsed[0], columns)
+        self.assertEqual(len(parsed), 26)
+        self.assertEqual(parsed[25], ["User, 24", "user24@test.com"])
+
+    def test_generate_workbook_with_sheets_keeps_sheet_layout(self):
+        sheet_data = {
+            "Overview": {"data": [["Title", "Count"], ["Campaign", 3]]},
+            "Follows": {"data": iter([["Email"], ["a@test.com"]])},
+        }
+        workbook = load_workbook(io.BytesIO(generate_workbook_with_sheets(sheet_data)))
+
+        self.assertEqual(workbook.sheetnames, ["Overview", "Follows"])
+        self.assertEqual(list(workbook["Overview"].values), [("Title", "Count"), ("Campaign", 3)])
+        self.assertEqual(list(workbook["Follows"].values), [("Email",), ("a@test.com",)])
+
+
 if __name__ == '__main__':
     unittest.main()
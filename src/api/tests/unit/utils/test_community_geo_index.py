@@ -0,0 +1,58 @@
+from django.test import TestCase
+
+from api.utils.api_utils import get_distance_between_coords
+from api.utils.geo_index import CommunityGeoIndex, zipcode_coordinates
+from database.models import Community, Location
+
+
+class CommunityGeoIndexTest(TestCase):
+
+    def setUp(self):
+        self.index = CommunityGeoIndex(reuse=True)
+        self.concord = self.make_community("Geo Concord", "01742")
+        self.lincoln = self.make_community("Geo Lincoln", "01773")
+        self.allston = self.make_community("Geo Allston", "02134")
+        self.spread = self.make_community("Geo Spread", "01776", "90210")
+        self.unplaced = self.make_community("Geo Unplaced", "")
+        self.online = Community.objects.create(name="Geo Online", subdomain="geo-online", is_geographically_focused=False)
+
+    def make_community(self, name, *zips):
+        community = Community.objects.create(name=name, subdomain=name.lower().replace(" ", "-"), is_geographically_focused=True)
+        for zipcode in zips:
+            community.locations.add(Location.objects.create(location_type="ZIP_CODE_ONLY", zipcode=zipcode))
+        return community
+
+    def test_zipcode_coordinates(self):
+        self.assertEqual(zipcode_coordinates("01742"), (42.4606, -71.3642))
+        self.assertIsNone(zipcode_coordinates("not a zipcode"))
+        self.assertIsNone(zipcode_coordinates(""))
+
+    def test_within_zipcode_nearest_first(self):
+        nearby = self.index.within_zipcode("01742", 15)
+        ours = [community_id for community_id in nearby if community_id in {self.concord.id, self.lincoln.id, self.spread.id, self.allston.id}]
+        self.assertEqual(ours, [self.concord.id, self.lincoln.id, self.spread.id])
+
+        distance, count = nearby[self.lincoln.id]
+        self.assertAlmostEqual(distance, get_distance_between_coords(42.4606, -71.3642, 42.4272, -71.3124))
+        self.assertEqual(count, 1)
+        self.assertIsNone(self.index.within_zipcode("00000", 15))
+
+    def test_separate(self):
+        communities = [self.concord, self.lincoln, self.allston, self.spread, self.unplaced, self.online]
+        close, other = self.index.separate(communities, "42.4606", "-71.3642", 15)
+        self.assertEqual(close, [self.concord, self.lincoln, self.spread])
+        # Spread also has a location in California
+        self.assertEqual(other, [self.allston, self.spread, self.unplaced, self.online])
+
+        self.assertEqual(self.index.separate(communities, None, None, 15), ([], communities))
+
+    def test_location_changes_rebuild_the_index(self):
+        self.assertNotIn(self.allston.id, self.index.within_zipcode("90210", 15))
+
+        self.allston.locations.add(Location.objects.create(location_type="ZIP_CODE_ONLY", zipcode="90210"))
+        self.assertIn(self.allston.id, self.index.within_zipcode("90210", 15))
+
+        location = self.spread.locations.get(zipcode="90210")
+        location.zipcode = "01776"
+        location.save()
+        self.assertNotIn(self.spread.id, self.index.within_zipcode("90210", 15))
@@ -0,0 +1,64 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from api.store.common import count_action_completed_and_todos
+from carbon_calculator.carbonCalculator import AverageImpact
+from carbon_calculator.models import Action as CCAction
+from database.models import Action, Community, RealEstateUnit, Tag, TagCollection, UserActionRel, UserProfile
+
+
+class CountActionCompletedAndTodosTest(TestCase):
+
+    def setUp(self):
+        self.community = Community.objects.create(name="Counts", subdomain="counts")
+        self.cc_action = CCAction.objects.create(name="counts_test_action", title="Counts test action", questions=[])
+        category, _ = TagCollection.objects.get_or_create(name="Category")
+        self.tag = Tag.objects.create(name="Home Energy", tag_collection=category)
+
+        self.action = Action.objects.create(title="Insulate", community=self.community,
+                                            calculator_action=self.cc_action)
+        self.action.tags.add(self.tag)
+        self.other_action = Action.objects.create(title="Compost", community=self.community)
+
+        self.household = RealEstateUnit.objects.create(name="Home", community=self.community)
+        self.users = [UserProfile.objects.create(email=f"counts{i}@test.com", full_name=f"User {i}") for i in range(4)]
+
+    def add_rel(self, user, action, status, carbon_impact=0):
+        return UserActionRel.objects.create(user=user, action=action, real_estate_unit=self.household,
+                                            status=status, carbon_impact=carbon_impact)
+
+    def test_counts_and_carbon(self):
+        self.add_rel(self.users[0], self.action, "DONE")
+        self.add_rel(self.users[1], self.action, "DONE", carbon_impact=40)
+        self.add_rel(self.users[2], self.action, "TODO")
+        self.add_rel(self.users[0], self.other_action, "DONE")
+        self.add_rel(self.users[3], self.other_action, "TODO")
+
+        result = count_action_completed_and_todos(communities=[self.community])
+
+        self.assertEqual(result, [
+            {"id": self.other_action.id, "name": "Compost", "category": None,
+             "done_count": 1, "carbon_total": 0, "todo_count": 1},
+            {"id": self.action.id, "name": "Insulate", "category": "Home Energy",
+             "done_count": 2, "carbon_total": 40 + AverageImpact(self.cc_action), "todo_count": 1},
+        ])
+
+    def test_query_count_does_not_grow_with_completions(self):
+        for user in self.users:
+            self.add_rel(user, self.action, "DONE")
+
+        with CaptureQueriesContext(connection) as ctx:
+            count_action_completed_and_todos(actions=[self.action.id])
+        queries = len(ctx.captured_queries)
+
+        for i in range(10):
+            user = UserProfile.objects.create(email=f"more{i}@test.com", full_name=f"More {i}")
+            self.add_rel(user, self.other_action, "DONE")
+
+        with CaptureQueriesContext(connection) as ctx:
+            count_action_completed_and_todos(actions=[self.action.id, self.other_action.id])
+        self.assertEqual(len(ctx.captured_queries), queries)
+
+    def test_requires_communities_or_actions(self):
+        self.assertEqual(count_action_completed_and_todos(), [])
@@ -13,7 +13,7 @@ from database.models import (
     RealEstateUnit,
     CommunitySnapshot,
     UserProfile,
-
+    Subscriber,
 )
 from apps__campaigns.models import (
     Campaign,
@@ -34,6 +34,8 @@ from datetime import datetime
 import uuid
 from _main_.utils.massenergize_errors import NotAuthorizedError, InvalidResourceError
 from django.utils import timezone
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 User = get_user_model()
 
@@ -265,6 +267,67 @@ class TestDownloadStore(TestCase):
         self.assertIsNotNone(error)
         self.assertIsNone(result[0])
 
+    def test_all_users_download_rows(self):
+        data = list(self.download_store._all_users_download())
+        columns = data[0]
+        row = next(r for r in data[1:] if r[columns.index("Email")] == self.regular_user.email)
+
+        self.assertEqual(row[columns.index("secondary community")], self.community.name)
+        self.assertEqual(row[columns.index("Done (count)")], "1")
+        self.assertEqual(row[columns.index("To-do (count)")], "0")
+        self.assertEqual(row[columns.index("Testimonials (count)")], "1")
+        self.assertEqual(row[columns.index("Teams (count)")], "1")
+        self.assertEqual(row[columns.index("Teams")], "Test Team(ADMIN)")
+
+    def test_all_downloads_are_sorted(self):
+        Subscriber.objects.create(name="Mid Subscriber", email="mid@example.com", community=self.community)
+        Subscriber.objects.create(name="Aaa Subscriber", email="aaa@example.com")
+        Subscriber.objects.create(name="Boz", email="boz@example.com")
+        Subscriber.objects.create(name="", email="blank@example.com")
+        # a name without a space loses its last character in the first name cell
+        for i, name in enumerate(["Bo Smith", "Boa X", "Bob", "alice Lower", "Zed", "", " Leading"]):
+            UserProfile.objects.create(email=f"sorted{i}@example.com", full_name=name)
+        other = Community.objects.create(name="Aaa Community", subdomain="aaa-community")
+        lower = Community.objects.create(name="lower community", subdomain="lower-community")
+        Action.objects.create(title="Other Action", community=other, is_published=True)
+        Action.objects.create(title="Lower Action", community=lower, is_published=True)
+        Action.objects.create(title="Global Action", community=other, is_global=True)
+
+        users = list(self.download_store._all_users_download())[1:]
+        names = [row[0] for row in users]
+        self.assertEqual(names, sorted(names))
+        self.assertEqual(names.count("Bo"), 3)
+        self.assertEqual(names.count("---"), 1)
+        self.assertIn("alice", names)
+
+        actions = list(self.download_store._all_actions_download())
+        self.assertEqual(actions[0][0], "Community")
+        names = [row[0] for row in actions[1:]]
+        self.assertEqual(names, sorted(names))
+        self.assertEqual(names[0], "")
+        # code point order, like sorting in python: lowercase after uppercase
+        self.assertGreater(names.index(lower.name), names.index(other.name))
+        # each community's state reported actions come after its own actions
+        for name in [other.name, self.community.name]:
+            rows = [row for row in actions[1:] if row[0] == name]
+            self.assertEqual(rows[-1][self.download_store.action_info_columns.index("Action") + 2], "STATE-REPORTED")
+
+    def test_all_users_download_query_count_does_not_grow_with_users(self):
+        with CaptureQueriesContext(connection) as before:
+            list(self.download_store._all_users_download())
+
+        for i in range(5):
+            user = UserProfile.objects.create(email=f"bulk{i}@example.com", full_name=f"Bulk User{i}")
+            CommunityMember.objects.create(user=user, community=self.community)
+            TeamMember.objects.create(user=user, team=self.team)
+            UserActionRel.objects.create(user=user, action=self.action, status="TODO", real_estate_unit=self.real_estate)
+
+        with CaptureQueriesContext(connection) as after:
+            data = list(self.download_store._all_users_download())
+
+        self.assertEqual(len(after.captured_queries), len(before.captured_queries))
+        self.assertEqual(len(data), 1 + UserProfile.objects.filter(is_deleted=False).count())
+
     def test_actions_download(self):
         context = Context()
         context.user_is_logged_in = True
@@ -0,0 +1,93 @@
+import hashlib
+import io
+
+from django.test import TestCase
+from PIL import Image
+
+from api.store.common import NON_EXISTENT_IMAGE, find_similar_items, generate_hashes
+from database.models import Media
+from database.utils.common import hash_bucket_item, make_perceptual_hash
+
+
+def make_image(size, flip=False):
+    image = Image.new("RGB", (64, 64))
+    image.putdata([((x * 4) if not flip else 255 - x * 4, y * 4, (x + y) * 2) for y in range(64) for x in range(64)])
+    output = io.BytesIO()
+    image.resize((size, size)).save(output, format="PNG")
+    return output.getvalue()
+
+
+class LocalBucket:
+    """
+    Stands in for the S3 client: serves objects from a dict
+    """
+
+    def __init__(self, objects):
+        self.objects = objects
+        self.requested = []
+
+    def get_object(self, Bucket, Key):
+        self.requested.append(Key)
+        if Key not in self.objects:
+            raise Exception("NoSuchKey")
+        return {"Body": io.BytesIO(self.objects[Key])}
+
+
+class MediaHashingTest(TestCase):
+
+    def setUp(self):
+        self.original = make_image(64)
+        self.bucket = LocalBucket({
+            "media/original.png": self.original,
+            "media/copy.png": self.original,
+            "media/resized.png": make_image(48),
+            "media/other.png": make_image(64, flip=True),
+            "media/notes.txt": b"not an image",
+        })
+        self.media = {
+            name: media for name, media in zip(
+                ["original", "copy", "resized", "other", "notes", "missing"],
+                Media.objects.bulk_create([
+                    Media(name=name, file=f"media/{name}.{'txt' if name == 'notes' else 'png'}")
+                    for name in ["original", "copy", "resized", "other", "notes", "missing"]
+                ]),
+            )
+        }
+
+    def refreshed(self, name):
+        return Media.objects.get(pk=self.media[name].pk)
+
+    def test_hash_bucket_item(self):
+        self.assertEqual(
+            hash_bucket_item("media/original.png", client=self.bucket),
+            (hashlib.sha256(self.original).hexdigest(), None),
+        )
+        hash, perceptual_hash = hash_bucket_item("media/original.png", client=self.bucket, perceptual=True)
+        self.assertEqual(perceptual_hash, make_perceptual_hash(io.BytesIO(self.original)))
+        self.assertEqual(len(perceptual_hash), 16)
+        self.assertEqual(hash_bucket_item("media/missing.png", client=self.bucket), (None, None))
+
+    def test_generate_hashes(self):
+        count = generate_hashes(workers=2, batch_size=2, client=self.bucket)
+        self.assertEqual(count, 5)
+        self.assertEqual(self.refreshed("original").hash, hashlib.sha256(self.original).hexdigest())
+        self.assertEqual(self.refreshed("copy").hash, self.refreshed("original").hash)
+        self.assertEqual(self.refreshed("missing").hash, NON_EXISTENT_IMAGE)
+        self.assertEqual(self.refreshed("original").perceptual_hash, "")
+
+        # hashed media are not downloaded again
+        self.bucket.requested = []
+        self.assertEqual(generate_hashes(client=self.bucket), 0)
+        self.assertEqual(self.bucket.requested, [])
+
+    def test_perceptual_stage_finds_resized_copies(self):
+        generate_hashes(client=self.bucket)
+        generate_hashes(perceptual=True, workers=2, client=self.bucket)
+        self.assertEqual(self.refreshed("notes").perceptual_hash, NON_EXISTENT_IMAGE)
+
+        groups = find_similar_items()
+        ours = [
+            sorted(item.name for item in items) for items in groups.values()
+            if any(item.pk in {m.pk for m in self.media.values()} for item in items)
+        ]
+        self.assertEqual(ours, [["copy", "original", "resized"]])
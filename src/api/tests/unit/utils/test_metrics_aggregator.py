@@ -0,0 +1,55 @@
+import unittest
+
+from _main_.utils.metrics.aggregator import InMemorySink, MAX_METRIC_DATA_PER_REQUEST, MetricsAggregator
+
+
+class TestMetricsAggregator(unittest.TestCase):
+
+    def setUp(self):
+        self.sink = InMemorySink()
+        self.aggregator = MetricsAggregator(self.sink, flush_interval=3600, max_queue_size=5000)
+
+    def test_aggregates_statistic_sets(self):
+        dimensions = [{'Name': 'Language', 'Value': 'es'}]
+        for value in [5, 1, 9]:
+            self.aggregator.record("Test/Namespace", "Latency", value, dimensions=dimensions)
+        self.aggregator.record("Test/Namespace", "Latency", 100, dimensions=[{'Name': 'Language', 'Value': 'pt'}])
+        self.aggregator.flush()
+
+        data = {d['Dimensions'][0]['Value']: d for d in self.sink.metric_data("Test/Namespace")}
+        self.assertEqual(data['es']['StatisticValues'], {'SampleCount': 3, 'Sum': 15, 'Minimum': 1, 'Maximum': 9})
+        self.assertEqual(data['pt']['StatisticValues']['SampleCount'], 1)
+        self.assertEqual(data['es']['Unit'], 'Milliseconds')
+
+        self.sink.clear()
+        self.aggregator.flush()
+        self.assertEqual(self.sink.batches, [])
+
+    def test_record_metric_data(self):
+        self.aggregator.record_metric_data("Test/Namespace", [
+            {'MetricName': "LanguageUsageCount", 'Dimensions': [], "Value": 1, 'Unit': 'Count'},
+            {'MetricName': "LanguageUsageCount", 'Dimensions': [], "Value": 1, 'Unit': 'Count'},
+        ])
+        self.aggregator.flush()
+
+        [datum] = self.sink.metric_data()
+        self.assertEqual(datum['StatisticValues']['Sum'], 2)
+        self.assertEqual(datum['Unit'], 'Count')
+
+    def test_flushes_in_batches(self):
+        for i in range(MAX_METRIC_DATA_PER_REQUEST + 1):
+            self.aggregator.record("Test/Namespace", f"metric-{i}", 1)
+        self.aggregator.flush()
+
+        self.assertEqual([len(batch) for _, batch in self.sink.batches], [MAX_METRIC_DATA_PER_REQUEST, 1])
+
+    def test_drops_when_queue_is_full(self):
+        aggregator = MetricsAggregator(self.sink, flush_interval=3600, max_queue_size=2)
+        # keep the background worker from draining the queue
+        aggregator._ensure_worker = lambda: None
+        for value in range(3):
+            aggregator.record("Test/Namespace", "Latency", value)
+
+        self.assertEqual(aggregator.dropped, 1)
+        aggregator.flush()
+        self.assertEqual(self.sink.metric_data()[0]['StatisticValues']['SampleCount'], 2)
@@ -0,0 +1,71 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from _main_.utils.context import Context
+from _main_.utils.pagination import paginate
+from database.models import Action, Community
+
+
+class PaginationTest(TestCase):
+
+    def setUp(self):
+        self.community = Community.objects.create(name="Pagination", subdomain="pagination")
+        # repeated and missing sort values, so pages have to break ties on the id
+        for i in range(7):
+            Action.objects.create(title=f"Action {i}", community=self.community,
+                                  featured_summary=None if i == 3 else "abc"[i % 3])
+        self.actions = Action.objects.filter(community=self.community)
+
+    def walk(self, queryset, limit=2, **data):
+        ids, cursor, pages = [], "", 0
+        while True:
+            response = paginate(queryset, {"limit": limit, "keyset": True, "cursor": cursor, **data})
+            ids += [item["id"] for item in response["items"]]
+            cursor = response["cursor"]["next"]
+            pages += 1
+            if not cursor:
+                return ids, pages, response
+
+    def test_keyset_pages_follow_the_ordering(self):
+        for descending in (False, True):
+            queryset = self.actions.order_by("-featured_summary" if descending else "featured_summary")
+            ids, pages, _ = self.walk(queryset)
+            summaries = [a for a in queryset if a.featured_summary is not None]
+            expected = sorted(summaries, key=lambda a: (a.featured_summary, a.id), reverse=descending)
+            expected += [a for a in queryset if a.featured_summary is None]
+            self.assertEqual(ids, [a.id for a in expected])
+            self.assertEqual(pages, 4)
+
+    def test_count_only_when_asked(self):
+        ids, _, response = self.walk(self.actions.order_by("-created_at"), limit=3)
+        self.assertIsNone(response["cursor"]["count"])
+        self.assertEqual(ids, list(self.actions.order_by("-created_at", "-id").values_list("id", flat=True)))
+        _, _, response = self.walk(self.actions.order_by("-created_at"), limit=3, with_count=True)
+        self.assertEqual(response["cursor"]["count"], 7)
+
+    def test_deep_pages_do_not_use_offset(self):
+        first = paginate(self.actions.order_by("title"), {"limit": 3, "keyset": True, "cursor": ""})
+        with CaptureQueriesContext(connection) as queries:
+            paginate(self.actions.order_by("title"), {"limit": 3, "keyset": True, "cursor": first["cursor"]["next"]})
+        self.assertNotIn("OFFSET", queries[0]["sql"])
+
+    def test_invalid_cursor(self):
+        response = paginate(self.actions, {"limit": 3, "keyset": True, "cursor": "not a cursor"})
+        self.assertEqual(response, {"cursor": {}, "items": []})
+
+    def test_page_numbers(self):
+        response = paginate(self.actions.order_by("id"), {"limit": 3, "next_page": 3})
+        self.assertEqual(response["cursor"], {"next": 3, "count": 7})
+        self.assertEqual(len(response["items"]), 1)
+        self.assertEqual(paginate(self.actions.none(), {"limit": 3, "next_page": 1})["cursor"], {"next": 0, "count": 0})
+
+    def test_get_pagination_data(self):
+        context = Context()
+        context.args = {"limit": 5, "cursor": "", "with_count": "true"}
+        self.assertNotIn("keyset", context.get_pagination_data())
+        data = context.get_pagination_data(keyset=True)
+        self.assertEqual((data["keyset"], data["cursor"], data["with_count"]), (True, "", True))
+
+        context.args = {"limit": 5, "page": 2}
+        self.assertNotIn("keyset", context.get_pagination_data(keyset=True))
@@ -0,0 +1,150 @@
+from types import SimpleNamespace
+
+from django.test import TestCase
+
+from _main_.utils.context import Context
+from _main_.utils.massenergize_errors import CustomMassenergizeError
+from _main_.utils.massenergize_response import MassenergizeResponse
+from _main_.utils.response_cache import ResponseCache, response_cache
+from api.decorators import cached_request
+from api.store.action import ActionStore
+from api.store.community import CommunityStore
+from api.store.tag import TagStore
+from database.models import Action, Community, Tag, Vendor
+
+
+class VendorsHandler:
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    @cached_request(Vendor, Community, Action)
+    def list(self, request):
+        self.calls += 1
+        if self.fail:
+            return CustomMassenergizeError("failed")
+        names = Vendor.objects.filter(name__startswith="rc-").order_by("name").values_list("name", flat=True)
+        return MassenergizeResponse(data=list(names))
+
+
+class CommunityTagsHandler:
+    @cached_request(Community, Tag)
+    def list(self, request):
+        communities = Community.objects.filter(subdomain__startswith="rc-").values_list("name", flat=True)
+        tags = Tag.objects.filter(name__startswith="rc-").values_list("name", flat=True)
+        return MassenergizeResponse(data=sorted(communities) + sorted(tags))
+
+
+class CachedRequestTest(TestCase):
+
+    def setUp(self):
+        response_cache.enabled = True
+        response_cache.clear()
+        self.handler = VendorsHandler()
+        self.vendor = Vendor.objects.create(name="rc-vendor")
+
+    def tearDown(self):
+        response_cache.enabled = False
+        response_cache.clear()
+
+    def request(self, **args):
+        context = Context()
+        context.args = args
+        return SimpleNamespace(context=context)
+
+    def list(self, request=None):
+        return self.handler.list(request or self.request(subdomain="rc"))
+
+    def test_second_request_is_served_from_cache(self):
+        first = self.list()
+        second = self.list()
+        self.assertEqual(self.handler.calls, 1)
+        self.assertEqual(second.toDict(), first.toDict())
+        self.assertEqual(second.toDict()["data"], ["rc-vendor"])
+
+    def test_key_covers_args_and_role(self):
+        self.list()
+        self.list(self.request(subdomain="other"))
+        self.assertEqual(self.handler.calls, 2)
+
+        request = self.request(subdomain="rc")
+        request.context.user_is_logged_in = True
+        request.context.user_id = "some-user"
+        self.list(request)
+        self.assertEqual(self.handler.calls, 3)
+
+    def test_save_invalidates(self):
+        self.list()
+        Vendor.objects.create(name="rc-other")
+        self.assertEqual(self.list().toDict()["data"], ["rc-other", "rc-vendor"])
+        self.assertEqual(self.handler.calls, 2)
+
+    def test_m2m_change_invalidates(self):
+        self.list()
+        community = Community.objects.create(name="Response cache", subdomain="rc-community")
+        self.list()
+        self.assertEqual(self.handler.calls, 2)
+
+        self.vendor.communities.add(community)
+        self.list()
+        self.assertEqual(self.handler.calls, 3)
+
+    def test_rank_update_invalidates(self):
+        # ranking uses queryset.update(), which sends no signals
+        self.list()
+        action = Action.objects.create(title="rc-action")
+        self.list()
+        self.assertEqual(self.handler.calls, 2)
+        ActionStore().rank_action({"id": action.id, "rank": 3}, self.request().context)
+        self.list()
+        self.assertEqual(self.handler.calls, 3)
+
+    def test_community_and_tag_updates_invalidate(self):
+        # both stores write with queryset.update(), which sends no signals
+        community = Community.objects.create(name="rc-community", subdomain="rc-community")
+        tag = Tag.objects.create(name="rc-tag")
+        handler, request = CommunityTagsHandler(), self.request(subdomain="rc")
+        self.assertEqual(handler.list(request).toDict()["data"], ["rc-community", "rc-tag"])
+
+        context = self.request().context
+        context.user_is_logged_in = context.user_is_super_admin = True
+        context.request = SimpleNamespace(META={})
+        _, error = CommunityStore().update_community(context, {"community_id": community.id, "name": "rc-renamed"})
+        self.assertIsNone(error)
+        self.assertEqual(handler.list(request).toDict()["data"], ["rc-renamed", "rc-tag"])
+
+        TagStore().update_tag(tag.id, {"name": "rc-edited"})
+        self.assertEqual(handler.list(request).toDict()["data"], ["rc-renamed", "rc-edited"])
+
+    def test_errors_are_not_cached(self):
+        self.handler.fail = True
+        self.list()
+        self.list()
+        self.assertEqual(self.handler.calls, 2)
+
+    def test_force_refresh(self):
+        self.list()
+        self.list(self.request(subdomain="rc", force_refresh=True))
+        self.list()
+        self.assertEqual(self.handler.calls, 2)
+
+
+class ResponseCacheVersionsTest(TestCase):
+
+    def test_other_processes_see_invalidations(self):
+        writer = ResponseCache(enabled=True, version_check_interval=0)
+        reader = ResponseCache(enabled=True, version_check_interval=0)
+        before = reader.versions(["database.vendor"])
+
+        writer.invalidate(Vendor)
+        after = reader.versions(["database.vendor"])
+        self.assertNotEqual(after, before)
+        self.assertEqual(after, writer.versions(["database.vendor"]))
+
+    def test_versions_are_cached_between_checks(self):
+        writer = ResponseCache(enabled=True, version_check_interval=0)
+        reader = ResponseCache(enabled=True, version_check_interval=3600)
+        before = reader.versions(["database.vendor"])
+
+        writer.invalidate(Vendor)
+        self.assertEqual(reader.versions(["database.vendor"]), before)
@@ -0,0 +1,60 @@
+from django.test import TestCase
+
+from _main_.utils.common import serialize_all
+from _main_.utils.massenergize_response import MassenergizeResponse
+from _main_.utils.route_profiler import fingerprint, RouteProfiler
+from database.models import Community
+
+
+class RouteProfilerTest(TestCase):
+
+    def setUp(self):
+        self.profiler = RouteProfiler(enabled=True, buffer_size=2)
+        for i in range(3):
+            Community.objects.create(name=f"Profiled {i}", subdomain=f"profiled-{i}")
+
+    def view(self, request):
+        # one query per community: the N+1 pattern the profiler should point at
+        communities = Community.objects.filter(subdomain__startswith="profiled-")
+        names = [Community.objects.get(id=c.id).name for c in communities]
+        return MassenergizeResponse(data=names)
+
+    def test_profiles_queries_and_response(self):
+        response = self.profiler.profile("/communities.names", self.view)(None)
+
+        [entry] = self.profiler.entries()
+        self.assertEqual(entry["route"], "/communities.names")
+        self.assertEqual(entry["query_count"], 4)
+        self.assertEqual(entry["response_size"], len(response.content))
+        self.assertEqual(len(entry["duplicate_queries"]), 1)
+        self.assertEqual(entry["duplicate_queries"][0]["count"], 3)
+
+        [summary] = self.profiler.summary()
+        self.assertEqual(summary["requests"], 1)
+        self.assertEqual(summary["max_query_count"], 4)
+
+    def test_serialization_is_measured_once_when_nested(self):
+        def view(request):
+            with self.profiler.serializing():
+                data = serialize_all(list(Community.objects.filter(subdomain__startswith="profiled-")))
+            return MassenergizeResponse(data=data)
+
+        self.profiler.profile("/communities.list", view)(None)
+        [entry] = self.profiler.entries()
+        self.assertGreater(entry["serialization_time_ms"], 0)
+        self.assertLessEqual(entry["serialization_time_ms"], entry["latency_ms"])
+
+    def test_ring_buffer_and_disabled_mode(self):
+        wrapped = self.profiler.profile("/communities.names", self.view)
+        for _ in range(3):
+            wrapped(None)
+        self.assertEqual(len(self.profiler.entries()), 2)
+
+        self.profiler.clear()
+        self.profiler.enabled = False
+        wrapped(None)
+        self.assertEqual(self.profiler.entries(), [])
+
+    def test_fingerprint_collapses_in_lists(self):
+        self.assertEqual(fingerprint('SELECT * FROM "a" WHERE "id" IN (%s, %s, %s)'),
+                         fingerprint('SELECT * FROM "a" WHERE "id" IN (%s, %s)'))
@@ -0,0 +1,87 @@
+from datetime import date
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from _main_.utils.context import Context
+from api.store.team import TeamStore
+from api.tests.common import makeAction, makeCommunity, makeTeam, makeUser, makeUserActionRel
+from carbon_calculator.models import Action as CCAction, CalcDefault
+from carbon_calculator.CCDefaults import CCD
+from database.models import FeatureFlagResolver, TeamMember
+
+
+class TeamStatsTest(TestCase):
+
+    def setUp(self):
+        self.store = TeamStore()
+        self.context = Context()
+        self.context.set_request_body(RequestFactory().post("/api/teams.stats"))
+
+        self.community = makeCommunity(name="Team Stats Community", subdomain="team-stats-community")
+        self.parent = makeTeam(community=self.community, name="Team Stats Parent", is_published=True)
+        self.child = makeTeam(community=self.community, name="Team Stats Child", is_published=True, parent=self.parent)
+        self.hidden_child = makeTeam(community=self.community, name="Team Stats Hidden", is_published=False, parent=self.parent)
+        for team in (self.parent, self.child, self.hidden_child):
+            team.communities.add(self.community)
+
+        calculator_action = CCAction.objects.create(name="team_stats_action", title="Team stats action", questions=[])
+        CalcDefault.objects.create(variable="team_stats_action_average_points", locality="default", value=100, valid_date=date(2000, 1, 1))
+        CCD.loadDefaults(CCD)
+        self.action = makeAction(community=self.community, title="Team stats action", calculator_action=calculator_action)
+        self.other_action = makeAction(community=self.community, title="Team stats other action")
+
+        both = self.add_member(self.parent, "both@team-stats.com", done=1, todo=1)
+        TeamMember.objects.create(team=self.child, user=both)
+        self.add_member(self.child, "child@team-stats.com", done=2)
+        self.add_member(self.hidden_child, "hidden@team-stats.com", done=1)
+        self.add_member(self.parent, "guest@team-stats.com", done=1, accepts_terms=False)
+
+    def tearDown(self):
+        CCD.DefaultsByLocality = {"default": {}}
+
+    def add_member(self, team, email, done=0, todo=0, accepts_terms=True):
+        user = makeUser(email=email, accepts_terms_and_conditions=accepts_terms)
+        TeamMember.objects.create(team=team, user=user)
+        for i in range(done):
+            rel = makeUserActionRel(user=user, action=self.action if i == 0 else self.other_action, status="DONE", date_completed=date(2024, 1, 1))
+            user.real_estate_units.add(rel.real_estate_unit)
+        for _ in range(todo):
+            makeUserActionRel(user=user, action=self.other_action, status="TODO")
+        return user
+
+    def stats(self):
+        data, error = self.store.team_stats(self.context, {"community_id": self.community.id})
+        self.assertIsNone(error)
+        return {res["team"]["name"]: {k: v for k, v in res.items() if k != "team"} for res in data}
+
+    def test_team_stats(self):
+        stats = self.stats()
+        self.assertEqual(set(stats), {"Team Stats Parent", "Team Stats Child"})
+        # the parent counts its published children's members once
+        self.assertEqual(stats["Team Stats Parent"], {
+            "members": 2, "households": 3, "actions": 4, "actions_completed": 3, "actions_todo": 1,
+            "carbon_footprint_reduction": 200,
+        })
+        self.assertEqual(stats["Team Stats Child"], {
+            "members": 2, "households": 3, "actions": 4, "actions_completed": 3, "actions_todo": 1,
+            "carbon_footprint_reduction": 200,
+        })
+
+    def test_query_count_does_not_grow_with_members_or_teams(self):
+        # feature flags are re-checked on every read in tests
+        self.stats()
+        with patch.object(FeatureFlagResolver, "VERSION_CHECK_INTERVAL", 3600), CaptureQueriesContext(connection) as before:
+            self.stats()
+        for i in range(5):
+            self.add_member(self.child, f"more-{i}@team-stats.com", done=2, todo=1)
+            team = makeTeam(community=self.community, name=f"Team Stats {i}", is_published=True)
+            team.communities.add(self.community)
+            self.add_member(team, f"other-{i}@team-stats.com", done=1)
+        with patch.object(FeatureFlagResolver, "VERSION_CHECK_INTERVAL", 3600), CaptureQueriesContext(connection) as after:
+            stats = self.stats()
+        self.assertEqual(len(after), len(before))
+        self.assertEqual(stats["Team Stats Child"]["members"], 7)
+        self.assertEqual(stats["Team Stats 4"]["members"], 1)
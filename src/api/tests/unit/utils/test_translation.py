@@ -1,6 +1,14 @@
 import unittest
 from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
 from _main_.utils.translation import JsonTranslator
+from _main_.utils.translation.lru_cache import response_translations_lru, text_translations_lru, TranslationLRUCache
+from _main_.utils.utils import make_hash
+from database.models import TranslationsCache
 
 def fake_get_google_translate_key_file ():
     return "fake_key_file"
@@ -235,3 +243,92 @@ class TestJsonTranslator(unittest.TestCase):
 
 if __name__ == "__main__":
     unittest.main()
+
+
+class TestJsonTranslatorCache(TestCase):
+
+    def test_save_translations_to_cache(self):
+        translator = JsonTranslator({"title": "Hello", "body": "World"})
+        TranslationsCache.objects.create(hash=make_hash("Hello"), source_language_code="en",
+                                         target_language_code="fr", translated_text="Salut")
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertTrue(translator.save_translations_to_cache(["Hello", "World", "Again"],
+                                                                  ["Bonjour", "Monde", "Encore"], "fr", "en"))
+        self.assertLessEqual(len(ctx.captured_queries), 3)
+
+        cached = dict(TranslationsCache.objects.filter(target_language_code="fr", source_language_code="en")
+                      .values_list("hash", "translated_text"))
+        self.assertEqual(cached, {make_hash("Hello"): "Bonjour", make_hash("World"): "Monde",
+                                  make_hash("Again"): "Encore"})
+
+        translated, untranslated = translator.separate_translated_and_untranslated("fr", "en")
+        self.assertEqual(translated, {"title": "Bonjour", "body": "Monde"})
+        self.assertEqual(untranslated, {})
+
+    def test_lru_tier_skips_database(self):
+        text_translations_lru.clear()
+        self.addCleanup(text_translations_lru.clear)
+        TranslationsCache.objects.create(hash=make_hash("Hello"), source_language_code="en",
+                                         target_language_code="es", translated_text="Hola")
+
+        translator = JsonTranslator({"title": "Hello"})
+        translated, _ = translator.separate_translated_and_untranslated("es", "en")
+        self.assertEqual(translated, {"title": "Hola"})
+        self.assertEqual((translator.cache_hits, translator.cache_misses), (0, 1))
+
+        translator = JsonTranslator({"title": "Hello", "body": "Hello"})
+        with patch.object(TranslationLRUCache, "VERSION_CHECK_INTERVAL", 3600), CaptureQueriesContext(connection) as ctx:
+            translated, _ = translator.separate_translated_and_untranslated("es", "en")
+        self.assertEqual(translated, {"title": "Hola", "body": "Hola"})
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual((translator.cache_hits, translator.cache_misses), (1, 0))
+        self.assertEqual(text_translations_lru.get(("en", "es", make_hash("Hello"))), "Hola")
+
+    def test_lru_tiers_are_emptied_when_translations_change(self):
+        self.addCleanup(text_translations_lru.clear)
+        translation = TranslationsCache.objects.create(hash=make_hash("Hello"), source_language_code="en",
+                                                       target_language_code="es", translated_text="Hola")
+        # the tiers of another process, which only sees the version in the shared cache
+        other_process = TranslationLRUCache(10, 1000, name="text")
+        other_process.set("key", "value")
+        response_translations_lru.set("response", "translated")
+        JsonTranslator({"title": "Hello"}).separate_translated_and_untranslated("es", "en")
+
+        translation.translated_text = "Buenas"
+        with self.captureOnCommitCallbacks(execute=True):
+            translation.save()
+        translated, _ = JsonTranslator({"title": "Hello"}).separate_translated_and_untranslated("es", "en")
+        self.assertEqual(translated, {"title": "Buenas"})
+        self.assertIsNone(response_translations_lru.get("response"))
+        self.assertIsNone(other_process.get("key"))
+
+        JsonTranslator({}).save_translations_to_cache(["Hello"], ["Hola de nuevo"], "es", "en")
+        translated, _ = JsonTranslator({"title": "Hello"}).separate_translated_and_untranslated("es", "en")
+        self.assertEqual(translated, {"title": "Hola de nuevo"})
+
+        translation.delete()
+        _, untranslated = JsonTranslator({"title": "Hello"}).separate_translated_and_untranslated("es", "en")
+        self.assertEqual(untranslated, {"title": "Hello"})
+
+
+class TestTranslationLRUCache(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        cache = TranslationLRUCache(max_entries=2, max_size=100)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        self.assertEqual(cache.get("a"), "1")
+        cache.set("c", "3")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get_many(["a", "c"]), {"a": "1", "c": "3"})
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+
+    def test_evicts_by_size(self):
+        cache = TranslationLRUCache(max_entries=10, max_size=10)
+        cache.set_many({"a": "x" * 6, "b": "y" * 6, "too-big": "z" * 11})
+
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.size, 6)
+        self.assertEqual(cache.get("b"), "y" * 6)
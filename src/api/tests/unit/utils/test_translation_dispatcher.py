@@ -0,0 +1,64 @@
+import time
+import unittest
+
+from _main_.utils.translation import JsonTranslator
+from _main_.utils.translation.translator.dispatcher import dispatch_batches, RateLimiter
+from _main_.utils.translation.translator.providers.fake_translator import FakeTranslator
+
+
+class TestTranslationDispatcher(unittest.TestCase):
+
+    def test_keeps_batch_order(self):
+        provider = FakeTranslator()
+        batches = [[f"text {i}"] for i in range(20)]
+
+        def translate_batch(batch):
+            # later batches finish first
+            time.sleep(0.001 * (20 - int(batch[0].split()[1])))
+            return provider.translate(batch, "en", "es")
+
+        translated = dispatch_batches(translate_batch, batches, RateLimiter(1000))
+        self.assertEqual(translated, [[f"[es] text {i}"] for i in range(20)])
+
+    def test_retries_with_backoff(self):
+        attempts = []
+
+        def flaky(batch):
+            attempts.append(batch)
+            if len(attempts) < 3:
+                raise RuntimeError("provider unavailable")
+            return batch
+
+        self.assertEqual(dispatch_batches(flaky, [["a"]], RateLimiter(1000), backoff=0.001), [["a"]])
+        self.assertEqual(len(attempts), 3)
+
+        def broken(batch):
+            raise RuntimeError("provider down")
+
+        with self.assertRaises(RuntimeError):
+            dispatch_batches(broken, [["a"], ["b"]], RateLimiter(1000), max_retries=1, backoff=0.001)
+
+    def test_rate_limiter(self):
+        limiter = RateLimiter(20)
+        start = time.monotonic()
+        for _ in range(30):
+            limiter.acquire()
+        # the first 20 calls use the full bucket, the next 10 are spread over half a second
+        self.assertGreaterEqual(time.monotonic() - start, 0.4)
+
+
+class TestJsonTranslatorWithFakeProvider(unittest.TestCase):
+
+    def test_translates_batches_concurrently(self):
+        translator = JsonTranslator({"items": [f"Sentence number {'x' * i}" for i in range(8)]}, provider="fake")
+        translator.provider.latency = 0.05
+        text_batches = [[text] for text in translator.get_flattened_dict().values()]
+
+        start = time.monotonic()
+        translated = translator._translate_text_batches(text_batches, "en", "fr")
+        duration = time.monotonic() - start
+
+        self.assertEqual(translated, [[f"[fr] {batch[0]}"] for batch in text_batches])
+        self.assertEqual(translator.provider.calls, 8)
+        # 8 calls of 50ms on 4 workers, rather than 400ms one after the other
+        self.assertLess(duration, 0.3)
@@ -421,11 +421,9 @@ def get_sort_params(params):
 
 def sort_items(queryset, params):
   try:
-    if not queryset:
-      return []
-    
-    if isinstance(queryset, list):
-      return queryset
+    # an empty queryset is not loaded here, paginate counts it
+    if queryset is None or isinstance(queryset, list):
+      return queryset or []
     
     sort_params = get_sort_params(params)
     sorted =  queryset.order_by(sort_params)
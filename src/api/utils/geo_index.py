@@ -0,0 +1,171 @@
+"""
+In-memory index of where communities are, for "communities near this zipcode / point" lookups.
+
+Each community location with a zipcode is placed, by the zipcode's coordinates, in a grid of
+GRID_CELL_SIZE degree cells. A lookup only measures the distance to the locations in the cells
+that overlap the bounding box of the search radius, instead of to every location of every community.
+
+The index is rebuilt (one query) when a Community or Location was saved, deleted or had its
+locations changed since it was built, see response_cache.versions. Distances are those of
+get_distance_between_coords.
+"""
+import math
+import threading
+from functools import lru_cache
+
+import zipcodes
+
+from _main_.utils.response_cache import model_tag, response_cache
+from _main_.utils.utils import is_test_mode
+from api.utils.api_utils import get_distance_between_coords
+from database.models import Community, Location
+
+GRID_CELL_SIZE = 0.5  # degrees
+EARTH_RADIUS = 6373.0  # same as get_distance_between_coords
+DISTANCE_PER_DEGREE = EARTH_RADIUS * math.pi / 180
+
+
+@lru_cache(maxsize=4096)
+def zipcode_coordinates(zipcode):
+    """
+    (lat, long) of a zipcode, or None if it is not a known zipcode
+    """
+    try:
+        info = zipcodes.matching(zipcode)
+    except (TypeError, ValueError):
+        return None
+    if not info:
+        return None
+    return float(info[0]["lat"]), float(info[0]["long"])
+
+
+def _cell(lat, long):
+    return math.floor(lat / GRID_CELL_SIZE), math.floor(long / GRID_CELL_SIZE)
+
+
+class CommunityGeoIndex:
+    """
+    Grid of community locations. Community ids are those of all communities, whatever their status:
+    callers intersect the results with the communities they list.
+    """
+
+    TRACKED_MODELS = (Community, Location)
+
+    def __init__(self, reuse=True):
+        # test cases roll back rows without a signal, so there the index is rebuilt on every lookup
+        self.reuse = reuse
+        self._built_for = None
+        self._grid = {}
+        self._locations = {}
+        self._lock = threading.Lock()
+        response_cache.track(*self.TRACKED_MODELS)
+
+    def _versions(self):
+        return response_cache.versions([model_tag(model) for model in self.TRACKED_MODELS])
+
+    def _build(self):
+        grid = {}
+        # community id -> {"blank": locations without a zipcode, "placed": locations in the grid}
+        locations = {}
+        rows = Community.locations.through.objects.values_list("community_id", "location__zipcode")
+        for community_id, zipcode in rows:
+            info = locations.setdefault(community_id, {"blank": 0, "placed": 0})
+            if not zipcode:
+                info["blank"] += 1
+                continue
+            coordinates = zipcode_coordinates(zipcode)
+            if not coordinates:
+                continue
+            info["placed"] += 1
+            grid.setdefault(_cell(*coordinates), []).append((community_id, *coordinates))
+        return grid, locations
+
+    def _current(self):
+        versions = self._versions() if self.reuse else None
+        with self._lock:
+            if self.reuse and self._built_for == versions:
+                return self._grid, self._locations
+        grid, locations = self._build()
+        with self._lock:
+            self._grid, self._locations, self._built_for = grid, locations, versions
+        return grid, locations
+
+    def clear(self):
+        with self._lock:
+            self._built_for = None
+
+    def _candidates(self, grid, lat, long, max_distance):
+        lat_span = max_distance / DISTANCE_PER_DEGREE
+        if abs(lat) + lat_span >= 90:
+            # the box reaches a pole, every longitude is in it
+            return (entry for entries in grid.values() for entry in entries)
+
+        long_span = lat_span / math.cos(math.radians(abs(lat) + lat_span))
+        (low_row, low_col), (high_row, high_col) = _cell(lat - lat_span, long - long_span), _cell(lat + lat_span, long + long_span)
+        if high_col - low_col >= 360 / GRID_CELL_SIZE:
+            cols = range(math.floor(-180 / GRID_CELL_SIZE), math.ceil(180 / GRID_CELL_SIZE) + 1)
+        else:
+            cols = range(low_col, high_col + 1)
+        return (
+            entry
+            for row in range(low_row, high_row + 1)
+            for col in cols
+            for entry in grid.get((row, col), ())
+        )
+
+    def within(self, lat, long, max_distance):
+        """
+        {community id: (distance to its nearest location, number of its locations within max_distance)},
+        nearest first
+        """
+        grid, _ = self._current()
+        return self._within(grid, lat, long, max_distance)
+
+    def _within(self, grid, lat, long, max_distance):
+        found = {}
+        for community_id, location_lat, location_long in self._candidates(grid, lat, long, max_distance):
+            distance = get_distance_between_coords(lat, long, location_lat, location_long)
+            if distance > max_distance:
+                continue
+            nearest, count = found.get(community_id, (distance, 0))
+            found[community_id] = (min(nearest, distance), count + 1)
+        return dict(sorted(found.items(), key=lambda item: item[1][0]))
+
+    def within_zipcode(self, zipcode, max_distance):
+        """
+        Same as within, around the coordinates of a zipcode. None if the zipcode is not known.
+        """
+        coordinates = zipcode_coordinates(zipcode)
+        if not coordinates:
+            return None
+        return self.within(*coordinates, max_distance)
+
+    def separate(self, communities, lat, long, max_distance):
+        """
+        Splits communities in (close, other) the way the community finder shows them: a community with
+        a location within max_distance is close; one that is not geographic, has no locations, has a
+        location without a zipcode or has a location further away is other. A community can be both.
+        """
+        close, other = [], []
+        communities = list(communities)
+        if not communities:
+            return close, other
+        if not lat or not long:
+            return close, communities
+
+        grid, locations = self._current()
+        nearby = self._within(grid, float(lat), float(long), max_distance)
+        for community in communities:
+            info = locations.get(community.id)
+            if not community.is_geographically_focused or not info:
+                other.append(community)
+                continue
+            found = nearby.get(community.id)
+            if found:
+                close.append(community)
+            if info["blank"] or info["placed"] > (found[1] if found else 0):
+                other.append(community)
+        return close, other
+
+
+community_geo_index = CommunityGeoIndex(reuse=not is_test_mode())
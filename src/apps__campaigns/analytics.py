@@ -0,0 +1,216 @@
+"""
+Campaign analytics computed with a few grouped queries, cached for a short time.
+
+campaign_stats has the totals shown on the campaign dashboard, technology_stats and community_stats
+break them down per campaign technology and per community, and daily_series gives the views, likes,
+follows and shares of the last days, one bucket per day.
+"""
+import threading
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from _main_.utils.counters import buffered_counters
+from _main_.utils.massenergize_logger import log
+from _main_.utils.utils import is_test_mode
+from apps__campaigns.models import Campaign, CampaignDailyActivity, CampaignFollow, CampaignLink, \
+    CampaignTechnologyFollow, CampaignTechnologyLike, CampaignTechnologyTestimonial, CampaignTechnologyView, \
+    CampaignView, Comment
+
+# test cases change campaign activity between two reads of the same campaign
+ANALYTICS_CACHE_TIMEOUT = 0 if is_test_mode() else 60  # seconds
+DAILY_SERIES_DAYS = 30
+
+VIEWS, TECHNOLOGY_VIEWS, LIKES = "views", "technology_views", "likes"
+
+
+def _cached(key, compute):
+    if not ANALYTICS_CACHE_TIMEOUT:
+        return compute()
+    try:
+        value = cache.get(key)
+    except Exception as e:
+        log.exception(e)
+        value = None
+    if value is None:
+        value = compute()
+        try:
+            cache.set(key, value, timeout=ANALYTICS_CACHE_TIMEOUT)
+        except Exception as e:
+            log.exception(e)
+    return value
+
+
+def _campaign_total(model, campaign_path, aggregate):
+    rows = (
+        model.objects.filter(is_deleted=False, **{campaign_path: OuterRef("pk")})
+        .order_by()
+        .values(campaign_path)
+        .annotate(total=aggregate)
+        .values("total")
+    )
+    return Subquery(rows[:1])
+
+
+def _grouped(queryset, group_by, aggregate):
+    return dict(queryset.order_by().values_list(group_by).annotate(total=aggregate).values_list(group_by, "total"))
+
+
+def campaign_stats(campaign_id):
+    """
+    Totals for a campaign, read in a single query
+    """
+    def compute():
+        stats = Campaign.objects.filter(pk=campaign_id).annotate(
+            shares=Coalesce(_campaign_total(CampaignLink, "campaign", Count("pk")), 0),
+            likes=_campaign_total(CampaignTechnologyLike, "campaign_technology__campaign", Sum("count")),
+            campaign_views=_campaign_total(CampaignView, "campaign", Sum("count")),
+            technology_views=_campaign_total(CampaignTechnologyView, "campaign_technology__campaign", Sum("count")),
+            followers=Coalesce(_campaign_total(CampaignFollow, "campaign", Count("pk")), 0),
+            comments=Coalesce(_campaign_total(Comment, "campaign_technology__campaign", Count("pk")), 0),
+            testimonials=Coalesce(_campaign_total(CampaignTechnologyTestimonial, "campaign_technology__campaign", Count("pk")), 0),
+        ).values("shares", "likes", "campaign_views", "technology_views", "followers", "comments", "testimonials").first()
+        stats = stats or {"shares": 0, "likes": None, "campaign_views": None, "technology_views": None,
+                          "followers": 0, "comments": 0, "testimonials": 0}
+        return {
+            "shares": stats["shares"],
+            "likes": stats["likes"],
+            "campaign views": stats["campaign_views"],
+            "Technology views": stats["technology_views"],
+            "followers": stats["followers"],
+            "comments": stats["comments"],
+            "testimonials": stats["testimonials"],
+        }
+
+    return _cached(f"campaign_analytics.{campaign_id}.stats", compute)
+
+
+def technology_stats(campaign_id):
+    """
+    {campaign technology id: {"likes", "follows", "views", "comments", "testimonials"}}, one query per metric
+    """
+    def compute():
+        filters = {"is_deleted": False, "campaign_technology__campaign__id": campaign_id}
+        metrics = {
+            "likes": _grouped(CampaignTechnologyLike.objects.filter(**filters), "campaign_technology_id", Sum("count")),
+            "follows": _grouped(CampaignTechnologyFollow.objects.filter(**filters), "campaign_technology_id", Count("pk")),
+            "views": _grouped(CampaignTechnologyView.objects.filter(**filters), "campaign_technology_id", Sum("count")),
+            "comments": _grouped(Comment.objects.filter(**filters), "campaign_technology_id", Count("pk")),
+            "testimonials": _grouped(CampaignTechnologyTestimonial.objects.filter(**filters), "campaign_technology_id", Count("pk")),
+        }
+        return _by_key(metrics)
+
+    return _cached(f"campaign_analytics.{campaign_id}.technologies", compute)
+
+
+def community_stats(campaign_id):
+    """
+    {community id: {"follows", "likes", "comments", "testimonials"}}, one query per metric
+    """
+    def compute():
+        technology_filters = {"is_deleted": False, "campaign_technology__campaign__id": campaign_id}
+        metrics = {
+            "follows": _grouped(CampaignFollow.objects.filter(is_deleted=False, campaign__id=campaign_id), "community_id", Count("pk")),
+            "likes": _grouped(CampaignTechnologyLike.objects.filter(**technology_filters), "community_id", Sum("count")),
+            "comments": _grouped(Comment.objects.filter(**technology_filters), "community_id", Count("pk")),
+            "testimonials": _grouped(CampaignTechnologyTestimonial.objects.filter(**technology_filters), "testimonial__community_id", Count("pk")),
+        }
+        return _by_key(metrics)
+
+    return _cached(f"campaign_analytics.{campaign_id}.communities", compute)
+
+
+def _by_key(metrics):
+    keys = {key for totals in metrics.values() for key in totals if key is not None}
+    return {key: {metric: totals.get(key) or 0 for metric, totals in metrics.items()} for key in keys}
+
+
+def daily_series(campaign_id, days=DAILY_SERIES_DAYS):
+    """
+    {"views", "technology_views", "likes", "follows", "shares": [{"date", "count"}]} for the last days,
+    oldest first and with a bucket for every day
+    """
+    def compute():
+        today = timezone.localdate()
+        start = today - timedelta(days=days - 1)
+        counts = {VIEWS: {}, TECHNOLOGY_VIEWS: {}, LIKES: {}, "follows": {}, "shares": {}}
+
+        activity = (
+            CampaignDailyActivity.objects.filter(campaign__id=campaign_id, is_deleted=False, date__gte=start)
+            .order_by()
+            .values_list("metric", "date")
+            .annotate(total=Sum("count"))
+            .values_list("metric", "date", "total")
+        )
+        for metric, date, total in activity:
+            if metric in counts:
+                counts[metric][date] = total
+
+        for metric, model in (("follows", CampaignFollow), ("shares", CampaignLink)):
+            counts[metric] = _grouped(
+                model.objects.filter(campaign__id=campaign_id, is_deleted=False, created_at__date__gte=start)
+                .annotate(day=TruncDate("created_at")),
+                "day",
+                Count("pk"),
+            )
+
+        dates = [start + timedelta(days=i) for i in range(days)]
+        return {
+            metric: [{"date": date.isoformat(), "count": by_date.get(date, 0)} for date in dates]
+            for metric, by_date in counts.items()
+        }
+
+    return _cached(f"campaign_analytics.{campaign_id}.daily.{days}", compute)
+
+
+class DailyActivityIds:
+    """
+    Remembers, in this process, the id of today's CampaignDailyActivity row for each campaign, campaign
+    technology and metric, so only the first hit of the day looks the row up. Forgotten when the day changes.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.date = None
+        self.ids = {}
+        self._lock = threading.Lock()
+
+    def get(self, campaign_id, metric, campaign_technology_id=None):
+        today = timezone.localdate()
+        key = (campaign_id, campaign_technology_id, metric)
+        with self._lock:
+            if self.date != today:
+                self.date, self.ids = today, {}
+            activity_id = self.ids.get(key) if self.enabled else None
+        if activity_id is not None:
+            return activity_id
+
+        filters = {"campaign_id": campaign_id, "campaign_technology_id": campaign_technology_id,
+                   "metric": metric, "date": today}
+        # a second row for the same day (two first hits at once) is harmless, the series sums them
+        activity_id = CampaignDailyActivity.objects.filter(**filters).values_list("pk", flat=True).first()
+        if activity_id is None:
+            activity_id = CampaignDailyActivity.objects.create(**filters).pk
+        with self._lock:
+            if self.enabled and self.date == today:
+                self.ids[key] = activity_id
+        return activity_id
+
+    def clear(self):
+        with self._lock:
+            self.date, self.ids = None, {}
+
+
+# test cases roll back the rows (and reuse their ids) without the process noticing
+daily_activity_ids = DailyActivityIds(enabled=not is_test_mode())
+
+
+def record_activity(campaign_id, metric, campaign_technology_id=None):
+    """
+    Counts a view or like in today's bucket of the daily series
+    """
+    activity_id = daily_activity_ids.get(campaign_id, metric, campaign_technology_id)
+    buffered_counters.increment_pk(CampaignDailyActivity, activity_id, "count")
@@ -1,14 +1,16 @@
 import os
 from django.core.files import File
 from _main_.utils.common import serialize, serialize_all
+from _main_.utils.counters import buffered_counters
+from apps__campaigns.analytics import campaign_stats
 from api.constants import CAMPAIGN_TEMPLATE_KEYS
 from apps__campaigns.models import CampaignAccount, CampaignAccountAdmin, CampaignCommunity, CampaignFollow, CampaignLink, CampaignManager, CampaignTechnology, CampaignTechnologyEvent, \
     CampaignTechnologyLike, CampaignTechnologyTestimonial, CampaignTechnologyView, CampaignView, Comment, Partner, Technology, \
-    TechnologyCoach, TechnologyDeal, TechnologyOverview, TechnologyVendor
+    TechnologyAction, TechnologyCoach, TechnologyDeal, TechnologyOverview, TechnologyVendor
 
 # from database.models import Event
 from database.utils.common import get_json_if_not_none
-from django.db.models import Sum
+from django.db.models import Exists, OuterRef, Prefetch
 import json
 
 
@@ -35,8 +37,8 @@ def get_user_accounts(user):
 
 
 def get_campaign_details(campaign_id, for_campaign=False):
-    techs = CampaignTechnology.objects.filter(campaign__id=campaign_id, is_deleted=False)
-    prepared = [{"campaign_technology_id": str(x.id), **get_campaign_technology_details({ "campaign_technology_id": str(x.id),"for_admin":True})} for x in techs]
+    techs = load_campaign_technologies(for_admin=True, campaign__id=campaign_id, is_deleted=False)
+    prepared = [{"campaign_technology_id": str(x.id), **prepare_campaign_technology_details(x, str(x.id))} for x in techs]
     managers = CampaignManager.objects.filter(campaign_id=campaign_id, is_deleted=False).order_by("-created_at")
     communities = CampaignCommunity.objects.filter(campaign_id=campaign_id, is_deleted=False)
     partners = Partner.objects.filter(campaign__id=campaign_id, is_deleted=False)
@@ -51,48 +53,133 @@ def get_campaign_details(campaign_id, for_campaign=False):
     }
 
 
-def get_campaign_technology_details(args):
-    campaign_technology_id = args.get("campaign_technology_id")
-    campaign_home = args.get("campaign_home")
-    for_admin = args.get("for_admin", False)
+def load_campaign_technologies(for_admin=False, campaign_home=False, **filters):
+    """
+    Loads the campaign technologies matching filters together with every row their campaign page
+    shows, in a fixed number of queries however many technologies there are.
+    """
+    testimonials = CampaignTechnologyTestimonial.objects.filter(is_deleted=False)
+    if not for_admin:
+        testimonials = testimonials.filter(testimonial__is_published=True)
+    if campaign_home:
+        testimonials = testimonials.filter(is_featured=True)
+
+    sections = [
+        Prefetch(f"technology__{section}__call_to_action_items")
+        for section in ("faq_section", "new_deal_section")
+    ]
+    prefetches = [
+        Prefetch("campaign__campaign_community", queryset=CampaignCommunity.objects.order_by("pk"), to_attr="prefetched_communities"),
+        Prefetch(
+            "campaign_technology_event",
+            queryset=CampaignTechnologyEvent.objects.filter(is_deleted=False).select_related("event__image__user_upload").order_by("event__start_date_and_time"),
+            to_attr="prefetched_events",
+        ),
+        Prefetch(
+            "campaign_technology_testimonials",
+            queryset=testimonials.select_related("testimonial__user", "testimonial__community", "testimonial__image__user_upload"),
+            to_attr="prefetched_testimonials",
+        ),
+        Prefetch("technology__technology_coach", queryset=TechnologyCoach.objects.filter(is_deleted=False).select_related("image__user_upload"), to_attr="prefetched_coaches"),
+        Prefetch("technology__technology_overview", queryset=TechnologyOverview.objects.filter(is_deleted=False).select_related("image__user_upload"), to_attr="prefetched_overview"),
+        Prefetch(
+            "technology__technology_vendor",
+            queryset=TechnologyVendor.objects.filter(is_deleted=False).select_related("vendor__user", "vendor__logo__user_upload").order_by("vendor__name"),
+            to_attr="prefetched_vendors",
+        ),
+        Prefetch("technology__technology_deal", queryset=TechnologyDeal.objects.filter(is_deleted=False), to_attr="prefetched_deals"),
+        Prefetch("technology__technology_action", queryset=TechnologyAction.objects.filter(is_deleted=False).select_related("image__user_upload"), to_attr="prefetched_actions"),
+        Prefetch("technology__technology_faq", to_attr="prefetched_faqs"),
+        *sections,
+    ]
+    if not campaign_home:
+        prefetches += [
+            Prefetch(
+                "comment_set",
+                queryset=Comment.objects.filter(is_deleted=False).select_related("user", "community").order_by("-created_at")[:20],
+                to_attr="prefetched_comments",
+            ),
+            # first() of each, as the pages always showed
+            Prefetch("campaigntechnologyview_set", queryset=CampaignTechnologyView.objects.filter(is_deleted=False).order_by("pk"), to_attr="prefetched_views"),
+            Prefetch("campaigntechnologylike_set", queryset=CampaignTechnologyLike.objects.filter(is_deleted=False).order_by("pk"), to_attr="prefetched_likes"),
+        ]
+
+    return list(
+        CampaignTechnology.objects.filter(**filters)
+        .select_related(
+            "campaign",
+            "technology__image__user_upload",
+            "technology__user",
+            "technology__faq_section__media",
+            "technology__call_to_action",
+            "technology__new_deal_section__media",
+        )
+        .prefetch_related(*prefetches)
+    )
+
+
+def prepare_campaign_technology_details(campaign_tech, campaign_technology_id, campaign_home=False):
+    """
+    The campaign page data of a technology loaded with load_campaign_technologies
+    """
+    events = campaign_tech.prefetched_events
+    testimonials = campaign_tech.prefetched_testimonials
+    coaches = campaign_tech.technology.prefetched_coaches
 
-    campaign_tech = CampaignTechnology.objects.get(id=campaign_technology_id)
-    events = CampaignTechnologyEvent.objects.filter(campaign_technology=campaign_tech, is_deleted=False).select_related("campaign_technology").order_by("event__start_date_and_time")
-    coaches = TechnologyCoach.objects.filter(technology_id=campaign_tech.technology.id, is_deleted=False)
-    comments = Comment.objects.filter(campaign_technology__id=campaign_technology_id, is_deleted=False).order_by("-created_at")[:20]
-    if for_admin:
-        testimonials = CampaignTechnologyTestimonial.objects.filter(is_deleted=False,campaign_technology__id=campaign_technology_id)
-    else:
-        testimonials = CampaignTechnologyTestimonial.objects.filter(is_deleted=False,campaign_technology__id=campaign_technology_id, testimonial__is_published=True)
-     
     if campaign_home:
         data =  {
-            "testimonials": serialize_all(testimonials.filter(is_featured=True)),
+            "testimonials": serialize_all(testimonials),
             "events": serialize_all(events, full=True),
             "coaches": serialize_all(coaches),
             "campaign_id": campaign_tech.campaign.id,
         }
         if campaign_tech.campaign.template_key != CAMPAIGN_TEMPLATE_KEYS.get("MULTI_TECHNOLOGY_CAMPAIGN"):
-            data = {**data, **get_technology_details(campaign_tech.technology.id)}
+            data = {**data, **prepare_technology_details(campaign_tech.technology)}
         else:
             data = {**data, **serialize(campaign_tech.technology)}
             
         return data
-    campaign_technology_views = CampaignTechnologyView.objects.filter(campaign_technology__id=campaign_technology_id,is_deleted=False).first()
-    likes = CampaignTechnologyLike.objects.filter(campaign_technology__id=campaign_technology_id,is_deleted=False).first()
+    campaign_technology_views = next(iter(campaign_tech.prefetched_views), None)
+    likes = next(iter(campaign_tech.prefetched_likes), None)
 
     return {
-        **get_technology_details(campaign_tech.technology.id, True),
-        "campaign_technology_views": campaign_technology_views.count if campaign_technology_views else 0,
-        "likes": likes.count if likes else 0,
+        **prepare_technology_details(campaign_tech.technology),
+        "campaign_technology_views": buffered_counters.total(campaign_technology_views, "count"),
+        "likes": buffered_counters.total(likes, "count"),
         "testimonials": serialize_all(testimonials),
-        "comments": serialize_all(comments),
+        "comments": serialize_all(campaign_tech.prefetched_comments),
         "events": serialize_all(events, full=True),
         "campaign_id": campaign_tech.campaign.id,
         "campaign_technology_id": campaign_technology_id,
     }
 
 
+def get_campaign_technology_details(args):
+    campaign_technology_id = args.get("campaign_technology_id")
+    campaign_home = args.get("campaign_home")
+    for_admin = args.get("for_admin", False)
+
+    techs = load_campaign_technologies(for_admin=for_admin, campaign_home=campaign_home, id=campaign_technology_id)
+    if not techs:
+        raise CampaignTechnology.DoesNotExist("CampaignTechnology matching query does not exist.")
+    return prepare_campaign_technology_details(techs[0], campaign_technology_id, campaign_home=campaign_home)
+
+
+def prepare_technology_details(tech):
+    """
+    The details of a technology whose rows were prefetched by load_campaign_technologies
+    """
+    return {
+        "coaches": serialize_all(tech.prefetched_coaches),
+        "overview": serialize_all(tech.prefetched_overview),
+        "vendors": serialize_all(tech.prefetched_vendors),
+        "deals": serialize_all(tech.prefetched_deals),
+        "technology_actions": serialize_all(tech.prefetched_actions),
+        "faqs": serialize_all(tech.prefetched_faqs),
+        **serialize(tech),
+    }
+
+
 def get_technology_details(technology_id, for_campaign=False):
     tech = Technology.objects.get(id=technology_id)
     coaches = tech.technology_coach.filter(is_deleted=False)
@@ -116,8 +203,8 @@ def get_technology_details(technology_id, for_campaign=False):
 
 
 def get_campaign_details_for_user(campaign, email):
-    techs = CampaignTechnology.objects.filter(campaign__id=campaign.id, is_deleted=False)
-    prepared = [{"campaign_technology_id": str(x.id), **get_campaign_technology_details({"email": email, "campaign_home": True, "campaign_technology_id": str(x.id)})} for x in techs]
+    techs = load_campaign_technologies(campaign_home=True, campaign__id=campaign.id, is_deleted=False)
+    prepared = [{"campaign_technology_id": str(x.id), **prepare_campaign_technology_details(x, str(x.id), campaign_home=True)} for x in techs]
     communities = CampaignCommunity.objects.filter(campaign__id=campaign.id, is_deleted=False)
     key_contact = CampaignManager.objects.filter(is_key_contact=True, is_deleted=False, campaign__id=campaign.id).first()
     campaign_views = CampaignTechnologyView.objects.filter(campaign_technology__campaign__id=campaign.id,is_deleted=False).first()
@@ -139,7 +226,7 @@ def get_campaign_details_for_user(campaign, email):
         "my_testimonials": serialize_all(my_testimonials[:5]) if email else [],
         "technologies": prepared,
         "communities": serialize_all(communities),
-        "campaign_views": campaign_views.count if campaign_views else 0,
+        "campaign_views": buffered_counters.total(campaign_views, "count"),
         "navigation": generate_campaign_navigation(campaign),
         "languages": serialize_all(languages),
         "partners": serialize_all(partners),
@@ -187,11 +274,17 @@ def generate_campaign_navigation(campaign):
          "icon": "fa-money"},
     ]
 
-    campaign_techs = CampaignTechnology.objects.filter(campaign__id=campaign.id, is_deleted=False)
+    # category_has_items for every technology, in the same query
+    campaign_techs = CampaignTechnology.objects.filter(campaign__id=campaign.id, is_deleted=False).select_related("technology").annotate(
+        has_coaches=Exists(TechnologyCoach.objects.filter(technology=OuterRef("technology"), is_deleted=False)),
+        has_vendors=Exists(TechnologyVendor.objects.filter(technology=OuterRef("technology"), is_deleted=False)),
+        has_testimonials=Exists(CampaignTechnologyTestimonial.objects.filter(campaign_technology=OuterRef("pk"), is_deleted=False)),
+        has_events=Exists(CampaignTechnologyEvent.objects.filter(campaign_technology=OuterRef("pk"), is_deleted=False)),
+    )
 
     for tech in campaign_techs:
         for index, category in enumerate(["coaches", "vendors", "testimonials", "events"]):
-            if category_has_items(category, tech):
+            if getattr(tech, f"has_{category}"):
                 MENU[index]["children"].append(
                     {"key": tech.id, "url": f"/campaign/{campaign.slug}/technology/{tech.id}/?section={category}{mode}",
                      "text": tech.technology.name}
@@ -219,30 +312,7 @@ def generate_campaign_navigation(campaign):
 
 def generate_analytics_data(campaign_id):
     #  number of likes, number of views, number of followers, number of comments, number of testimonials,
-
-    shares = CampaignLink.objects.filter(is_deleted=False, campaign__id=campaign_id).count()
-    likes = CampaignTechnologyLike.objects.filter(campaign_technology__campaign__id=campaign_id,
-            is_deleted=False).aggregate(
-            total_likes=Sum('count'))['total_likes']
-    campaign_technology_views = CampaignTechnologyView.objects.filter(campaign_technology__campaign__id=campaign_id,
-            is_deleted=False).aggregate(
-            total_views=Sum('count'))['total_views']
-    followers = CampaignFollow.objects.filter(is_deleted=False, campaign__id=campaign_id).count()
-    comments = Comment.objects.filter(is_deleted=False, campaign_technology__campaign__id=campaign_id).count()
-    testimonials = CampaignTechnologyTestimonial.objects.filter(is_deleted=False,
-                                                                campaign_technology__campaign__id=campaign_id).count()
-    campaign_views = CampaignView.objects.filter(campaign__id=campaign_id, is_deleted=False).aggregate(total_views=Sum('count'))[
-            'total_views']
-    stats = {
-        "shares": shares,
-        "likes": likes,
-        "campaign views": campaign_views,
-        "Technology views": campaign_technology_views,
-        "followers": followers,
-        "comments": comments,
-        "testimonials": testimonials,
-    }
-    return stats
+    return campaign_stats(campaign_id)
 
 
 def copy_campaign_data(new_campaign):
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.1 on 2026-10-18 18:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps__campaigns', '0025_partner_campaign'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CampaignDailyActivity',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('info', models.JSONField(blank=True, null=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('metric', models.CharField(max_length=100)),
+                ('date', models.DateField()),
+                ('count', models.PositiveBigIntegerField(default=0)),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='apps__campaigns.campaign')),
+                ('campaign_technology', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='apps__campaigns.campaigntechnology')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['campaign', 'metric', 'date'], name='apps__campa_campaig_292b30_idx')],
+            },
+        ),
+    ]
@@ -5,6 +5,7 @@ from django.db import models
 from django.forms import model_to_dict
 
 from _main_.utils.base_model import BaseModel, Faq
+from _main_.utils.counters import buffered_counters
 from database.utils.common import get_json_if_not_none, get_summary_info
 from database.utils.constants import LONG_STR_LEN, SHORT_STR_LEN, MEDIUM_STR_LEN
 from django.utils.text import slugify
@@ -15,7 +16,12 @@ def generate_rand_between(start=2, end=10):
     return  random.randint(end**(length-1), end**length - 1)
 
 def get_comm_alias(campaign, community_id):
-    com = campaign.campaign_community.filter(community_id=community_id).first()
+    # campaign pages prefetch the campaign's communities, ordered like first()
+    prefetched = getattr(campaign, "prefetched_communities", None)
+    if prefetched is not None:
+        com = next((c for c in prefetched if c.community_id == community_id), None)
+    else:
+        com = campaign.campaign_community.filter(community_id=community_id).first()
     return com.alias if com else None
 
 
@@ -542,12 +548,10 @@ class CampaignLike(BaseModel):
         return f"{self.campaign} - {str(self.count)} - likes"
 
     def increase_count(self):
-        self.count += 1
-        self.save()
+        buffered_counters.increment(self, "count")
 
     def decrease_count(self):
-        self.count -= 1
-        self.save()
+        buffered_counters.increment(self, "count", -1)
 
     def simple_json(self)-> dict:
         res = super().to_json()
@@ -624,12 +628,10 @@ class CampaignTechnologyLike(BaseModel):
         return f"{self.campaign_technology} - {self.user}"
 
     def increase_count(self):
-        self.count += 1
-        self.save()
+        buffered_counters.increment(self, "count")
 
     def decrease_count(self):
-        self.count -= 1
-        self.save()
+        buffered_counters.increment(self, "count", -1)
 
     def simple_json(self)-> dict:
         res = super().to_json()
@@ -660,8 +662,7 @@ class CampaignTechnologyView(BaseModel):
         return res
 
     def increase_count(self):
-        self.count += 1
-        self.save()
+        buffered_counters.increment(self, "count")
 
     def full_json(self):
         return self.simple_json()
@@ -679,8 +680,7 @@ class CampaignView(BaseModel):
 
 
     def increase_count(self):
-        self.count += 1
-        self.save()
+        buffered_counters.increment(self, "count")
 
     def simple_json(self)-> dict:
         res = super().to_json()
@@ -848,8 +848,7 @@ class CampaignLink(BaseModel):
         return f"{self.email} - {self.visits}"
 
     def increase_count(self):
-        self.visits += 1
-        self.save()
+        buffered_counters.increment(self, "visits")
 
 
     def simple_json(self)-> dict:
@@ -930,6 +929,36 @@ class CampaignActivityTracking(BaseModel):
         fields_to_translate = []
 
 
+class CampaignDailyActivity(BaseModel):
+    """
+    Number of views or likes a campaign (or one of its technologies) got on a day, for the daily
+    analytics series. The view and like counter rows only hold running totals.
+    """
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE)
+    campaign_technology = models.ForeignKey(CampaignTechnology, on_delete=models.CASCADE, blank=True, null=True)
+    metric = models.CharField(max_length=SHORT_STR_LEN)
+    date = models.DateField()
+    count = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.campaign} - {self.date} - {self.count} {self.metric}"
+
+    def simple_json(self)-> dict:
+        res = super().to_json()
+        res.update(model_to_dict(self))
+        res["campaign"] = get_summary_info(self.campaign)
+        return res
+
+    def full_json(self):
+        return self.simple_json()
+
+    class TranslationMeta:
+        fields_to_translate = []
+
+    class Meta:
+        indexes = [models.Index(fields=["campaign", "metric", "date"])]
+
+
 class TechnologyFaq(Faq):
     technology = models.ForeignKey(Technology, on_delete=models.CASCADE, related_name="technology_faq")
 
@@ -1,3 +1,4 @@
+from bisect import bisect_left
 from fileinput import filename
 from .models import CalcDefault
 from datetime import datetime
@@ -5,6 +6,7 @@ from django.utils import timezone
 import csv
 
 current_tz = timezone.get_current_timezone()
+DEFAULT_VALID_DATE = datetime.strptime('2000-01-01','%Y-%m-%d').date()
 
 def getLocality(inputs):
 
@@ -39,6 +41,9 @@ def date_import(date_string):
 def getDefault(locality, variable, date=None, default=None):
     return CCD.getDefault(CCD,locality, variable, date, default=default)
 
+def getDefaults(locality, variable, dates, default=None):
+    return CCD.getDefaults(CCD,locality, variable, dates, default=default)
+
 def removeDuplicates():
     # assuming which duplicate is removed doesn't matter...
     for row in CalcDefault.objects.all().reverse():
@@ -54,66 +59,57 @@ class CCD():
     def loadDefaults(self):
         self.DefaultsByLocality = {"default":{}} # the class variable
         try:
-            cq = CalcDefault.objects.all()
-            for c in cq:
+            # values by date for each locality and variable; with multiple values for one date, keep the first
+            by_date = {}
+            for c in CalcDefault.objects.all():
                 # valid date is 0 if not specified
-                date = datetime.strptime('2000-01-01','%Y-%m-%d').date()
-                if c.valid_date != None:
-                    date = c.valid_date
-
-                if c.locality not in self.DefaultsByLocality:
-                    self.DefaultsByLocality[c.locality] = {}
-                if c.variable not in self.DefaultsByLocality[c.locality]:
-                    self.DefaultsByLocality[c.locality][c.variable] = {"valid_dates":[date], "values":[c.value]}
-                else:
-                    # already one value for this parameter, order by dates
-                    found = False
-                    for i in range(len(self.DefaultsByLocality[c.locality][c.variable]["values"])):
-                        valid_date = self.DefaultsByLocality[c.locality][c.variable]["valid_dates"][i]
-                        if date < valid_date:
-                            # insert value at this point
-                            found = True
-                            self.DefaultsByLocality[c.locality][c.variable]["valid_dates"].insert(i,date)
-                            self.DefaultsByLocality[c.locality][c.variable]["values"].insert(i,c.value)
-                            break
-                        elif date == valid_date:
-                            # multiple values with one date; skip
-                            found = True
-                            break
-                        
-                    # if not inserted into list, append to the end
-                    if not found:
-                        self.DefaultsByLocality[c.locality][c.variable]["valid_dates"].append(date)
-                        self.DefaultsByLocality[c.locality][c.variable]["values"].append(c.value)
+                date = c.valid_date if c.valid_date != None else DEFAULT_VALID_DATE
+                by_date.setdefault((c.locality, c.variable), {}).setdefault(date, c.value)
+
+            for (locality, variable), values in by_date.items():
+                valid_dates = sorted(values)
+                if locality not in self.DefaultsByLocality:
+                    self.DefaultsByLocality[locality] = {}
+                self.DefaultsByLocality[locality][variable] = {"valid_dates":valid_dates, "values":[values[d] for d in valid_dates]}
 
         except Exception as e:
             print(str(e))
             print("CalcDefault initialization skipped")
 
-    def getDefault(self, locality, variable, date, default=None):
+    def getTable(self, locality, variable):
         # load default values if they haven't yet been loaded
         if self.DefaultsByLocality["default"]=={}:
             self.loadDefaults(self)
 
         if locality not in self.DefaultsByLocality:
             locality = "default"
-        if variable in self.DefaultsByLocality[locality]:
-            # variable found; get the value appropriate for the date
-            var = self.DefaultsByLocality[locality][variable]    # not a copy
-            if date==None:
-                # if date not specified, use the most recent value
-                value = var["values"][-1]
-            else:
-                for i in range(len(var["valid_dates"])):
-                    valid_date = var["valid_dates"][i]
-                    if valid_date < date:
-                        value = var["values"][i]
-            return value
-        
-        # no defaults found.  Signal this as an error.
-        if default:
-            return default
-        raise Exception('Carbon Calculator error: value for "'+variable+'" not found in CalcDefaults')        
+        return self.DefaultsByLocality[locality].get(variable)
+
+    def getDefault(self, locality, variable, date, default=None):
+        return self.getDefaults(self, locality, variable, [date], default=default)[0]
+
+    def getDefaults(self, locality, variable, dates, default=None):
+        # values of one variable for many dates, looking the table up once
+        var = self.getTable(self, locality, variable)    # not a copy
+        values = []
+        for date in dates:
+            if var:
+                if date==None:
+                    # if date not specified, use the most recent value
+                    values.append(var["values"][-1])
+                    continue
+                # the value from the latest date before this one
+                i = bisect_left(var["valid_dates"], date)
+                if i > 0:
+                    values.append(var["values"][i-1])
+                    continue
+
+            # no defaults found.  Signal this as an error.
+            if default:
+                values.append(default)
+                continue
+            raise Exception('Carbon Calculator error: value for "'+variable+'" not found in CalcDefaults')
+        return values
 
     def exportDefaults(self,fileName):
         try:
@@ -191,30 +187,13 @@ class CCD():
                     if not locality in self.DefaultsByLocality:
                         self.DefaultsByLocality[locality] = {}
 
-                    if not variable in self.DefaultsByLocality[locality]:
-                        self.DefaultsByLocality[locality][variable] = {}
-
-                        self.DefaultsByLocality[locality][variable]["valid_dates"] = [valid_date]
-                        self.DefaultsByLocality[locality][variable]["values"] = [value]
+                    var = self.DefaultsByLocality[locality].setdefault(variable, {"valid_dates":[], "values":[]})
+                    i = bisect_left(var["valid_dates"], valid_date)
+                    if i < len(var["valid_dates"]) and var["valid_dates"][i] == valid_date:
+                        var["values"][i] = value
                     else:
-                        f = False
-                        var = self.DefaultsByLocality[locality][variable]
-                        for i in range(len(var["valid_dates"])):
-                            compdate = var["valid_dates"][i]
-                            if type(compdate)==type('str'):
-                                compdate = datetime.strptime(compdate, "%Y-%m-%d").date()
-                            if valid_date < compdate:
-                                var["valid_dates"].insert(i,valid_date)
-                                var["values"].insert(i,value)
-                                f = True
-                                break
-                            elif valid_date == compdate:
-                                var["values"][i] = value
-                                f = True
-                                break
-                        if not f:
-                            var["valid_dates"].append(valid_date)
-                            var["values"].append(value)
+                        var["valid_dates"].insert(i,valid_date)
+                        var["values"].insert(i,value)
                 if num>0:
                     msg = "Imported %d Carbon Calculator Defaults" % num
                 else:
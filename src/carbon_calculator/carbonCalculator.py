@@ -15,7 +15,7 @@ from django.utils.text import slugify
 from _main_.settings import BASE_DIR, RUN_SERVER_LOCALLY
 from _main_.utils.common import custom_timezone_info
 from .CCConstants import INVALID_QUERY, NO, VALID_QUERY, YES
-from .CCDefaults import CCD, getDefault, getLocality
+from .CCDefaults import CCD, getDefault, getDefaults, getLocality
 from .electricity import EvalColdWaterWash, EvalCommunitySolar, EvalElectricityMonitor, EvalEnergystarRefrigerator, \
     EvalEnergystarWasher, EvalHeatPumpDryer, EvalInductionStove, EvalLEDLighting, EvalLineDry, EvalRefrigeratorPickup, \
     EvalRenewableElectricity, EvalSmartPowerStrip
@@ -79,6 +79,19 @@ def AverageImpact(action, date=None, locality="default"):
     impact = getDefault(locality, averageName, date, default=TOKEN_POINTS)
     return impact
 
+def AverageImpacts(action_dates, locality="default"):
+    # AverageImpact for a list of (action, date) pairs, in the same order.
+    # Dates are grouped per action so each defaults table is looked up once.
+    dates_by_name = {}
+    for action, date in action_dates:
+        dates_by_name.setdefault(action.name, []).append(date)
+
+    impacts_by_name = {}
+    for name, dates in dates_by_name.items():
+        impacts_by_name[name] = iter(getDefaults(locality, name + '_average_points', dates, default=TOKEN_POINTS))
+
+    return [next(impacts_by_name[action.name]) for action, _ in action_dates]
+
 class CarbonCalculator:
     def __init__(self, reset=False) :
 
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class DatabaseConfig(AppConfig):
     name = 'database'
+
+    def ready(self):
+        from _main_.utils.response_cache import connect_invalidation_signals
+        connect_invalidation_signals()
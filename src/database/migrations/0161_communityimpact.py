@@ -0,0 +1,30 @@
+# Generated by Django 4.2.1 on 2026-10-18 17:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0160_remove_testimonialautosharesettings_excluded_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommunityImpact',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('households_engaged', models.IntegerField(blank=True, default=0)),
+                ('actions_completed', models.IntegerField(blank=True, default=0)),
+                ('carbon_footprint_reduction', models.FloatField(blank=True, default=0)),
+                ('rebuilt_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('community', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='impact', to='database.community')),
+            ],
+            options={
+                'db_table': 'community_impacts',
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.1 on 2026-10-18 18:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0161_communityimpact'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslatedContentFingerprint',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('model_name', models.CharField(max_length=100)),
+                ('record_id', models.CharField(max_length=100)),
+                ('language_code', models.CharField(max_length=5)),
+                ('fingerprint', models.CharField(max_length=100)),
+                ('translated_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'translated_content_fingerprints',
+                'unique_together': {('model_name', 'record_id', 'language_code')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.1 on 2026-10-18 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0162_translatedcontentfingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='media',
+            name='perceptual_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=100),
+        ),
+    ]
@@ -1,18 +1,22 @@
 import datetime
 import json
+import time
 import uuid
 from datetime import timezone, timedelta
 
 import slugify
 
 from _main_.utils.common import item_is_empty
+from _main_.utils.massenergize_logger import log
+from _main_.utils.utils import is_test_mode
 
 from _main_.utils.policy.PolicyConstants import PolicyConstants
 from _main_.utils.base_model import BaseModel
 from _main_.utils.base_model import RootModel
 from apps__campaigns.helpers import get_user_accounts
 from database.utils.settings.model_constants.events import EventConstants
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Greatest
 from django.db.models.fields import BooleanField
 from _main_.utils.feature_flags.FeatureFlagConstants import FeatureFlagConstants
 from _main_.utils.footage.FootageConstants import FootageConstants
@@ -25,6 +29,7 @@ from database.utils.settings.user_settings import UserPortalSettings
 from django.utils import timezone
 from django.core.files.storage import default_storage
 from django.db.models.query import QuerySet
+from django.db.models import Prefetch, prefetch_related_objects
 
 from .utils.common import (
     get_images_in_sequence,
@@ -36,7 +41,7 @@ from .utils.common import (
 from api.constants import COMMUNITY_NOTIFICATION_TYPES, STANDARD_USER, GUEST_USER
 from django.forms.models import model_to_dict
 from carbon_calculator.models import Action as CCAction
-from carbon_calculator.carbonCalculator import AverageImpact
+from carbon_calculator.carbonCalculator import AverageImpact, AverageImpacts
 from .utils.settings.model_constants.enums import SharingType, LocationType
 
 CHOICES = json_loader("./database/raw_data/other/databaseFieldChoices.json")
@@ -45,31 +50,106 @@ ZIP_CODE_AND_STATES = json_loader("./database/raw_data/other/states.json")
 # -------------------------------------------------------------------------
 
 
+class FeatureFlagResolver:
+    """
+    Process-level snapshot of all feature flags and their audience memberships.
+
+    The snapshot is built with three queries and then answers "which flags are
+    enabled for this community/user" from memory, so serializing a list of
+    communities or users no longer costs a query per flag per item.
+
+    Writes to FeatureFlag bump a version number kept in the shared cache. Each
+    process compares its snapshot against that version at most once every
+    VERSION_CHECK_INTERVAL seconds, and the process doing the write drops its
+    own snapshot straight away.
+    """
+
+    VERSION_CACHE_KEY = "feature_flags.resolver.version"
+    # test cases roll back flag rows (and the db-backed cache) without a save,
+    # so always re-check the version there
+    VERSION_CHECK_INTERVAL = 0 if is_test_mode() else 5  # seconds
+
+    _snapshot = None
+    _version = None
+    _checked_at = 0
+
+    @classmethod
+    def invalidate(cls):
+        from django.core.cache import cache
+
+        cls._snapshot = None
+        try:
+            cache.set(cls.VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+        except Exception as e:
+            log.exception(e)
+
+    @classmethod
+    def _current_version(cls):
+        from django.core.cache import cache
+
+        try:
+            return cache.get(cls.VERSION_CACHE_KEY)
+        except Exception as e:
+            log.exception(e)
+            return cls._version
+
+    @classmethod
+    def _load(cls):
+        flags = list(FeatureFlag.objects.all())
+        community_ids, user_ids = {}, {}
+        for flag_id, community_id in FeatureFlag.communities.through.objects.values_list(
+            "featureflag_id", "community_id"
+        ):
+            community_ids.setdefault(flag_id, set()).add(community_id)
+        for flag_id, user_id in FeatureFlag.users.through.objects.values_list(
+            "featureflag_id", "userprofile_id"
+        ):
+            user_ids.setdefault(flag_id, set()).add(user_id)
+
+        return [
+            (
+                f.audience,
+                f.expires_on,
+                f.info(),
+                frozenset(community_ids.get(f.id, ())),
+                frozenset(user_ids.get(f.id, ())),
+            )
+            for f in flags
+        ]
+
+    @classmethod
+    def snapshot(cls):
+        now = time.monotonic()
+        if cls._snapshot is None or now - cls._checked_at >= cls.VERSION_CHECK_INTERVAL:
+            version = cls._current_version()
+            if cls._snapshot is None or version != cls._version:
+                cls._snapshot = cls._load()
+                cls._version = version
+            cls._checked_at = now
+        return cls._snapshot
+
+    @classmethod
+    def enabled_flags(cls, obj_id, users=False):
+        feature_flags_json = []
+        for audience, expires_on, info, community_ids, user_ids in cls.snapshot():
+            specified = user_ids if users else community_ids
+            enabled = (
+                (audience == "EVERYONE")
+                or (audience == "SPECIFIC" and obj_id in specified)
+                or (audience == "ALL_EXCEPT" and obj_id not in specified)
+            )
+            enabled = enabled and (
+                not expires_on or expires_on > datetime.datetime.now(expires_on.tzinfo)
+            )
+            if enabled:
+                feature_flags_json.append(dict(info))
+        return feature_flags_json
+
+
 def get_enabled_flags(
     _self, users=False
 ):  # _self : CommunityObject or UserProfileObject
-    feature_flags = FeatureFlag.objects.all()  # We get all available flags
-    feature_flags_json = []
-    for f in feature_flags:  # Go over all the flags
-        specified = (
-            f.communities.all() if not users else f.users.all()
-        )  # Then note down which communities each flag is enabled for
-        enabled = (
-            (f.audience == "EVERYONE")
-            or (  # FeatureFlagConstants.AUDIENCE["EVERYONE"]["key"]
-                f.audience == "SPECIFIC" and _self in specified
-            )
-            or (f.audience == "ALL_EXCEPT" and _self not in specified)
-        )  # Check if flag is enabled for the community
-        enabled = enabled and (
-            not f.expires_on
-            or f.expires_on > datetime.datetime.now(f.expires_on.tzinfo)
-        )
-        if enabled:
-            feature_flags_json.append(
-                f.info()
-            )  # Then if the flag hasnt expired, note down the flag
-    return feature_flags_json
+    return FeatureFlagResolver.enabled_flags(_self.pk, users=users)
 
 
 def user_is_due_for_mou(user):
@@ -279,6 +359,10 @@ class Media(models.Model):
       the file that is to be stored.
     media_type: str
       the type of this media file whether it is an image, video, pdf etc.
+    hash: str
+      sha256 hash of the file, shared by exact duplicates
+    perceptual_hash: str
+      hash of what the image looks like, close for resized copies of an image
     """
 
     id = models.AutoField(primary_key=True)
@@ -289,6 +373,7 @@ class Media(models.Model):
     order = models.PositiveIntegerField(default=0, blank=True, null=True)
     tags = models.ManyToManyField(Tag, related_name="media_tags", blank=True)
     hash = models.TextField(max_length=LONG_STR_LEN, blank=True, db_index=True)
+    perceptual_hash = models.CharField(max_length=SHORT_STR_LEN, blank=True, db_index=True)
 
     def __str__(self):
         return str(self.id) + "-" + self.name + "(" + self.file.name + ")"
@@ -594,9 +679,12 @@ class Community(models.Model):
        return res
 
     def get_logo_link_from_menu(self):
-        menu = Menu.objects.filter(community=self, is_published=True)
+        # lists of communities can prefetch their published menus in prefetched_menus
+        menu = getattr(self, "prefetched_menus", None)
+        if menu is None:
+            menu = Menu.objects.filter(community=self, is_published=True)
         if menu:
-            return menu.first().community_logo_link
+            return menu[0].community_logo_link
         return None
 
     def simple_json(self):
@@ -650,34 +738,10 @@ class Community(models.Model):
         goal = get_json_if_not_none(self.goal) or {}
 
         # goal defined consistently; not differently in two places
-        if self.is_geographically_focused:
-            goal[
-                "organic_attained_number_of_households"
-            ] = RealEstateUnit.objects.filter(is_deleted=False, community=self).count()
-            done_actions = UserActionRel.objects.filter(
-                real_estate_unit__community=self, status="DONE"
-            ).prefetch_related("action__calculator_action")
-        else:
-            community_members = CommunityMember.objects.filter(
-                is_deleted=False, community=self
-            ).select_related("user")
-            users = [cm.user for cm in community_members]
-            members_count = community_members.count()
-            goal["organic_attained_number_of_households"] = members_count
-            done_actions = UserActionRel.objects.filter(
-                user__in=users, status="DONE"
-            ).prefetch_related("action__calculator_action")
-
-        goal["organic_attained_number_of_actions"] = done_actions.count()
-
-        carbon_footprint_reduction = 0
-        for actionRel in done_actions:
-            if actionRel.action and actionRel.action.calculator_action:
-                carbon_footprint_reduction += AverageImpact(
-                    actionRel.action.calculator_action, actionRel.date_completed
-                )
-
-        goal["organic_attained_carbon_footprint_reduction"] = carbon_footprint_reduction
+        impact = CommunityImpact.get_for_community(self)
+        goal["organic_attained_number_of_households"] = impact.households_engaged
+        goal["organic_attained_number_of_actions"] = impact.actions_completed
+        goal["organic_attained_carbon_footprint_reduction"] = impact.carbon_footprint_reduction
 
         # calculate values for community impact to be displayed on front-end sites
         impact_page_settings: ImpactPageSettings = ImpactPageSettings.objects.filter(
@@ -849,6 +913,225 @@ class CommunitySnapshot(models.Model):
         db_table = "community_snapshots"
 
 
+class CommunityImpact(models.Model):
+    """
+    A class used to keep a community's platform impact totals up to date, so they
+    don't have to be recomputed from every UserActionRel on each request.
+
+    The totals follow the definitions used on the community sites: geographically
+    focused communities count their households and the actions done in them,
+    other communities count their members and the actions those members have done.
+
+    Attributes
+    ----------
+    community : Community
+      the community these totals belong to
+    households_engaged : int
+      households (geographic communities) or members (other communities)
+    actions_completed : int
+      number of DONE actions attributed to the community
+    carbon_footprint_reduction : float
+      sum of the average carbon impact of those actions
+    rebuilt_at : DateTime
+      the last time the totals were fully recomputed
+    """
+
+    id = models.AutoField(primary_key=True)
+    community = models.OneToOneField(
+        Community, on_delete=models.CASCADE, related_name="impact"
+    )
+    households_engaged = models.IntegerField(default=0, blank=True)
+    actions_completed = models.IntegerField(default=0, blank=True)
+    carbon_footprint_reduction = models.FloatField(default=0, blank=True)
+    rebuilt_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.community} | {self.actions_completed} actions"
+
+    def simple_json(self):
+        return model_to_dict(
+            self,
+            ["households_engaged", "actions_completed", "carbon_footprint_reduction"],
+        )
+
+    def full_json(self):
+        res = self.simple_json()
+        res["rebuilt_at"] = self.rebuilt_at
+        return res
+
+    @staticmethod
+    def done_action_rels(community):
+        if community.is_geographically_focused:
+            return UserActionRel.objects.filter(
+                real_estate_unit__community=community, status="DONE", is_deleted=False
+            )
+        members = CommunityMember.objects.filter(
+            is_deleted=False, community=community
+        ).values("user_id")
+        return UserActionRel.objects.filter(user__in=members, status="DONE", is_deleted=False)
+
+    @staticmethod
+    def count_households(community):
+        if community.is_geographically_focused:
+            return RealEstateUnit.objects.filter(
+                is_deleted=False, community=community
+            ).count()
+        return CommunityMember.objects.filter(
+            is_deleted=False, community=community
+        ).count()
+
+    @staticmethod
+    def action_rels_totals(action_rels):
+        """
+        Returns (number of actions, carbon reduction) for a queryset of DONE UserActionRels.
+        The impact of an action only depends on its calculator action and completion date,
+        so it is computed once per distinct pair instead of once per UserActionRel.
+        """
+        count = action_rels.count()
+        groups = list(
+            action_rels.filter(action__calculator_action__isnull=False)
+            .order_by()
+            .values("action__calculator_action", "date_completed")
+            .annotate(count=models.Count("id"))
+        )
+        calculator_actions = CCAction.objects.in_bulk(
+            {group["action__calculator_action"] for group in groups}
+        )
+        impacts = AverageImpacts(
+            [
+                (calculator_actions[group["action__calculator_action"]], group["date_completed"])
+                for group in groups
+            ]
+        )
+        carbon = 0
+        for group, impact in zip(groups, impacts):
+            carbon += group["count"] * impact
+        return count, carbon
+
+    @staticmethod
+    def communities_for_action_rel(user, household):
+        """
+        The communities whose totals include a DONE action of this user in this household
+        """
+        community_ids = set(
+            CommunityMember.objects.filter(
+                user=user,
+                is_deleted=False,
+                community__is_geographically_focused=False,
+            ).values_list("community_id", flat=True)
+        )
+        if household and household.community and household.community.is_geographically_focused:
+            community_ids.add(household.community_id)
+        return community_ids
+
+    @classmethod
+    def rebuild(cls, community):
+        households = cls.count_households(community)
+        actions, carbon = cls.action_rels_totals(cls.done_action_rels(community))
+        impact, _ = cls.objects.update_or_create(
+            community=community,
+            defaults={
+                "households_engaged": households,
+                "actions_completed": actions,
+                "carbon_footprint_reduction": carbon,
+                "rebuilt_at": timezone.now(),
+            },
+        )
+        return impact
+
+    @classmethod
+    def get_for_community(cls, community):
+        try:
+            return community.impact
+        except cls.DoesNotExist:
+            # first time these totals are needed: build them from scratch
+            return cls.rebuild(community)
+
+    @classmethod
+    def _add_to_totals(cls, community_ids, actions=0, carbon=0):
+        if not community_ids or (not actions and not carbon):
+            return
+        cls.objects.filter(community_id__in=community_ids).update(
+            actions_completed=models.F("actions_completed") + actions,
+            carbon_footprint_reduction=models.F("carbon_footprint_reduction") + carbon,
+        )
+
+    @classmethod
+    def refresh_households(cls, community):
+        # households are recounted rather than incremented, so they can't drift
+        if not community:
+            return
+        cls.objects.filter(community=community).update(
+            households_engaged=cls.count_households(community)
+        )
+
+    @classmethod
+    def record_action_rel_change(cls, action_rel, was_done, old_date_completed=None, is_done=None):
+        """
+        Updates the totals after action_rel was created or changed status.
+        was_done: whether action_rel counted as DONE before the change.
+        is_done: defaults to the current status; pass False for an action_rel about to be deleted.
+        """
+        if is_done is None:
+            is_done = action_rel.status == "DONE"
+        if not was_done and not is_done:
+            return
+
+        calculator_action = action_rel.action.calculator_action if action_rel.action else None
+        carbon = 0
+        if calculator_action:
+            if is_done:
+                carbon += AverageImpact(calculator_action, action_rel.date_completed)
+            if was_done:
+                carbon -= AverageImpact(calculator_action, old_date_completed)
+
+        community_ids = cls.communities_for_action_rel(
+            action_rel.user, action_rel.real_estate_unit
+        )
+        cls._add_to_totals(community_ids, actions=int(is_done) - int(was_done), carbon=carbon)
+
+    @classmethod
+    def record_member_change(cls, community, user, joined):
+        """
+        Updates the totals after user joined or left community.
+        Members only count towards communities that are not geographically focused.
+        """
+        if not community or community.is_geographically_focused:
+            return
+        sign = 1 if joined else -1
+        actions, carbon = cls.action_rels_totals(
+            UserActionRel.objects.filter(user=user, status="DONE", is_deleted=False)
+        )
+        cls._add_to_totals([community.id], actions=sign * actions, carbon=sign * carbon)
+        cls.refresh_households(community)
+
+    @classmethod
+    def record_household_actions(cls, household, removed=False):
+        """
+        The actions done in a household count towards the community the household is in.
+        Call with removed=False after a household was moved into its community, and with
+        removed=True before it is deleted or moved out of it.
+        """
+        action_rels = UserActionRel.objects.filter(
+            real_estate_unit=household, status="DONE", is_deleted=False
+        ).select_related("action__calculator_action", "user", "real_estate_unit__community")
+        for action_rel in action_rels:
+            if removed:
+                cls.record_action_rel_change(
+                    action_rel, True, action_rel.date_completed, is_done=False
+                )
+            else:
+                cls.record_action_rel_change(action_rel, False)
+
+    class TranslationMeta:
+        fields_to_translate = []
+
+    class Meta:
+        db_table = "community_impacts"
+
+
 class RealEstateUnit(models.Model):
     """
     A class used to represent a Real Estate Unit.
@@ -2098,14 +2381,42 @@ class Action(models.Model):
         # Adding this so that vendors will be preselected when creating/updating action.
         # List of vendors will typically not be that long, so this doesnt pose any problems
         data["vendors"] = [v.info() for v in self.vendors.all()]
-        data["action_users"] = (
-            len(UserActionRel.objects.filter(action=self, is_deleted=False)) or 0
-        )
+        data["action_users"] = getattr(self, "action_users_count", None)
+        if data["action_users"] is None:
+            data["action_users"] = UserActionRel.objects.filter(action=self, is_deleted=False).count()
 
         if self.user:
             data["user_email"] = self.user.email
         return data
 
+    @classmethod
+    def prefetch_for_json(cls, actions):
+        """
+        Loads what simple_json needs for a list of actions with a fixed number of queries,
+        instead of a few queries per action. serialize_all calls it.
+        """
+        actions = list(actions)
+        prefetch_related_objects(
+            actions,
+            "image__user_upload",
+            "community",
+            "user",
+            "calculator_action__category",
+            "calculator_action__sub_category__category",
+            "tags__tag_collection",
+            "vendors__logo",
+        )
+        counts = dict(
+            UserActionRel.objects.filter(action__in=actions, is_deleted=False)
+            .order_by()
+            .values_list("action")
+            .annotate(count=models.Count("id"))
+            .values_list("action", "count")
+        )
+        for action in actions:
+            action.action_users_count = counts.get(action.id, 0)
+        return actions
+
     def full_json(self):
         data = self.simple_json()
         data["is_global"] = self.is_global
@@ -2269,13 +2580,63 @@ class Event(models.Model):
             data["user_email"] = self.user.email
 
         data["shared_to"] = [c.info() for c in self.shared_to.all()]
-        data["is_on_home_page"] = self.is_on_homepage()
+        on_homepage = getattr(self, "on_homepage", None)
+        data["is_on_home_page"] = on_homepage if on_homepage is not None else self.is_on_homepage()
 
         data["event_type"] = self.event_type if self.event_type else "Online" if not self.location else "In-Person"
-        data["settings"] = dict(notifications=[x.simple_json() for x in self.nudge_settings.all().order_by("-created_at") if x.communities.exists()])
+        nudge_settings = getattr(self, "prefetched_nudge_settings", None)
+        if nudge_settings is None:
+            nudge_settings = [x for x in self.nudge_settings.all().order_by("-created_at") if x.communities.exists()]
+        data["settings"] = dict(notifications=[x.simple_json() for x in nudge_settings])
 
         return data
 
+    @classmethod
+    def prefetch_for_json(cls, events):
+        """
+        Loads what simple_json needs for a list of events with a fixed number of queries,
+        instead of a few queries per event. serialize_all calls it.
+        """
+        events = list(events)
+        prefetch_related_objects(
+            events,
+            "tags",
+            "image__user_upload",
+            "user",
+            "community__logo__user_upload",
+            "communities_under_publicity__logo__user_upload",
+            "shared_to__logo__user_upload",
+            Prefetch(
+                "nudge_settings",
+                queryset=EventNudgeSetting.objects.filter(communities__isnull=False).distinct()
+                .order_by("-created_at")
+                .prefetch_related(
+                    "communities__logo__user_upload",
+                    "communities__favicon__user_upload",
+                    Prefetch("communities__menu_set", queryset=Menu.objects.filter(is_published=True),
+                             to_attr="prefetched_menus"),
+                ),
+                to_attr="prefetched_nudge_settings",
+            ),
+        )
+
+        # is_on_homepage looks at the first home page settings of the event's community
+        community_ids = {event.community_id for event in events if event.community_id}
+        home_pages = {}
+        for home_page_id, community_id in (
+            HomePageSettings.objects.filter(community_id__in=community_ids).order_by("pk").values_list("id", "community_id")
+        ):
+            home_pages.setdefault(community_id, home_page_id)
+        featured = set(
+            HomePageSettings.featured_events.through.objects.filter(
+                homepagesettings_id__in=home_pages.values(),
+                event__start_date_and_time__gte=timezone.now(),
+            ).values_list("homepagesettings_id", "event_id")
+        )
+        for event in events:
+            event.on_homepage = (home_pages.get(event.community_id), event.id) in featured
+        return events
+
     def full_json(self):
         return self.simple_json()
 
@@ -2836,6 +3197,93 @@ class Data(models.Model):
         data["community"] = get_json_if_not_none(self.community)
         return data
 
+    @staticmethod
+    def community_for_action(action, household):
+        # for geographic communities, the community where the household is gets the credit
+        if action.community and action.community.is_geographically_focused:
+            return household.community if household else None
+        return action.community
+
+    @classmethod
+    def record_action_change(cls, action, household, delta):
+        """
+        Adds delta (+1 when an action is marked done in household, -1 when it no longer is) to the
+        community's total of each of the action's tags
+        """
+        # data corruption has been seen, and this routine is one possible culprit
+        if abs(delta) > 1:
+            # this is only used to increment or decrement values by one.  Something wrong here
+            raise Exception("Data totals: data corruption check 1: delta %d" % (delta))
+        cls.replay_action_changes([(action, household, delta)])
+
+    @classmethod
+    def replay_action_changes(cls, changes):
+        """
+        Applies many (action, household, delta) changes at once, e.g. for imports and backfills.
+        The deltas are summed per community and tag, and applied in one transaction with one
+        UPDATE ... SET value = value + delta per community and distinct delta. Nothing is written
+        if a total fails a corruption check.
+        """
+        totals = {}
+        communities = {}
+        tags = {}
+        for action, household, delta in changes:
+            community = cls.community_for_action(action, household)
+            if not community or not delta:
+                continue
+            communities[community.id] = community
+            for tag in action.tags.all():
+                tags[tag.id] = tag
+                key = (community.id, tag.id)
+                totals[key] = totals.get(key, 0) + delta
+
+        by_community = {}
+        for (community_id, tag_id), delta in totals.items():
+            if delta:
+                by_community.setdefault(community_id, {})[tag_id] = delta
+
+        with transaction.atomic():
+            for community_id, tag_deltas in by_community.items():
+                cls._apply_tag_deltas(communities[community_id], tag_deltas, tags)
+
+    @classmethod
+    def _apply_tag_deltas(cls, community, tag_deltas, tags):
+        # take note of community action goal, to avoid data corruption
+        actions_goal = 1000
+        if community.goal:
+            actions_goal = max(community.goal.target_number_of_actions, actions_goal)
+
+        # the first row (in Meta ordering) of each tag is the one that is kept up to date
+        existing = {}
+        for data_id, tag_id, value in (
+            cls.objects.select_for_update()
+            .filter(community=community, tag__in=list(tag_deltas))
+            .values_list("id", "tag_id", "value")
+        ):
+            existing.setdefault(tag_id, (data_id, value))
+
+        updates = {}
+        new_rows = []
+        for tag_id, delta in tag_deltas.items():
+            if tag_id in existing:
+                data_id, oldvalue = existing[tag_id]
+                if oldvalue > actions_goal:
+                    # oldvalue already too high
+                    raise Exception("Data totals: data corruption check 2: old value %d" % (oldvalue))
+                updates.setdefault(delta, []).append(data_id)
+            elif delta > 0:
+                # data for this community, action does not exist so create one
+                if delta > actions_goal:
+                    raise Exception("Data totals: data corruption check 4: d.value %d" % (delta))
+                tag = tags[tag_id]
+                new_rows.append(cls(value=delta, name=f"{tag.name}", community=community, tag=tag))
+
+        for delta, data_ids in updates.items():
+            # protect against going below 0
+            cls.objects.filter(pk__in=data_ids).update(value=Greatest(models.F("value") + delta, 0))
+        if new_rows:
+            cls.objects.bulk_create(new_rows)
+
     class Meta:
         verbose_name_plural = "Data"
         ordering = ("name", "value")
@@ -4041,6 +4489,15 @@ class FeatureFlag(models.Model):
     def info(self):
         return {"id": self.id, "name": self.name, "key": self.key,}
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        FeatureFlagResolver.invalidate()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        FeatureFlagResolver.invalidate()
+        return result
+
     def simple_json(self):
         res = model_to_dict(
             self,
@@ -4321,10 +4778,64 @@ class TranslationsCache(BaseModel):
     def full_json(self):
         return self.simple_json()
 
+    def save(self, *args, **kwargs):
+        from _main_.utils.translation.lru_cache import invalidate_translation_lrus
+
+        super().save(*args, **kwargs)
+        invalidate_translation_lrus()
+
+    def delete(self, *args, **kwargs):
+        from _main_.utils.translation.lru_cache import invalidate_translation_lrus
+
+        result = super().delete(*args, **kwargs)
+        invalidate_translation_lrus()
+        return result
+
     class Meta:
         db_table = "translations_cache"
 
 
+class TranslatedContentFingerprint(models.Model):
+    """
+    A class used to remember which version of a record's translatable content has
+    already been translated into a language, so the translation job only sends new
+    or edited records to the translator.
+
+    Attributes
+    ----------
+    model_name : str
+      app label and model name of the record, eg. "database.action"
+    record_id : str
+      primary key of the record
+    language_code : str
+      the language the content was translated into
+    fingerprint : str
+      hash of the record's TranslationMeta.fields_to_translate values
+    translated_at : DateTime
+      start of the translation run that translated this version
+    """
+
+    id = models.AutoField(primary_key=True)
+    model_name = models.CharField(max_length=SHORT_STR_LEN)
+    record_id = models.CharField(max_length=SHORT_STR_LEN)
+    language_code = models.CharField(max_length=LANG_CODE_STR_LEN)
+    fingerprint = models.CharField(max_length=SHORT_STR_LEN)
+    translated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.model_name}:{self.record_id} ({self.language_code})"
+
+    def simple_json(self):
+        return model_to_dict(self)
+
+    def full_json(self):
+        return self.simple_json()
+
+    class Meta:
+        db_table = "translated_content_fingerprints"
+        unique_together = [["model_name", "record_id", "language_code"]]
+
+
 class ManualCommunityTranslation(TranslationsCache):
     """
     A class used to represent the manual translations done by the community
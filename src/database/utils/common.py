@@ -6,6 +6,8 @@ from ast import Lambda
 import base64
 import hashlib
 import json
+import tempfile
+from PIL import Image
 from django.core import serializers
 from django.forms.models import model_to_dict
 from collections.abc import Iterable
@@ -193,17 +195,75 @@ def make_hash_from_file(file_data):
   hash_object.update(file_data)
   return hash_object.hexdigest()
 
+HASH_CHUNK_SIZE = 1024 * 1024  # bytes
+# images up to this size are kept in memory for the perceptual hash, bigger ones go to a temporary file
+PERCEPTUAL_SPOOL_SIZE = 8 * 1024 * 1024  # bytes
+PERCEPTUAL_HASH_SIZE = 8  # the hash has PERCEPTUAL_HASH_SIZE ** 2 bits
+
+
+def make_perceptual_hash(image_file):
+  """
+    Given an image file, it
+    Returns:
+    A difference hash (dHash) of the image as a hex string. Resized or re-encoded
+    copies of an image get the same hash, or one that differs in a few bits.
+    None if the file is not an image.
+  """
+  try:
+    with Image.open(image_file) as image:
+      pixels = list(
+        image.convert("L")
+        .resize((PERCEPTUAL_HASH_SIZE + 1, PERCEPTUAL_HASH_SIZE), Image.Resampling.LANCZOS)
+        .getdata()
+      )
+  except Exception:
+    return None
+
+  bits = 0
+  width = PERCEPTUAL_HASH_SIZE + 1
+  for row in range(PERCEPTUAL_HASH_SIZE):
+    for col in range(PERCEPTUAL_HASH_SIZE):
+      bits = (bits << 1) | (pixels[row * width + col] > pixels[row * width + col + 1])
+  return format(bits, "0%dx" % (PERCEPTUAL_HASH_SIZE ** 2 // 4))
+
+
+def hash_bucket_item(key, bucket=AWS_STORAGE_BUCKET_NAME, client=None, perceptual=False):
+  """
+    Streams an object from the bucket, in HASH_CHUNK_SIZE chunks.
+    Returns:
+    (sha256 hash, perceptual hash or None); (None, None) if the object can't be read
+  """
+  client = client or s3
+  try:
+    body = client.get_object(Bucket=bucket, Key=key)["Body"]
+    hash_object = hashlib.sha256()
+    size = 0
+    with tempfile.SpooledTemporaryFile(max_size=PERCEPTUAL_SPOOL_SIZE) as copy:
+      while True:
+        chunk = body.read(HASH_CHUNK_SIZE)
+        if not chunk:
+          break
+        size += len(chunk)
+        hash_object.update(chunk)
+        if perceptual:
+          copy.write(chunk)
+      if not size:
+        return None, None
+
+      perceptual_hash = None
+      if perceptual:
+        copy.seek(0)
+        perceptual_hash = make_perceptual_hash(copy)
+      return hash_object.hexdigest(), perceptual_hash
+  except Exception as e:
+    log.error(f"Error calculating hash for {key}: {e}")
+    return None, None
+
+
 s3 = boto3.client("s3", region_name=AWS_S3_REGION_NAME)
-def calculate_hash_for_bucket_item(key, bucket=AWS_STORAGE_BUCKET_NAME):
-    try:
-        response = s3.get_object(Bucket=bucket, Key=key)
-        image_data = response["Body"].read()
-        return make_hash_from_file(image_data)
-    except Exception as e:
-        print("........................................")
-        print(f"Error calculating hash for {key}: {e}")
-        print("........................................")
-        return None
+def calculate_hash_for_bucket_item(key, bucket=AWS_STORAGE_BUCKET_NAME, client=None):
+    hash, _ = hash_bucket_item(key, bucket=bucket, client=client)
+    return hash
     
 def get_image_size_from_bucket(key,bucket=AWS_STORAGE_BUCKET_NAME): 
   try:
@@ -11,4 +11,5 @@ REMOVE_DUPLICATE_IMAGES = 'Remove Duplicate Images'
 TRANSLATE_DB_CONTENTS = 'Translate Database Contents'
 COMMUNITY_ADMIN_TESTIMONIAL_NUDGE = 'Community Admin Testimonial Nudge'
 POSTMARK_NUDGE_REPORT = 'Postmark Nudge Report'
-SEND_SCHEDULED_EMAIL = 'Send Scheduled Email'
\ No newline at end of file
+SEND_SCHEDULED_EMAIL = 'Send Scheduled Email'
+REBUILD_COMMUNITY_IMPACT = 'Rebuild Community Impact'
\ No newline at end of file
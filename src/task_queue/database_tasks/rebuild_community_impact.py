@@ -0,0 +1,24 @@
+import traceback
+
+from _main_.utils.massenergize_logger import log
+from database.models import Community, CommunityImpact
+
+
+def rebuild_community_impact(task=None):
+    """
+    Recomputes the maintained impact totals (households, actions completed and carbon reduction)
+    of every community from scratch. The totals are kept up to date incrementally as actions are
+    completed or removed; this job corrects any drift, e.g. from imports or deleted users.
+    """
+    try:
+        rebuilt = 0
+        for community in Community.objects.filter(is_deleted=False):
+            CommunityImpact.rebuild(community)
+            rebuilt += 1
+
+        return {"rebuilt": rebuilt}, None
+
+    except Exception as e:
+        stack_trace = traceback.format_exc()
+        log.error(f"Community impact rebuild exception: {stack_trace}")
+        return None, stack_trace
@@ -3,11 +3,13 @@
 import traceback
 from typing import Tuple
 from _main_.utils.constants import AudienceType, SubAudienceType
-from _main_.utils.emailer.send_email import send_massenergize_email_with_attachments
+from _main_.utils.emailer.broadcast import FAILED, send_broadcast_email
 from api.utils.api_utils import is_null
 from api.utils.constants import BROADCAST_EMAIL_TEMPLATE
 from database.models import Message, UserActionRel, UserProfile, Community, CommunityAdminGroup, CommunityMember
 from _main_.utils.massenergize_logger import log
+from task_queue.models import TaskRun
+from task_queue.type_constants import TaskStatus
 
 ALL = "all"
 
@@ -80,8 +82,47 @@ def get_message_recipients(audience, audience_type, community_ids,sub_audience_t
         return None, stacktrace
 
 
-        
-def schedule_admin_messages(task):
+
+def get_task_runs(task):
+    # tasks can also be run by hand, without being saved
+    runs = getattr(task, "runs", None)
+    return runs.all() if runs is not None else TaskRun.objects.none()
+
+
+def get_revision(message):
+    return (message.schedule_info or {}).get("revision")
+
+
+def get_delivered_recipients(task, revision=None, current_run=None):
+    """
+    The recipients earlier runs of the task already sent this revision of the message to, so running it again
+    only sends it to the others. Runs that never finished count too: a worker that died mid-broadcast leaves
+    its run RUNNING. Editing the message gives it a new revision, which is sent to everyone again.
+    """
+    delivered = set()
+    runs = get_task_runs(task)
+    if current_run:
+        runs = runs.exclude(pk=current_run.pk)
+    for result in runs.values_list("result", flat=True):
+        if isinstance(result, dict) and result.get("revision") == revision:
+            for batch in result.get("batches", []):
+                delivered.update(batch.get("sent", []))
+    return delivered
+
+
+def summarize_delivery(message, recipients, skipped, batches):
+    return {
+        "message": message.id,
+        "revision": get_revision(message),
+        "recipients": len(recipients),
+        "skipped": len(skipped),
+        "sent": sum(len(batch["sent"]) for batch in batches),
+        "failed": sum(len(batch["failed"]) for batch in batches),
+        "batches": sorted(batches, key=lambda batch: batch["batch"]),
+    }
+
+
+def schedule_admin_messages(task, transport=None):
     try:
     
         message = Message.objects.get(id=task.name)
@@ -98,11 +139,26 @@ def schedule_admin_messages(task):
         if err:
             return None, err
 
+        # record each batch on the run as it is done, so a run that stops halfway still knows what it sent
+        run = get_task_runs(task).filter(status=TaskStatus.RUNNING.value).first()
+        delivered = get_delivered_recipients(task, get_revision(message), current_run=run)
+        skipped = [email for email in recipients if email in delivered]
+        recipients = [email for email in recipients if email not in delivered]
+        batches = []
+
+        def record_batch(outcome):
+            batches.append(outcome)
+            if run:
+                TaskRun.objects.filter(pk=run.pk).update(result=summarize_delivery(message, recipients, skipped, batches))
+
         data = {"body": message.body, "subject": message.title, "image": logo}
-        is_sent, err = send_massenergize_email_with_attachments(BROADCAST_EMAIL_TEMPLATE, data, recipients, None, None)
-        if err:
-            return None, err
-        return is_sent, None
+        send_broadcast_email(BROADCAST_EMAIL_TEMPLATE, data, recipients, transport=transport, on_batch=record_batch)
+
+        result = summarize_delivery(message, recipients, skipped, batches)
+        failed_batches = [batch for batch in batches if batch["status"] == FAILED]
+        if failed_batches:
+            return None, f"{len(failed_batches)} of {len(batches)} batches could not be sent: {failed_batches[0]['error']}"
+        return result, None
         
     except Exception as e:
       stacktrace = traceback.format_exc()
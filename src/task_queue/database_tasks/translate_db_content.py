@@ -1,3 +1,6 @@
+import json
+from datetime import timedelta
+
 from django.apps import apps
 from django.utils import timezone
 
@@ -5,10 +8,18 @@ from _main_.utils.constants import DEFAULT_SOURCE_LANGUAGE_CODE
 from _main_.utils.massenergize_logger import log
 from _main_.utils.metrics import timed
 from _main_.utils.translation import JsonTranslator
-from _main_.utils.utils import create_list_of_all_records_to_translate, to_third_party_lang_code
-from database.models import SupportedLanguage
+from _main_.utils.utils import create_list_of_all_records_to_translate, filter_active_records, make_hash, \
+	split_list_into_sublists, to_third_party_lang_code
+from database.models import SupportedLanguage, TranslatedContentFingerprint
 
 SOURCE_LANGUAGE_CODE = 'en'
+TRANSLATION_CHUNK_SIZE = 200  # records sent to the translator at once
+FINGERPRINT_LOOKUP_CHUNK_SIZE = 1000
+FULL_SCAN_INTERVAL = timedelta(days=7)
+# fingerprint rows that record when all of a model's records were last translated into a language,
+# and when that was last checked by comparing every record
+MODEL_WATERMARK_RECORD_ID = "*"
+FULL_SCAN_RECORD_ID = "*full"
 
 
 class TranslationError(Exception):
@@ -48,12 +59,138 @@ class TranslateDBContents:
 			log.exception(e)
 			return False
 	
+	def get_translatable_models(self):
+		models = []
+		for model in apps.get_models():
+			translation_meta = getattr(model, "TranslationMeta", None)
+			fields = getattr(translation_meta, "fields_to_translate", None) if translation_meta else None
+			if fields:
+				models.append((model, fields))
+		return models
+
+	@staticmethod
+	def make_fingerprint(record: dict):
+		return make_hash(json.dumps(record, sort_keys=True, default=str))
+
+	def get_watermarks(self, model_name, language):
+		return dict(
+			TranslatedContentFingerprint.objects.filter(
+				model_name=model_name,
+				language_code=language,
+				record_id__in=[MODEL_WATERMARK_RECORD_ID, FULL_SCAN_RECORD_ID],
+			).values_list("record_id", "translated_at")
+		)
+
+	def find_changed_records(self, model, fields, language, now=None):
+		"""
+		Returns (record_id, record, fingerprint) for the active records of a model whose translatable
+		content has not been translated into the language yet, in this version, and whether every
+		record was compared.
+		"""
+		model_name = model._meta.label_lower
+		records = filter_active_records(model)
+
+		# rows untouched since the last complete run can be skipped without hashing them, when the model
+		# tracks edits. Every so often all rows are compared, for edits made with queryset.update()
+		watermarks = self.get_watermarks(model_name, language)
+		watermark, last_full_scan = watermarks.get(MODEL_WATERMARK_RECORD_ID), watermarks.get(FULL_SCAN_RECORD_ID)
+		now = now or timezone.now()
+		full_scan = not (
+			watermark and last_full_scan
+			and now - last_full_scan < FULL_SCAN_INTERVAL
+			and any(f.name == "updated_at" for f in model._meta.get_fields())
+		)
+		if not full_scan:
+			records = records.filter(updated_at__gte=watermark)
+
+		candidates = []
+		for row in records.values("pk", *fields).iterator():
+			record_id = str(row.pop("pk"))
+			candidates.append((record_id, row, self.make_fingerprint(row)))
+
+		stored = {}
+		for chunk in split_list_into_sublists(candidates, FINGERPRINT_LOOKUP_CHUNK_SIZE):
+			stored.update(
+				TranslatedContentFingerprint.objects.filter(
+					model_name=model_name, language_code=language, record_id__in=[record_id for record_id, _, _ in chunk]
+				).values_list("record_id", "fingerprint")
+			)
+
+		changed = [(record_id, row, fingerprint) for record_id, row, fingerprint in candidates if stored.get(record_id) != fingerprint]
+		return changed, full_scan
+
+	def save_fingerprints(self, model_name, language, fingerprints, translated_at):
+		TranslatedContentFingerprint.objects.bulk_create(
+			[
+				TranslatedContentFingerprint(
+					model_name=model_name,
+					record_id=record_id,
+					language_code=language,
+					fingerprint=fingerprint,
+					translated_at=translated_at,
+				)
+				for record_id, fingerprint in fingerprints
+			],
+			update_conflicts=True,
+			unique_fields=["model_name", "record_id", "language_code"],
+			update_fields=["fingerprint", "translated_at"],
+		)
+
+	def translate_records(self, records, language) -> bool:
+		"""
+		Translates the records and saves the new translations to the TranslationsCache before returning,
+		so that fingerprints are only saved for records whose translations are stored.
+		"""
+		translator = self.translator({"data": records})
+		_, translated_texts, texts = translator.translate(DEFAULT_SOURCE_LANGUAGE_CODE, language, cache=False)
+		if not texts:
+			return True
+		return translator.save_translations_to_cache(texts, translated_texts, language, DEFAULT_SOURCE_LANGUAGE_CODE)
+
+	def translate_changed_db_contents(self) -> bool:
+		"""
+		Translates only the records created or edited since they were last translated into each
+		supported language, sending them to the translator in chunks.
+		"""
+		try:
+			run_started_at = timezone.now()
+			models = self.get_translatable_models()
+
+			for lang in self.get_supported_languages():
+				translated_count = 0
+				for model, fields in models:
+					model_name = model._meta.label_lower
+					changed, full_scan = self.find_changed_records(model, fields, lang, now=run_started_at)
+
+					complete = True
+					for chunk in split_list_into_sublists(changed, TRANSLATION_CHUNK_SIZE):
+						if not self.translate_records([record for _, record, _ in chunk], lang):
+							log.error(f"Task: Could not cache translations of {model_name} to {lang}, they will be retried on the next run")
+							complete = False
+							continue
+						self.save_fingerprints(model_name, lang, [(record_id, fingerprint) for record_id, _, fingerprint in chunk], run_started_at)
+						translated_count += len(chunk)
+
+					if not complete:
+						continue
+					# the model is fully translated as of the start of this run
+					watermarks = [(MODEL_WATERMARK_RECORD_ID, "")] + ([(FULL_SCAN_RECORD_ID, "")] if full_scan else [])
+					self.save_fingerprints(model_name, lang, watermarks, run_started_at)
+
+				log.info(f"Task: Translated {translated_count} new or edited records to {lang}")
+
+			log.info("Task: Finished translating changed DB contents")
+			return True
+		except Exception as e:
+			log.exception(e)
+			return False
+
 	@timed
 	def start_translations(self, task=None) -> bool:
 		try:
 			start_time = timezone.now()
 			log.info("Starting translation process for {}".format(start_time))
-			self.load_db_contents_and_translate()
+			self.translate_changed_db_contents()
 			return True
 		except Exception as e:
 			log.exception(e)
@@ -1,5 +1,6 @@
 from task_queue.database_tasks.contents_spacing_correction import process_spacing_data
 from task_queue.database_tasks.media_library_cleanup import remove_duplicate_images
+from task_queue.database_tasks.rebuild_community_impact import rebuild_community_impact
 from task_queue.database_tasks.shedule_admin_messages import schedule_admin_messages
 from task_queue.database_tasks.translate_db_content import TranslateDBContents
 from task_queue.database_tasks.update_actions_content import update_actions_content
@@ -13,7 +14,8 @@ from .constants import (
   SEND_SCHEDULED_EMAIL, TEST, SUPER_ADMIN_NUDGE, COMMUNITY_ADMIN_NUDGE, ADMIN_MOU_NOTIFIER,
     USER_EVENT_NUDGE, CREATE_COMMUNITY_SNAPSHOTS, POSTMARK_SENDER_SIGNATURE,
     PROCESS_CONTENT_SPACING, UPDATE_ACTION_CONTENT, REMOVE_DUPLICATE_IMAGES,
-    TRANSLATE_DB_CONTENTS, COMMUNITY_ADMIN_TESTIMONIAL_NUDGE, POSTMARK_NUDGE_REPORT
+    TRANSLATE_DB_CONTENTS, COMMUNITY_ADMIN_TESTIMONIAL_NUDGE, POSTMARK_NUDGE_REPORT,
+    REBUILD_COMMUNITY_IMPACT
 )
 
 """
@@ -57,5 +59,6 @@ FUNCTIONS = {
     REMOVE_DUPLICATE_IMAGES: remove_duplicate_images,
     TRANSLATE_DB_CONTENTS: TranslateDBContents().start_translations,
     COMMUNITY_ADMIN_TESTIMONIAL_NUDGE: prepare_testimonials_for_community_admins,
-    POSTMARK_NUDGE_REPORT: generate_postmark_nudge_report
+    POSTMARK_NUDGE_REPORT: generate_postmark_nudge_report,
+    REBUILD_COMMUNITY_IMPACT: rebuild_community_impact,
 }
\ No newline at end of file
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from task_queue.views import create_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Create community snapshots, or with --dry-run report how long each stage takes without saving them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Compute the snapshots without saving them')
+
+    def handle(self, *args, **options):
+        result, error = create_snapshots(dry_run=options['dry_run'])
+        if error:
+            raise CommandError(error)
+        if options['dry_run']:
+            self.stdout.write(f"{result['snapshots']} snapshots")
+            for stage, seconds in result['timings'].items():
+                self.stdout.write(f"{stage}: {seconds}s")
@@ -231,7 +231,8 @@ class TaskRun(models.Model):
         self.completed_at = timezone.now()
         self.status = TaskStatus.FAILED.value
         self.error_message = error_message
-        self.save()
+        # keeps any result the task recorded while it ran
+        self.save(update_fields=["completed_at", "status", "error_message"])
         if IS_PROD:
             task_name = self.task.name
             message =  f'Task: {task_name}, Status: {self.status}, Info: {error_message}'
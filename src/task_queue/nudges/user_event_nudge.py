@@ -9,7 +9,7 @@ from _main_.utils.footage.spy import Spy
 from api.utils.api_utils import generate_email_tag, get_sender_email
 from api.utils.constants import USER_EVENTS_NUDGE_TEMPLATE
 from database.models import Community, CommunityMember, CommunityNotificationSetting, Event, UserProfile, FeatureFlag, EventNudgeSetting
-from django.db.models import Q
+from django.db.models import Prefetch, Q
 from dateutil.relativedelta import relativedelta
 from database.utils.common import get_json_if_not_none
 from datetime import timedelta
@@ -84,7 +84,12 @@ def update_last_notification_dates(email):
 def is_event_eligible(event, community_id, task=None):
     try:
         now = timezone.now().date()
-        settings = event.nudge_settings.filter(communities__id=community_id).first()
+        # get_community_events prefetches the settings for the community
+        community_settings = getattr(event, "community_nudge_settings", None)
+        if community_settings is None:
+            settings = event.nudge_settings.filter(communities__id=community_id).first()
+        else:
+            settings = community_settings[0] if community_settings else None
         
         if not settings:
             settings = EventNudgeSetting(event=event, **DEFAULT_EVENT_SETTINGS)
@@ -133,7 +138,14 @@ def get_community_events(community_id, task=None):
         start_date_and_time__gte=timezone.now(),
     ).distinct().order_by("start_date_and_time")
     if task:
-        eligible_event_ids = [event.id for event in events if is_event_eligible(event, community_id, task)]
+        settings = Prefetch(
+            "nudge_settings",
+            queryset=EventNudgeSetting.objects.filter(communities__id=community_id).order_by("pk"),
+            to_attr="community_nudge_settings",
+        )
+        eligible_event_ids = [
+            event.id for event in events.prefetch_related(settings) if is_event_eligible(event, community_id, task)
+        ]
         events = events.filter(id__in=eligible_event_ids)
 
     return events
@@ -1,4 +1,5 @@
 import csv
+import time
 import traceback
 from django.http import HttpResponse
 from _main_.utils.common import parse_datetime_to_aware
@@ -10,15 +11,16 @@ from api.utils.constants import (
     SADMIN_EMAIL_TEMPLATE,
     YEARLY_MOU_TEMPLATE,
 )
-from api.constants import STANDARD_USER, GUEST_USER
+from api.constants import GUEST_USER
 from database.models import FeatureFlag, UserProfile, UserActionRel, Community, CommunityAdminGroup, CommunityMember, Event, RealEstateUnit, Team, Testimonial, Vendor, PolicyConstants, PolicyAcceptanceRecords, CommunitySnapshot, Goal, Action
 from django.utils import timezone
 import datetime
 from django.utils.timezone import utc
-from django.db.models import Count
+from django.db.models import Count, F, OuterRef, Subquery
 from django.db.models import Q
 from django.core.exceptions import ObjectDoesNotExist
-from carbon_calculator.carbonCalculator import AverageImpact
+from carbon_calculator.carbonCalculator import AverageImpacts
+from carbon_calculator.models import Action as CCAction
 from _main_.utils.massenergize_logger import log
 
 
@@ -234,10 +236,8 @@ def send_nudge(file, file_name, email_list, temp_id, t_model):
 
 
 def _get_external_reported_info(community):
-    if not community.goal:
-        community.goal = Goal()
+    goal = community.goal or Goal()
 
-    goal = community.goal
     households_manual_addition = int(goal.initial_number_of_households)
     households_partner = int(goal.attained_number_of_households)
 
@@ -249,152 +249,192 @@ def _get_external_reported_info(community):
 
     return households_manual_addition, households_partner, carbon_manual_addition, carbon_partner, actions_manual_addition, actions_partner
 
-def _get_user_reported_info(community, users):
 
-    if community.is_geographically_focused:
-        households_count = RealEstateUnit.objects.filter(
-            is_deleted=False, community=community
-        ).count()
-        done_action_rels = UserActionRel.objects.filter(
-            real_estate_unit__community=community, is_deleted=False, status="DONE"
-        ).select_related("action__calculator_action")
-    else:
-        households_count = sum([user.real_estate_units.count() for user in users])
-        done_action_rels = UserActionRel.objects.filter(
-            user__in=users, is_deleted=False, status="DONE"
-        ).select_related("action__calculator_action")
-
-    carbon_user_reported = sum(
-        [
-            AverageImpact(action_rel.action.calculator_action, action_rel.date_completed)
-            if action_rel.action.calculator_action
-            else 0
-            for action_rel in done_action_rels
-        ]
-    )
-    actions_user_reported = done_action_rels.count()
-
-    return carbon_user_reported, actions_user_reported, households_count
-
-def _event_info_helper(events):
-    counter = 0
-    for elem in events:
-        if elem["shared_to"] != None:
-            counter +=1
-
-    return counter
-
-
-def _get_event_info(community):
-
-    all_events = Event.objects.filter(Q(is_deleted=False, community = community) | Q(is_global=True)) #filter out is_demo communities?
+def _count_by(queryset, group_by, **counts):
+    """
+    {value of group_by: {name: count}} for a queryset, in one grouped query
+    """
+    return {row.pop(group_by): row for row in queryset.order_by().values(group_by).annotate(**counts)}
 
-    events_hosted_current = all_events.filter( end_date_and_time__gte = today).values("name", "shared_to") #is_published = True?
-    events_hosted_past = all_events.filter( end_date_and_time__lte = today).values("name", "shared_to") #is published?
-    my_events_shared_current = 0 if len(events_hosted_current) == 0 else _event_info_helper(events_hosted_current)
-    my_events_shared_past = 0 if len(events_hosted_past) == 0 else _event_info_helper(events_hosted_past)
 
+def _get_member_counts():
+    members = CommunityMember.objects.filter(is_deleted=False)
+    return _count_by(
+        members, "community",
+        member_count=Count("id", distinct=True),
+        guest_count=Count("id", distinct=True, filter=Q(user__user_info__user_type=GUEST_USER)),
+        # every household of every member, for communities that are not geographically focused
+        member_households=Count("user__real_estate_units"),
+    )
 
-    events_borrowed_past = community.events_from_others.filter(end_date_and_time__lte = today)
-    events_borrowed_current = community.events_from_others.filter(end_date_and_time__gte = today)
 
-    return events_hosted_current.count(), events_hosted_past.count(), my_events_shared_current, my_events_shared_past, len(events_borrowed_current), len(events_borrowed_past)
+def _get_primary_community_users_count():
+    # a user's primary community is the community of their first household
+    links = UserProfile.real_estate_units.through.objects
+    first_unit = links.filter(userprofile_id=OuterRef("userprofile_id")).order_by("realestateunit_id").values("realestateunit_id")[:1]
+    primary = links.filter(userprofile__is_deleted=False, realestateunit_id=Subquery(first_unit))
+    return {
+        community_id: counts["users"] for community_id, counts in
+        _count_by(primary, "realestateunit__community", users=Count("id")).items()
+    }
 
 
-def _get_guest_count(users):
-    guest_count = 0
-    for user in users:
-        is_guest = False
-        if user.user_info:
-            is_guest = (user.user_info.get("user_type", STANDARD_USER) == GUEST_USER)
-            if is_guest:
-                guest_count +=1
-    return guest_count
+def _get_content_counts():
+    return {
+        "teams": _count_by(
+            Team.objects.filter(is_deleted=False, is_published=True), "primary_community",
+            teams_count=Count("id"), subteams_count=Count("id", filter=Q(parent__isnull=False)),
+        ),
+        "testimonials": _count_by(
+            Testimonial.objects.filter(is_deleted=False, is_published=True), "community", testimonials_count=Count("id")
+        ),
+        "vendors": _count_by(
+            Vendor.objects.filter(is_deleted=False, is_published=True), "communities", service_providers_count=Count("id")
+        ),
+        "actions_live_count": Action.objects.filter(is_deleted=False, is_published=True).count(),
+        "households": _count_by(RealEstateUnit.objects.filter(is_deleted=False), "community", households=Count("id")),
+    }
 
-def _create_community_timestamp(community, prim_dict):
 
-    community_members = CommunityMember.objects.filter(is_deleted=False, community=community).select_related("user")
-    users = [cm.user for cm in community_members]
-    guest_count = _get_guest_count(users)
+def _get_user_reported_actions():
+    """
+    {community id: (carbon, actions)} of completed actions: those of the community's households if it is
+    geographically focused, otherwise those of its members
+    """
+    done = UserActionRel.objects.filter(is_deleted=False, status="DONE").order_by()
+    groups = [
+        *done.filter(real_estate_unit__community__is_geographically_focused=True)
+        .values(community=F("real_estate_unit__community"), calculator_action=F("action__calculator_action"), date=F("date_completed"))
+        .annotate(count=Count("id")),
+        # a member's actions count once per community, however many memberships they have in it
+        *done.filter(user__communitymember__is_deleted=False, user__communitymember__community__is_geographically_focused=False)
+        .values(community=F("user__communitymember__community"), calculator_action=F("action__calculator_action"), date=F("date_completed"))
+        .annotate(count=Count("id", distinct=True)),
+    ]
+
+    # the average impact only depends on the calculator action and completion date
+    calculator_actions = CCAction.objects.in_bulk({group["calculator_action"] for group in groups if group["calculator_action"]})
+    impact_keys = list({(group["calculator_action"], group["date"]) for group in groups if group["calculator_action"]})
+    impacts = dict(zip(impact_keys, AverageImpacts([(calculator_actions[action_id], date) for action_id, date in impact_keys])))
+
+    reported = {}
+    for group in groups:
+        carbon, actions = reported.get(group["community"], (0, 0))
+        impact = impacts.get((group["calculator_action"], group["date"]), 0)
+        reported[group["community"]] = (carbon + group["count"] * impact, actions + group["count"])
+    return reported
+
+
+def _get_event_counts(now):
+    current, past = Q(end_date_and_time__gte=now), Q(end_date_and_time__lte=now)
+    # there is a row per event and community it is shared to, or a single row if it isn't shared
+    counts = dict(
+        events_hosted_current=Count("pk", filter=current),
+        events_hosted_past=Count("pk", filter=past),
+        my_events_shared_current=Count("shared_to", filter=current),
+        my_events_shared_past=Count("shared_to", filter=past),
+    )
+    # global events are counted for every community
+    global_events = Event.objects.filter(is_global=True).order_by().aggregate(**counts)
+    hosted = _count_by(Event.objects.filter(is_deleted=False, is_global=False), "community", **counts)
+
+    shares = Event.shared_to.through.objects.all()
+    borrowed = _count_by(
+        shares, "community",
+        events_borrowed_from_others_current=Count("id", filter=Q(event__end_date_and_time__gte=now)),
+        events_borrowed_from_others_past=Count("id", filter=Q(event__end_date_and_time__lte=now)),
+    )
+    return global_events, hosted, borrowed
 
-    primary_community_users_count = prim_dict.get(community, 0)
 
-    teams = Team.objects.filter(is_deleted=False, primary_community=community, is_published = True)
-    sub_teams = teams.filter( parent__isnull=False)
+def _create_community_snapshot(community, stats):
+    counts = stats["members"].get(community.id, {})
+    content = stats["content"]
 
-    testimonials_count = str(
-        Testimonial.objects.filter(is_deleted=False, community=community, is_published = True).count()
-    )
-    
-    service_providers_count = Vendor.objects.filter(is_deleted= False, communities = community, is_published = True).count()
-    actions_live_count = Action.objects.filter(is_deleted= False, is_published=True).count()
-    
     households_manual_addition, households_partner, carbon_manual_addition, carbon_partner, actions_manual_addition, actions_partner = _get_external_reported_info(community)
 
-    carbon_user_reported, actions_user_reported, households_user_reported = _get_user_reported_info(community, users)
-
-    households_total = households_user_reported + households_manual_addition + households_partner
-    actions_total = actions_user_reported + actions_manual_addition + actions_partner
-    carbon_total = carbon_user_reported + carbon_manual_addition + carbon_partner
+    if community.is_geographically_focused:
+        households_user_reported = content["households"].get(community.id, {}).get("households", 0)
+    else:
+        households_user_reported = counts.get("member_households", 0)
+    carbon_user_reported, actions_user_reported = stats["actions"].get(community.id, (0, 0))
 
-    events_hosted_current, events_hosted_past, my_events_shared_current, my_events_shared_past, events_borrowed_from_others_current, events_borrowed_from_others_past = _get_event_info(community)
-    
-    
-    snapshot = CommunitySnapshot( 
-        community = community, 
+    global_events, hosted, borrowed = stats["events"]
+    events = {
+        name: global_events[name] + hosted.get(community.id, {}).get(name, 0) for name in global_events
+    }
+    events.update({
+        "events_borrowed_from_others_current": 0,
+        "events_borrowed_from_others_past": 0,
+        **borrowed.get(community.id, {}),
+    })
+
+    return CommunitySnapshot(
+        community = community,
         is_live = community.is_published,
-        households_total = households_total,
+        households_total = households_user_reported + households_manual_addition + households_partner,
         households_user_reported = households_user_reported,
         households_manual_addition = households_manual_addition,
         households_partner = households_partner,
-        primary_community_users_count = primary_community_users_count, 
-        member_count = community_members.count(), 
-        actions_live_count = actions_live_count,
-        actions_total = actions_total,
+        primary_community_users_count = stats["primary"].get(community.id, 0),
+        member_count = counts.get("member_count", 0),
+        actions_live_count = content["actions_live_count"],
+        actions_total = actions_user_reported + actions_manual_addition + actions_partner,
         actions_partner = actions_partner,
         actions_user_reported = actions_user_reported,
-        carbon_total = carbon_total,
+        carbon_total = carbon_user_reported + carbon_manual_addition + carbon_partner,
         carbon_user_reported = carbon_user_reported,
         carbon_manual_addition = carbon_manual_addition,
         carbon_partner = carbon_partner,
-        guest_count = guest_count,
+        guest_count = counts.get("guest_count", 0),
         actions_manual_addition = actions_manual_addition,
-        
-        events_hosted_current = events_hosted_current, 
-        events_hosted_past = events_hosted_past,
-        my_events_shared_current = my_events_shared_current, 
-        my_events_shared_past = my_events_shared_past, 
-        events_borrowed_from_others_current = events_borrowed_from_others_current, 
-        events_borrowed_from_others_past = events_borrowed_from_others_past,
-
-        teams_count = teams.count(),
-        subteams_count= sub_teams.count(),
-        testimonials_count = testimonials_count,
-        service_providers_count = service_providers_count,
-        )
-
-    snapshot.save()
+        teams_count = content["teams"].get(community.id, {}).get("teams_count", 0),
+        subteams_count = content["teams"].get(community.id, {}).get("subteams_count", 0),
+        testimonials_count = content["testimonials"].get(community.id, {}).get("testimonials_count", 0),
+        service_providers_count = content["vendors"].get(community.id, {}).get("service_providers_count", 0),
+        **events,
+    )
 
 
-def create_snapshots(task=None):
+def create_snapshots(task=None, dry_run=False):
+    """
+    Saves a CommunitySnapshot for every community. Each stage is a few grouped queries over all
+    communities, so the number of queries does not depend on the number of communities or users.
+    With dry_run, nothing is saved and the time each stage took is returned instead.
+    """
     try:
-        communities = Community.objects.filter(is_deleted=False) #is_published, is_demo =False
-        users = UserProfile.objects.filter(is_deleted=False)
-        primary_reu_dict = dict()
-        for user in users:
-            primary_reu =  user.real_estate_units.first()
-            if primary_reu and primary_reu.community:
-                primary_reu_dict[primary_reu.community] = primary_reu_dict.get(primary_reu.community, 0) + 1
+        timings = {}
+
+        def timed(stage, compute, *args):
+            start = time.perf_counter()
+            result = compute(*args)
+            timings[stage] = round(time.perf_counter() - start, 3)
+            return result
+
+        now = parse_datetime_to_aware()
+        stats = {
+            "members": timed("members", _get_member_counts),
+            "primary": timed("primary", _get_primary_community_users_count),
+            "content": timed("content", _get_content_counts),
+            "actions": timed("actions", _get_user_reported_actions),
+            "events": timed("events", _get_event_counts, now),
+        }
+        communities = Community.objects.filter(is_deleted=False).select_related("goal") #is_published, is_demo =False
+        snapshots = timed("snapshots", lambda: [_create_community_snapshot(community, stats) for community in communities])
 
-        for comm in communities:
-            _create_community_timestamp(comm, primary_reu_dict)
+        if dry_run:
+            log.info(f"Community snapshot dry run: {len(snapshots)} snapshots, timings {timings}")
+            return {"snapshots": len(snapshots), "timings": timings}, None
+
+        timed("save", CommunitySnapshot.objects.bulk_create, snapshots)
+        log.info(f"Created {len(snapshots)} community snapshots, timings {timings}")
 
         return {
             "scope": "SADMIN",
             "audience": "All Super"
         }, None
 
-    except Exception as e: 
+    except Exception as e:
         stack_trace = traceback.format_exc()
         log.error(f"Community snapshot exception: {stack_trace}")
         return None, stack_trace
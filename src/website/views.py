@@ -13,7 +13,7 @@ from api.decorators import x_frame_options_exempt
 from api.handlers.misc import MiscellaneousHandler
 from api.store.misc import MiscellaneousStore
 from _main_.utils.constants import RESERVED_SUBDOMAIN_LIST, STATES
-from api.utils.api_utils import get_distance_between_coords
+from api.utils.geo_index import community_geo_index, zipcode_coordinates
 from database.models import (
     Deployment,
     Community,
@@ -316,52 +316,7 @@ def _get_file_url(image):
 
 def _separate_communities(communities, lat, long):
     MAX_DISTANCE = 25
-    close = []
-    other = []
-    if not communities:
-        return close, other
-
-    if not lat or not long:
-        return close, communities
-
-    for community in communities:
-        if not community.is_geographically_focused:
-            if community not in other:
-                other.append(community)
-            continue
-
-        if not community.locations.all():
-            if community not in other:
-                other.append(community)
-
-        for location in community.locations.all():
-            if not location.zipcode:
-                if community not in other:
-                    other.append(community)
-                continue
-            
-            try:
-                community_zipcode_info = zipcodes.matching(location.zipcode)
-                community_zipcode_lat = community_zipcode_info[0]["lat"]
-                community_zipcode_long = community_zipcode_info[0]["long"]
-            except ValueError as e:
-                continue
-
-            distance = get_distance_between_coords(
-                float(lat),
-                float(long),
-                float(community_zipcode_lat),
-                float(community_zipcode_long),
-            )
-
-            if distance < MAX_DISTANCE:
-                if community not in close:
-                    close.append(community)
-
-            else:
-                if community not in other:
-                    other.append(community)
-    return close, other
+    return community_geo_index.separate(communities, lat, long, MAX_DISTANCE)
 
 @timed
 def home(request):
@@ -401,9 +356,7 @@ def search_communities(request):
         else:
             if zipcodes.is_real(query):
                 exact = base.filter(locations__zipcode=query)
-                zipcode_info = zipcodes.matching(query)
-                zipcode_lat = zipcode_info[0]["lat"]
-                zipcode_long = zipcode_info[0]["long"]
+                zipcode_lat, zipcode_long = zipcode_coordinates(query) or (None, None)
                 nearby, _ = _separate_communities(
                     base.exclude(id__in=exact), zipcode_lat, zipcode_long
                 )